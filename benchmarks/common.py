@@ -0,0 +1,65 @@
+"""
+Shared set-up code for the scripts in this directory. Each benchmark is run
+against a throwaway test database, populated using the same fixtures as the
+test suite.
+"""
+import os
+import sys
+import timeit
+from contextlib import contextmanager
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def setup_django():
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+    os.environ.setdefault(
+        'DJANGO_SETTINGS_MODULE', 'wagtailmenus.settings.testing'
+    )
+    import django
+    django.setup()
+
+
+@contextmanager
+def test_database(fixtures=('test.json',)):
+    """
+    Create a test database, load ``fixtures`` into it, and destroy it again
+    once the block has been exited.
+    """
+    from django.core.management import call_command
+    from django.db import connection
+    from django.test.utils import (setup_test_environment,
+                                   teardown_test_environment)
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(
+        verbosity=0, autoclobber=True, serialize=False
+    )
+    try:
+        if fixtures:
+            call_command('loaddata', *fixtures, verbosity=0)
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def best_time(func, number=10, repeat=5):
+    """
+    Return the fastest average time (in milliseconds) taken to call ``func``
+    over ``repeat`` runs of ``number`` calls.
+    """
+    timer = timeit.Timer(func)
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1000
+
+
+def print_table(headings, rows):
+    widths = [
+        max(len(str(value)) for value in column)
+        for column in zip(headings, *rows)
+    ]
+    for row in [headings] + list(rows):
+        print('  '.join(
+            str(value).rjust(width) for value, width in zip(row, widths)
+        ))
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+"""
+Compares the overhead of checking for functions registered for wagtailmenus'
+hooks when rendering multi-level menus (with no hooks registered), between:
+
+* 'get_hooks': Calling Wagtail's ``hooks.get_hooks()`` for every check (the
+  previous behaviour).
+* 'pipeline': Using ``wagtailmenus.utils.hooks.get_menu_hooks()``, which only
+  sorts the registered functions again when they change.
+
+The number of calls made to ``hooks.get_hooks()`` for each render is shown
+alongside the timings. Run from the repository root with:
+
+    python benchmarks/menu_hooks.py
+"""
+from contextlib import contextmanager
+from unittest import mock
+
+from common import best_time, print_table, setup_django, test_database
+
+URL = '/about-us/meet-the-team/staff-member-one/'
+
+TAGS = (
+    'main_menu max_levels=4',
+    'flat_menu "footer" max_levels=4',
+    'section_menu max_levels=4',
+    'children_menu max_levels=4',
+)
+
+
+@contextmanager
+def uncached_hooks():
+    from wagtail import hooks
+
+    def get_menu_hooks(hook_name):
+        return tuple(hooks.get_hooks(hook_name))
+
+    with mock.patch('wagtailmenus.utils.hooks.get_menu_hooks',
+                    get_menu_hooks), \
+            mock.patch('wagtailmenus.models.menus.get_menu_hooks',
+                       get_menu_hooks):
+        yield
+
+
+def get_render_function(tag, site):
+    from django.template import Context, Template
+    from django.test import RequestFactory
+    from wagtailmenus import context_processors
+
+    template = Template('{% load menu_tags %}{% ' + tag + ' %}')
+    request = RequestFactory().get(URL)
+    request._wagtail_site = site
+
+    def render():
+        # Menu data is reused for the same request, so the timings mostly
+        # reflect the work done to render menus
+        return template.render(Context({
+            'request': request,
+            'wagtailmenus_vals': context_processors.wagtailmenus(request)[
+                'wagtailmenus_vals'
+            ],
+        }))
+    return render
+
+
+def count_get_hooks_calls(render):
+    from wagtail import hooks
+
+    with mock.patch.object(hooks, 'get_hooks', wraps=hooks.get_hooks) as m:
+        render()
+    return m.call_count
+
+
+def run():
+    from wagtail.models import Site
+
+    site = Site.objects.get(is_default_site=True)
+    rows = []
+    for tag in TAGS:
+        render = get_render_function(tag, site)
+        render()
+        with uncached_hooks():
+            before_calls = count_get_hooks_calls(render)
+            before_time = best_time(render)
+        after_calls = count_get_hooks_calls(render)
+        after_time = best_time(render)
+        rows.append((
+            tag, before_calls, after_calls,
+            '%.2f' % before_time, '%.2f' % after_time,
+            '%.2f' % (before_time - after_time),
+        ))
+
+    print_table(
+        ('tag', 'calls (get_hooks)', 'calls (pipeline)', 'get_hooks (ms)',
+         'pipeline (ms)', 'saving (ms)'),
+        rows
+    )
+
+
+if __name__ == '__main__':
+    setup_django()
+    with test_database():
+        run()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+"""
+Compares the time taken to fetch the pages needed to render a flat menu with
+10, 100 and 1000 items, using:
+
+* 'legacy': One ``path__startswith`` or ``id`` filter per menu item, OR-ed
+  together (the approach used previously).
+* 'current': ``MenuWithMenuItems.get_pages_for_display()``, which merges
+  overlapping branches into ``path`` ranges, and matches individual pages
+  using a single ``id__in`` condition.
+
+Run from the repository root with:
+
+    python benchmarks/menu_page_queries.py
+"""
+from common import best_time, print_table, setup_django, test_database
+
+MENU_SIZES = (10, 100, 1000)
+
+
+def create_pages(parent, count):
+    from wagtail.models import Page
+    pages = []
+    for i in range(count):
+        page = parent.add_child(instance=Page(
+            title='Benchmark page %s' % i,
+            slug='benchmark-page-%s' % i,
+            show_in_menus=True,
+        ))
+        # Give every fifth page a child, so that there are branches to fetch
+        if i % 5 == 0:
+            page.add_child(instance=Page(
+                title='Benchmark child %s' % i,
+                slug='benchmark-child-%s' % i,
+                show_in_menus=True,
+            ))
+        pages.append(page)
+    return pages
+
+
+def create_menu(site, pages):
+    from wagtailmenus.models import FlatMenu, FlatMenuItem
+    menu = FlatMenu.objects.create(
+        site=site, title='%s items' % len(pages),
+        handle='benchmark-%s' % len(pages), max_levels=2,
+    )
+    FlatMenuItem.objects.bulk_create([
+        FlatMenuItem(
+            menu=menu, link_page=page, sort_order=i,
+            # Mix single pages and branches
+            allow_subnav=bool(i % 2),
+        )
+        for i, page in enumerate(pages)
+    ])
+    return menu
+
+
+def get_legacy_queryset(menu, menu_items):
+    from wagtail.models import Page
+    from wagtailmenus.conf import settings
+    queryset = Page.objects.none()
+    for item in (item for item in menu_items if item.link_page):
+        if(
+            item.allow_subnav and
+            item.link_page.depth >= settings.SECTION_ROOT_DEPTH
+        ):
+            queryset = queryset | Page.objects.filter(
+                path__startswith=item.link_page.path,
+                depth__lt=item.link_page.depth + menu.max_levels,
+            )
+        else:
+            queryset = queryset | Page.objects.filter(id=item.link_page_id)
+    return (menu.get_base_page_queryset() & queryset).specific()
+
+
+def run():
+    from django.db import OperationalError
+    from wagtail.models import Page, Site
+
+    site = Site.objects.get(is_default_site=True)
+    parent = site.root_page.add_child(instance=Page(
+        title='Benchmark pages', slug='benchmark-pages'
+    ))
+    pages = create_pages(parent, max(MENU_SIZES))
+
+    rows = []
+    for size in MENU_SIZES:
+        menu = create_menu(site, pages[:size])
+        menu._raw_menu_items = list(menu.get_base_menuitem_queryset())
+        current_count = len(menu.get_pages_for_display())
+        current_time = best_time(lambda: list(menu.get_pages_for_display()))
+        try:
+            legacy_count = len(
+                get_legacy_queryset(menu, menu._raw_menu_items)
+            )
+        except OperationalError:
+            # SQLite refuses to run queries with deeply nested expressions
+            rows.append((
+                size, current_count, 'failed', '%.2f' % current_time, '-'
+            ))
+            continue
+        assert legacy_count == current_count
+        legacy_time = best_time(
+            lambda: list(get_legacy_queryset(menu, menu._raw_menu_items))
+        )
+        rows.append((
+            size, current_count, '%.2f' % legacy_time, '%.2f' % current_time,
+            '%.1fx' % (legacy_time / current_time),
+        ))
+
+    print_table(
+        ('menu items', 'pages', 'legacy (ms)', 'current (ms)', 'speed-up'),
+        rows,
+    )
+
+
+if __name__ == '__main__':
+    setup_django()
+    with test_database():
+        run()
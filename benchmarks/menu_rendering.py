@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+"""
+Compares the time taken to render menus using the default templates, and
+using the built-in 'fast' renderer (see ``wagtailmenus.renderers``), for:
+
+* 'cold': A new request for every render, so all database queries are
+  included in the timings.
+* 'warm': The same request and context processor values for every render,
+  so that menu data fetched by the first render is reused (see
+  ``WAGTAILMENUS_REUSE_MENU_DATA_PER_REQUEST``), and the timings reflect
+  preparing and rendering the menu only.
+
+Most of the remaining time in 'warm' renders is spent preparing menu items,
+which is the same for both, so the difference is smaller with settings that
+reduce that work (e.g. ``WAGTAILMENUS_BULK_PAGE_URLS``).
+
+Run from the repository root with:
+
+    python benchmarks/menu_rendering.py
+"""
+from common import best_time, print_table, setup_django, test_database
+
+URL = '/about-us/meet-the-team/staff-member-one/'
+
+TAGS = (
+    'main_menu',
+    'main_menu max_levels=3',
+    'flat_menu "footer" max_levels=2',
+    'section_menu max_levels=3',
+    'children_menu max_levels=3',
+)
+
+
+def get_render_function(tag, site, reuse_request=False):
+    from django.template import Context, Template
+    from django.test import RequestFactory
+    from wagtailmenus import context_processors
+
+    template = Template('{% load menu_tags %}{% ' + tag + ' %}')
+
+    def get_context_values():
+        request = RequestFactory().get(URL)
+        request._wagtail_site = site
+        return {
+            'request': request,
+            'wagtailmenus_vals': context_processors.wagtailmenus(request)[
+                'wagtailmenus_vals'
+            ],
+        }
+
+    shared_values = get_context_values()
+
+    def render():
+        if reuse_request:
+            values = shared_values
+        else:
+            values = get_context_values()
+        return template.render(Context(values))
+    return render
+
+
+def run():
+    from django.test.html import parse_html
+    from wagtail.models import Site
+
+    site = Site.objects.get(is_default_site=True)
+    rows = []
+    for tag in TAGS:
+        for reuse_request in (False, True):
+            render_template = get_render_function(tag, site, reuse_request)
+            render_fast = get_render_function(
+                tag + ' renderer="fast"', site, reuse_request
+            )
+            assert parse_html(render_template()) == parse_html(render_fast())
+            template_time = best_time(render_template)
+            fast_time = best_time(render_fast)
+            rows.append((
+                tag, 'warm' if reuse_request else 'cold',
+                '%.2f' % template_time, '%.2f' % fast_time,
+                '%.1fx' % (template_time / fast_time),
+            ))
+
+    print_table(
+        ('tag', 'request', 'templates (ms)', 'fast (ms)', 'speed-up'), rows
+    )
+
+
+if __name__ == '__main__':
+    setup_django()
+    with test_database():
+        run()
@@ -5,3 +5,9 @@ class WagtailMenusConfig(AppConfig):
     name = 'wagtailmenus'
     verbose_name = 'WagtailMenus'
     default_auto_field = "django.db.models.AutoField"
+
+    def ready(self):
+        from wagtailmenus.signal_handlers import register_signal_handlers
+        from wagtailmenus.utils.capabilities import build_capability_table
+        register_signal_handlers()
+        build_capability_table()
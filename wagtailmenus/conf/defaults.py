@@ -53,6 +53,8 @@ FLAT_MENUS_FALL_BACK_TO_DEFAULT_SITE_MENUS = False
 
 GUESS_TREE_POSITION_FROM_PATH = True
 
+DERIVE_PAGES_FROM_URL_PATHS = False
+
 
 # --------------------------------------
 # Menu class and model override settings
@@ -71,6 +73,25 @@ MAIN_MENU_ITEMS_RELATED_NAME = 'menu_items'
 SECTION_MENU_CLASS = 'wagtailmenus.models.SectionMenu'
 
 
+# --------------
+# Cache settings
+# --------------
+
+CACHE_BACKEND = 'default'
+
+CACHE_TIMEOUT = 3600
+
+CACHE_MENU_TREES = False
+
+CACHE_RENDERED_MENUS = False
+
+CACHE_MISSING_FLAT_MENUS = False
+
+CACHE_DERIVED_PAGES = False
+
+CACHE_RESOLVED_TEMPLATES = False
+
+
 # ----------------------
 # Miscellaneous settings
 # ----------------------
@@ -79,10 +100,40 @@ ACTIVE_CLASS = 'active'
 
 ACTIVE_ANCESTOR_CLASS = 'ancestor'
 
+DEFER_ACTIVE_CLASSES = False
+
+PATH_BASED_ACTIVE_CLASSES = False
+
+LAYERED_CONTEXTS = False
+
+USE_MENU_NODES = False
+
+BULK_PAGE_URLS = False
+
+REUSE_MENU_DATA_PER_REQUEST = True
+
+REUSE_PAGES_PER_REQUEST = False
+
+SHARE_CONTEXT_PROCESSOR_VALUES = False
+
+PREFETCH_FLAT_MENUS = False
+
 PAGE_FIELD_FOR_MENU_ITEM_TEXT = 'title'
 
 SECTION_ROOT_DEPTH = 3
 
+LAZY_SECTION_ROOTS = False
+
+SELECTIVE_SPECIFIC_PAGES = False
+
+ONLY_LOAD_MENU_FIELDS = False
+
+PAGE_FIELDS_FOR_MENUS = (
+    'id', 'path', 'depth', 'numchild', 'title', 'slug', 'url_path',
+    'content_type', 'live', 'expired', 'show_in_menus', 'locale',
+    'translation_key',
+)
+
 
 # ----------
 # Deprecated
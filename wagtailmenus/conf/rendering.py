@@ -0,0 +1,84 @@
+"""
+A frozen copy of the settings used while rendering menus.
+
+Looking up values via ``wagtailmenus.conf.settings`` involves several method
+calls and checks for every lookup, which adds up when settings are read for
+every item in every menu. ``rendering_settings`` holds plain copies of the
+relevant values instead, which are taken when wagtailmenus is loaded, and
+taken again whenever settings are changed (e.g. by ``override_settings()``
+in tests).
+"""
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from wagtailmenus.conf import settings
+
+RENDERING_SETTING_NAMES = (
+    'ACTIVE_CLASS',
+    'ACTIVE_ANCESTOR_CLASS',
+    'BULK_PAGE_URLS',
+    'CACHE_MENU_TREES',
+    'CACHE_MISSING_FLAT_MENUS',
+    'CACHE_RENDERED_MENUS',
+    'CACHE_TIMEOUT',
+    'DEFAULT_ADD_SUB_MENUS_INLINE',
+    'DEFAULT_CHILDREN_MENU_TEMPLATE',
+    'DEFAULT_FLAT_MENU_TEMPLATE',
+    'DEFAULT_MAIN_MENU_TEMPLATE',
+    'DEFAULT_SECTION_MENU_TEMPLATE',
+    'DEFAULT_SUB_MENU_TEMPLATE',
+    'DEFER_ACTIVE_CLASSES',
+    'LAYERED_CONTEXTS',
+    'PAGE_FIELD_FOR_MENU_ITEM_TEXT',
+    'PREFETCH_FLAT_MENUS',
+    'REUSE_MENU_DATA_PER_REQUEST',
+    'REUSE_PAGES_PER_REQUEST',
+    'SECTION_ROOT_DEPTH',
+    'SITE_SPECIFIC_TEMPLATE_DIRS',
+    'USE_MENU_NODES',
+)
+
+
+class RenderingSettings:
+    """
+    Holds a copy of the value of each setting named in
+    ``RENDERING_SETTING_NAMES``. Values can't be changed, other than by
+    calling ``refresh()``.
+    """
+    __slots__ = RENDERING_SETTING_NAMES
+
+    def __init__(self):
+        self.refresh()
+
+    def refresh(self):
+        """
+        Copy the current value of each setting.
+        """
+        for name in RENDERING_SETTING_NAMES:
+            object.__setattr__(self, name, getattr(settings, name))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(
+            "Rendering settings can't be changed. Use Django's "
+            "'override_settings()' to change settings in tests."
+        )
+
+    def __delattr__(self, name):
+        self.__setattr__(name, None)
+
+    def __repr__(self):
+        return '<RenderingSettings: %s>' % ', '.join(
+            '%s=%r' % (name, getattr(self, name))
+            for name in RENDERING_SETTING_NAMES
+        )
+
+
+rendering_settings = RenderingSettings()
+
+
+@receiver(setting_changed)
+def refresh_rendering_settings(**kwargs):
+    # The settings helper clears its own caches from the same signal, so
+    # make sure that has happened before copying values
+    settings.reset_caches()
+    rendering_settings.refresh()
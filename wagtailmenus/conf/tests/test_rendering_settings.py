@@ -0,0 +1,40 @@
+from django.test import TestCase, override_settings
+
+from wagtailmenus.conf import settings
+from wagtailmenus.conf.rendering import (RENDERING_SETTING_NAMES,
+                                         rendering_settings)
+
+
+class TestRenderingSettings(TestCase):
+    fixtures = ['test.json']
+
+    def test_values_match_settings(self):
+        for name in RENDERING_SETTING_NAMES:
+            with self.subTest(name=name):
+                self.assertEqual(
+                    getattr(rendering_settings, name), getattr(settings, name)
+                )
+
+    def test_values_refreshed_when_settings_change(self):
+        with override_settings(
+            WAGTAILMENUS_ACTIVE_CLASS='current',
+            WAGTAILMENUS_SECTION_ROOT_DEPTH=2,
+        ):
+            self.assertEqual(rendering_settings.ACTIVE_CLASS, 'current')
+            self.assertEqual(rendering_settings.SECTION_ROOT_DEPTH, 2)
+        self.assertEqual(rendering_settings.ACTIVE_CLASS, 'active')
+        self.assertEqual(rendering_settings.SECTION_ROOT_DEPTH, 3)
+
+    def test_values_cannot_be_changed(self):
+        with self.assertRaises(AttributeError):
+            rendering_settings.ACTIVE_CLASS = 'current'
+        with self.assertRaises(AttributeError):
+            del rendering_settings.ACTIVE_CLASS
+        with self.assertRaises(AttributeError):
+            rendering_settings.NOT_A_SETTING = True
+        self.assertEqual(rendering_settings.ACTIVE_CLASS, 'active')
+
+    @override_settings(WAGTAILMENUS_ACTIVE_CLASS='current')
+    def test_menus_use_refreshed_values(self):
+        response = self.client.get('/about-us/')
+        self.assertContains(response, 'class="current')
@@ -1,8 +1,10 @@
 from django.utils.functional import SimpleLazyObject
 
 from wagtailmenus.conf import settings
-from wagtailmenus.utils.misc import (derive_page, derive_section_root,
+from wagtailmenus.utils.ancestors import PageAncestorIds
+from wagtailmenus.utils.misc import (derive_page, get_section_root,
                                      get_site_from_request)
+from wagtailmenus.utils.registry import get_request_registry, register_pages
 
 
 def wagtailmenus(request):
@@ -23,20 +25,36 @@ def wagtailmenus(request):
                 current_page = match
 
         if not section_root and current_page or match:
-            section_root = derive_section_root(current_page or match)
+            section_root = get_section_root(current_page or match)
 
         if current_page or match:
             page = current_page or match
-            if page.depth >= section_root_depth:
+            if settings.PATH_BASED_ACTIVE_CLASSES:
+                ancestor_ids = PageAncestorIds(page, section_root_depth)
+            elif page.depth >= section_root_depth:
                 ancestor_ids = page.get_ancestors(inclusive=True).filter(
                     depth__gte=section_root_depth).values_list('id', flat=True)
 
+        # Allow menus to reuse these instances
+        register_pages(request, current_page or match, section_root)
+
         return {
             'current_page': current_page,
             'section_root': section_root,
             'current_page_ancestor_ids': ancestor_ids,
         }
 
+    if not settings.SHARE_CONTEXT_PROCESSOR_VALUES:
+        return {
+            'wagtailmenus_vals': SimpleLazyObject(_get_wagtailmenus_vals),
+        }
+
+    # Share the same values between all contexts created for the request
+    registry = get_request_registry(request)
+    if registry.context_processor_vals is None:
+        registry.context_processor_vals = SimpleLazyObject(
+            _get_wagtailmenus_vals
+        )
     return {
-        'wagtailmenus_vals': SimpleLazyObject(_get_wagtailmenus_vals),
+        'wagtailmenus_vals': registry.context_processor_vals,
     }
@@ -1,4 +1,6 @@
 from collections import OrderedDict, defaultdict, namedtuple
+from copy import copy
+from time import monotonic
 from types import GeneratorType
 
 from django import VERSION as DJANGO_VERSION
@@ -6,22 +8,44 @@ from django.core.exceptions import (ImproperlyConfigured,
                                     MultipleObjectsReturned)
 from django.db import models
 from django.db.models import BooleanField, Case, Q, When
-from django.template.loader import get_template, select_template
+from django.template import Context
+from django.template.base import Template as DjangoTemplate
 from django.utils.functional import cached_property, lazy
 from django.utils.safestring import mark_safe
+from django.utils.translation import get_language
 from django.utils.translation import gettext_lazy as _
 from modelcluster.models import ClusterableModel
-from wagtail import hooks
 from wagtail.models import Page, Site
 
 from wagtailmenus import forms, panels
 from wagtailmenus.conf import constants, settings
+from wagtailmenus.conf.rendering import rendering_settings
 from wagtailmenus.errors import RequestUnavailableError
-from wagtailmenus.utils.misc import get_fake_request, get_site_from_request
-
-from .menuitems import MenuItem
+from wagtailmenus.renderers import get_renderer
+from wagtailmenus.utils import active_classes
+from wagtailmenus.utils.ancestors import is_current_page_ancestor
+from wagtailmenus.utils.active_classes import ActiveClassDependencies
+from wagtailmenus.utils.cache import (extend_cache_key, get_cache,
+                                      get_cache_version, get_storable_copy,
+                                      make_cache_key)
+from wagtailmenus.utils.capabilities import (
+    get_capabilities_for_content_type, get_capabilities_for_page)
+from wagtailmenus.utils.hooks import (QUERYSET_HOOK_NAMES, apply_menu_hooks,
+                                      get_menu_hooks, menu_hooks_registered)
+from wagtailmenus.utils.localization import get_localized_pages
+from wagtailmenus.utils.misc import (LazySectionRoot, get_fake_request,
+                                     get_site_from_request)
+from wagtailmenus.utils.nodes import MenuNode
+from wagtailmenus.utils.registry import get_request_registry
+from wagtailmenus.utils.specific import (prefetch_link_pages,
+                                         specific_for_menus)
+from wagtailmenus.utils.templates import (get_menu_template,
+                                          select_menu_template)
+from wagtailmenus.utils.tree import get_branch_q, get_page_tree_q
+from wagtailmenus.utils.urls import PageURLResolver
+
+from .menuitems import AbstractMenuItem, MenuItem
 from .mixins import DefinesSubMenuTemplatesMixin
-from .pages import AbstractLinkPage
 
 if DJANGO_VERSION >= (4, 1):
     mark_safe_lazy = mark_safe
@@ -54,6 +78,15 @@ OptionVals = namedtuple('OptionVals', (
     'extra',
 ))
 
+# Main menus by (menu class, site id), along with the cache version they
+# were fetched for and the time they expire, used by get_existing_for_site()
+_main_menus = {}
+
+MenuTreeSnapshot = namedtuple('MenuTreeSnapshot', (
+    'menu_items',
+    'pages',
+))
+
 
 # ########################################################
 # Base classes
@@ -66,6 +99,7 @@ class Menu:
     template_name = None
     menu_instance_context_name = 'menu'
     sub_menu_class = None
+    cache_rendered_output = True  # used by 'get_rendered_output_cache_key()'
 
     @classmethod
     def render_from_tag(
@@ -91,8 +125,8 @@ class Menu:
             * get_context_data()
             * render_to_template()
         """
-        instance = cls._get_render_prepared_object(
-            context,
+        ctx_vals = cls._create_contextualvals_obj_from_context(context)
+        opt_vals = cls._create_optionvals_obj_from_values(
             max_levels=max_levels,
             apply_active_classes=apply_active_classes,
             allow_repeating_parents=allow_repeating_parents,
@@ -101,9 +135,65 @@ class Menu:
             template_name=template_name,
             **kwargs
         )
-        if not instance:
-            return ''
-        return instance.render_to_template()
+
+        output = None
+        cache_key = cls.get_rendered_output_cache_key(ctx_vals, opt_vals)
+        if cache_key:
+            # The first value records what the output's active classes
+            # depend on, which identifies the output to use for this request
+            cache = get_cache()
+            dependencies = cache.get(cache_key)
+            if dependencies is not None:
+                output = cache.get(cls._get_output_cache_key(
+                    cache_key, dependencies, ctx_vals
+                ))
+
+        if output is None:
+            dependencies = ActiveClassDependencies() if cache_key else None
+            instance = cls._prepare_object_from_collected_values(
+                context, ctx_vals, opt_vals,
+                active_class_dependencies=dependencies,
+            )
+            output = instance.render_to_template() if instance else ''
+            if cache_key:
+                cache.set_many({
+                    cache_key: dependencies,
+                    cls._get_output_cache_key(
+                        cache_key, dependencies, ctx_vals
+                    ): output,
+                }, rendering_settings.CACHE_TIMEOUT)
+
+        original_menu = ctx_vals.original_menu_instance
+        if dependencies is not None and original_menu is not None:
+            # This menu was rendered as part of another menu's output
+            parent_dependencies = (
+                original_menu.get_active_class_dependencies()
+            )
+            if parent_dependencies is not None:
+                parent_dependencies.update(dependencies)
+
+        if (
+            rendering_settings.DEFER_ACTIVE_CLASSES and
+            opt_vals.apply_active_classes and
+            ctx_vals.current_level == 1
+        ):
+            current_page = ctx_vals.current_page
+            output = active_classes.replace_placeholders(
+                output,
+                current_page_id=current_page.pk if current_page else None,
+                ancestor_ids=ctx_vals.current_page_ancestor_ids,
+                request_path=ctx_vals.request.path,
+            )
+        return output
+
+    @classmethod
+    def _get_output_cache_key(cls, cache_key, dependencies, contextual_vals):
+        current_page = contextual_vals.current_page
+        return extend_cache_key(cache_key, dependencies.get_signature(
+            current_page=current_page,
+            ancestor_ids=contextual_vals.current_page_ancestor_ids,
+            request_path=contextual_vals.request.path,
+        ))
 
     @classmethod
     def _get_render_prepared_object(cls, context, **option_values):
@@ -114,7 +204,14 @@ class Menu:
         """
         ctx_vals = cls._create_contextualvals_obj_from_context(context)
         opt_vals = cls._create_optionvals_obj_from_values(**option_values)
+        return cls._prepare_object_from_collected_values(
+            context, ctx_vals, opt_vals
+        )
 
+    @classmethod
+    def _prepare_object_from_collected_values(
+        cls, context, ctx_vals, opt_vals, active_class_dependencies=None
+    ):
         if issubclass(cls, models.Model):
             instance = cls.get_from_collected_values(ctx_vals, opt_vals)
         else:
@@ -122,6 +219,7 @@ class Menu:
         if not instance:
             return None
 
+        instance._active_class_dependencies = active_class_dependencies
         instance.prepare_to_render(context['request'], ctx_vals, opt_vals)
         return instance
 
@@ -176,7 +274,10 @@ class Menu:
             kwargs.pop('apply_active_classes'),
             kwargs.pop('allow_repeating_parents'),
             kwargs.pop('use_absolute_page_urls'),
-            kwargs.pop('add_sub_menus_inline', settings.DEFAULT_ADD_SUB_MENUS_INLINE),
+            kwargs.pop(
+                'add_sub_menus_inline',
+                rendering_settings.DEFAULT_ADD_SUB_MENUS_INLINE
+            ),
             kwargs.pop('parent_page', None),
             kwargs.pop('handle', None),  # for AbstractFlatMenu
             kwargs.pop('template_name', ''),
@@ -185,6 +286,59 @@ class Menu:
             kwargs  # anything left over will be stored as 'extra'
         )
 
+    @classmethod
+    def get_rendered_output_cache_key(cls, contextual_vals, option_vals):
+        """
+        Return a key for caching the output of ``render_from_tag()`` for the
+        provided contextual and option values, or ``None`` if the output
+        should not be cached.
+        """
+        if not (
+            rendering_settings.CACHE_RENDERED_MENUS and
+            cls.cache_rendered_output
+        ):
+            return None
+        if menu_hooks_registered():
+            # Hooks can modify menus in request-specific ways
+            return None
+        return make_cache_key(
+            'output',
+            cls.__module__,
+            cls.__qualname__,
+            *cls.get_rendered_output_cache_key_parts(
+                contextual_vals, option_vals
+            )
+        )
+
+    @classmethod
+    def get_rendered_output_cache_key_parts(cls, contextual_vals, option_vals):
+        """
+        Return a tuple of values that, together with the menu class, identify
+        output from ``render_from_tag()`` that can be reused. Active classes
+        don't need to be accounted for here: the pages and URLs given active
+        classes are recorded while rendering (see ``ActiveClassDependencies``),
+        and output is only reused where they would be given the same ones.
+        """
+        site = contextual_vals.current_site
+        parent_page = option_vals.parent_page
+        return (
+            site.pk if site else None,
+            get_language(),
+            contextual_vals.current_level,
+            contextual_vals.original_menu_tag,
+            option_vals.handle,
+            parent_page.pk if parent_page else None,
+            option_vals.max_levels,
+            option_vals.apply_active_classes,
+            option_vals.allow_repeating_parents,
+            option_vals.use_absolute_page_urls,
+            option_vals.add_sub_menus_inline,
+            option_vals.template_name,
+            option_vals.sub_menu_template_name,
+            tuple(option_vals.sub_menu_template_names or ()),
+            sorted(option_vals.extra.items()),
+        )
+
     @classmethod
     def create_from_collected_values(cls, contextual_vals, option_vals):
         """
@@ -228,12 +382,31 @@ class Menu:
 
     def render_to_template(self):
         """
-        Render the current menu instance to a template and return a string
+        Render the current menu instance to a template and return a string.
+        If a ``renderer`` option was supplied to the menu tag, the named
+        renderer is used instead (where it supports this type of menu).
         """
+        renderer_name = self._option_vals.extra.get('renderer')
+        if renderer_name:
+            output = get_renderer(renderer_name).render(self)
+            if output is not None:
+                return output
+
         context_data = self.get_context_data()
         template = self.get_template()
 
         context_data['current_template'] = template.template.name
+        if self.uses_layered_context():
+            if isinstance(template.template, DjangoTemplate):
+                # Render using the parent context, with 'context_data' as
+                # an additional layer
+                context = self._contextual_vals.parent_context
+                with context.push(context_data):
+                    return template.template.render(context)
+            # Other template engines need the full context
+            data = self.create_dict_from_parent_context()
+            data.update(context_data)
+            context_data = data
         return template.render(context_data)
 
     def get_common_hook_kwargs(self, **kwargs):
@@ -268,12 +441,83 @@ class Menu:
         """
         self.request = request
 
+    def get_request_registry_key(self):
+        """
+        Return a hashable value identifying the data needed to render this
+        menu, allowing it to be shared with equivalent menus rendered for the
+        same request, or ``None`` if the data should not be shared.
+        """
+        return None
+
+    def get_request_registry(self):
+        """
+        Return the ``RequestRegistry`` for the current request, or ``None``
+        if data should not be reused within requests.
+        """
+        request = getattr(self, 'request', None)
+        if (
+            request is None or
+            not rendering_settings.REUSE_MENU_DATA_PER_REQUEST
+        ):
+            return None
+        return get_request_registry(request)
+
+    def get_active_class_dependencies(self):
+        """
+        Return the ``ActiveClassDependencies`` instance that pages and URLs
+        given active classes by this menu should be recorded on (so that its
+        rendered output can be cached), or ``None`` if they don't need to be
+        recorded. Sub menus use the one belonging to the original menu.
+        """
+        if rendering_settings.DEFER_ACTIVE_CLASSES:
+            # Placeholders are used instead, which don't depend on anything
+            return None
+        dependencies = getattr(self, '_active_class_dependencies', None)
+        if dependencies is not None:
+            return dependencies
+        original_menu = self._contextual_vals.original_menu_instance
+        if original_menu is None or original_menu is self:
+            return None
+        return original_menu.get_active_class_dependencies()
+
+    def get_page_registry(self):
+        """
+        Return the ``RequestRegistry`` whose identity map should be used to
+        reuse page instances already loaded for the current request, or
+        ``None`` if pages should not be reused.
+        """
+        if not rendering_settings.REUSE_PAGES_PER_REQUEST:
+            return None
+        request = getattr(self, 'request', None)
+        if request is None:
+            return None
+        return get_request_registry(request)
+
+    def get_registered_menu(self):
+        """
+        Return an equivalent menu instance that was prepared earlier for the
+        current request, whose data can be reused by this one, or ``None``
+        if there isn't one. If this is the first such instance, it is
+        registered, so that its data can be reused by others.
+        """
+        registry = self.get_request_registry()
+        if registry is None:
+            return None
+        if menu_hooks_registered(QUERYSET_HOOK_NAMES):
+            # Hooks receive arguments specific to each menu instance
+            return None
+        key = self.get_request_registry_key()
+        if key is None:
+            return None
+        registered = registry.menus.setdefault(key, self)
+        if registered is self:
+            return None
+        return registered
+
     def get_base_page_queryset(self):
         qs = Page.objects.filter(live=True, expired=False, show_in_menus=True)
         # allow hooks to modify the queryset
-        for hook in hooks.get_hooks('menus_modify_base_page_queryset'):
-            qs = hook(qs, **self.common_hook_kwargs)
-        return qs
+        return apply_menu_hooks('menus_modify_base_page_queryset', qs, self)
 
     def get_pages_for_display(self):
         raise NotImplementedError(
@@ -284,8 +528,13 @@ class Menu:
     def pages_for_display(self):
         """Returns a dictionary of all pages needed to render the
         menu, keyed by id."""
+        registered_menu = self.get_registered_menu()
+        if registered_menu is not None:
+            return registered_menu.pages_for_display
         # using OrderedDict to preserve ordering in Python < 3.6
-        return OrderedDict((p.id, p) for p in self.get_pages_for_display())
+        pages = OrderedDict((p.id, p) for p in self.get_pages_for_display())
+        prefetch_link_pages(pages.values())
+        return pages
 
     def get_page_children_dict(self, page_qs=None):
         """
@@ -299,12 +548,66 @@ class Menu:
 
     @cached_property
     def page_children_dict(self):
+        registered_menu = self.get_registered_menu()
+        if registered_menu is not None:
+            return registered_menu.page_children_dict
         return self.get_page_children_dict()
 
     def get_children_for_page(self, page):
         """Return a list of relevant child pages for a given page."""
         return self.page_children_dict.get(page.path, [])
 
+    @cached_property
+    def url_resolver(self):
+        """
+        A ``PageURLResolver`` for generating page URLs when the
+        ``WAGTAILMENUS_BULK_PAGE_URLS`` setting is ``True``, which is shared
+        by all menus rendered for the current request where possible.
+        """
+        registry = self.get_request_registry()
+        if registry is None:
+            return PageURLResolver(self.request)
+        if registry.url_resolver is None:
+            registry.url_resolver = PageURLResolver(self.request)
+        return registry.url_resolver
+
+    def get_localized_pages(self):
+        """
+        Return a dictionary of the pages to use in place of those in
+        ``pages_for_display`` when applying active classes, keyed by id. The
+        values are live translations in the active locale (where available),
+        which are fetched together, and reused for the rest of the request.
+        """
+        registered_menu = self.get_registered_menu()
+        if registered_menu is not None:
+            return registered_menu.get_localized_pages()
+        language = get_language()
+        try:
+            return self._localized_pages[language]
+        except AttributeError:
+            self._localized_pages = {}
+        except KeyError:
+            pass
+        localized_pages = get_localized_pages(
+            self.pages_for_display.values(),
+            page_registry=self.get_page_registry(),
+        )
+        self._localized_pages[language] = localized_pages
+        return localized_pages
+
+    def get_localized_page(self, page):
+        """
+        Return the live translation of ``page`` in the active locale, or
+        ``page`` itself if there isn't one.
+        """
+        try:
+            return self.get_localized_pages()[page.pk]
+        except KeyError:
+            # Pages that didn't come from 'pages_for_display' (e.g. added by
+            # hooks) are localized individually
+            localized = page.localized
+            return localized if localized.pk != page.pk else page
+
     def page_has_children(self, page):
         """
         Return a boolean indicating whether a given page has any relevant
@@ -322,8 +625,13 @@ class Menu:
     def create_sub_menu(self, parent_page):
         ctx_vals = self._contextual_vals
         menu_class = self.get_sub_menu_class()
-        context = self.create_dict_from_parent_context()
-        context.update(ctx_vals._asdict())
+        if self.uses_layered_context():
+            # Copies the list of layers only, rather than their contents
+            context = copy(ctx_vals.parent_context)
+            context.update(ctx_vals._asdict())
+        else:
+            context = self.create_dict_from_parent_context()
+            context.update(ctx_vals._asdict())
         if not ctx_vals.original_menu_instance and ctx_vals.current_level == 1:
             context['original_menu_instance'] = self
         option_vals = self._option_vals._asdict()
@@ -333,6 +641,18 @@ class Menu:
         })
         return menu_class._get_render_prepared_object(context, **option_vals)
 
+    def uses_layered_context(self):
+        """
+        Return a boolean indicating whether values for rendering this menu
+        should be added to the parent context as an additional layer,
+        rather than copied into a new dictionary along with every value from
+        the parent context.
+        """
+        return (
+            rendering_settings.LAYERED_CONTEXTS and
+            isinstance(self._contextual_vals.parent_context, Context)
+        )
+
     def create_dict_from_parent_context(self):
         parent_context = self._contextual_vals.parent_context
 
@@ -361,7 +681,11 @@ class Menu:
         """
         ctx_vals = self._contextual_vals
         opt_vals = self._option_vals
-        data = self.create_dict_from_parent_context()
+        if self.uses_layered_context():
+            # Values from the parent context are available when rendering
+            data = {}
+        else:
+            data = self.create_dict_from_parent_context()
         data.update(ctx_vals._asdict())
         data.update({
             'apply_active_classes': opt_vals.apply_active_classes,
@@ -393,8 +717,7 @@ class Menu:
         items = self.get_raw_menu_items()
 
         # Allow hooks to modify the raw list
-        for hook in hooks.get_hooks('menus_modify_raw_menu_items'):
-            items = hook(items, **self.common_hook_kwargs)
+        items = apply_menu_hooks('menus_modify_raw_menu_items', items, self)
 
         # Prime and modify the menu items accordingly
         items = self.modify_menu_items(self.prime_menu_items(items))
@@ -402,10 +725,9 @@ class Menu:
             items = list(items)
 
         # Allow hooks to modify the primed/modified list
-        hook_methods = hooks.get_hooks('menus_modify_primed_menu_items')
-        for hook in hook_methods:
-            items = hook(items, **self.common_hook_kwargs)
-        return items
+        return apply_menu_hooks(
+            'menus_modify_primed_menu_items', items, self
+        )
 
     items = property(get_menu_items_for_rendering)
 
@@ -441,7 +763,9 @@ class Menu:
         # Special handling for 'LinkPage' objects
         # ---------------------------------------------------------------------
 
-        if item_is_page_object and issubclass(item.specific_class, AbstractLinkPage):
+        if item_is_page_object and get_capabilities_for_content_type(
+            item.content_type_id
+        ).is_link_page:
 
             if not item.show_in_menus_custom(
                 request=request,
@@ -452,12 +776,18 @@ class Menu:
                 # This item shouldn't be displayed
                 return
 
-            item.active_class = item.extra_classes
-            item.text = item.menu_text(request)
             if option_vals.use_absolute_page_urls:
-                item.href = item.get_full_url(request=request)
+                href = item.get_full_url(request=request)
             else:
-                item.href = item.relative_url(current_site, request)
+                href = item.relative_url(current_site, request)
+            if rendering_settings.USE_MENU_NODES:
+                return MenuNode(
+                    item, page, text=item.menu_text(request), href=href,
+                    active_class=item.extra_classes,
+                )
+            item.active_class = item.extra_classes
+            item.text = item.menu_text(request)
+            item.href = href
             return item
 
         # ---------------------------------------------------------------------
@@ -472,10 +802,10 @@ class Menu:
         if page:
             if (
                 not stop_at_this_level and
-                page.depth >= settings.SECTION_ROOT_DEPTH and
+                page.depth >= rendering_settings.SECTION_ROOT_DEPTH and
                 (not item_is_menu_item_object or item.allow_subnav)
             ):
-                if hasattr(page, 'has_submenu_items'):
+                if get_capabilities_for_page(page).has_submenu_items:
                     has_children_in_menu = page.has_submenu_items(
                         menu_instance=self,
                         request=request,
@@ -496,58 +826,126 @@ class Menu:
         active_class = ''
 
         if option_vals.apply_active_classes:
+            dependencies = self.get_active_class_dependencies()
             if page:
-                if (page.pk != page.localized.pk):
-                    page = page.localized
-                if(current_page and page.pk == current_page.pk):
+                # Only the active class depends on the translation. 'page'
+                # is left as it is, because sub menus are found using the
+                # paths of the pages fetched for this menu
+                localized_page = self.get_localized_page(page)
+                if dependencies is not None:
+                    dependencies.add_page(localized_page)
+                if rendering_settings.DEFER_ACTIVE_CLASSES:
+                    # Use a placeholder, which is replaced after rendering
+                    active_class = active_classes.get_page_placeholder(
+                        localized_page, repeated=bool(
+                            option_vals.allow_repeating_parents and
+                            has_children_in_menu and
+                            getattr(localized_page, 'repeat_in_subnav', False)
+                        )
+                    )
+                elif(current_page and localized_page.pk == current_page.pk):
                     # This is the current page, so the menu item should
                     # probably have the 'active' class
-                    active_class = settings.ACTIVE_CLASS
+                    active_class = rendering_settings.ACTIVE_CLASS
                     if (
                         option_vals.allow_repeating_parents and
                         has_children_in_menu
                     ):
-                        if getattr(page, 'repeat_in_subnav', False):
-                            active_class = settings.ACTIVE_ANCESTOR_CLASS
-
-                elif page.pk in ctx_vals.current_page_ancestor_ids:
-                    active_class = settings.ACTIVE_ANCESTOR_CLASS
+                        if getattr(localized_page, 'repeat_in_subnav', False):
+                            active_class = (
+                                rendering_settings.ACTIVE_ANCESTOR_CLASS
+                            )
+
+                elif is_current_page_ancestor(
+                    localized_page, ctx_vals.current_page_ancestor_ids
+                ):
+                    active_class = rendering_settings.ACTIVE_ANCESTOR_CLASS
+            elif rendering_settings.DEFER_ACTIVE_CLASSES:
+                # This is a `MenuItem` for a custom URL
+                active_class = active_classes.get_url_placeholder(
+                    item.link_url
+                )
             else:
                 # This is a `MenuItem` for a custom URL
                 active_class = item.get_active_class_for_request(request)
+                if dependencies is not None:
+                    if (
+                        type(item).get_active_class_for_request is
+                        AbstractMenuItem.get_active_class_for_request
+                    ):
+                        dependencies.add_url(item.link_url)
+                    else:
+                        dependencies.uses_request_path = True
 
         # ---------------------------------------------------------------------
-        # Set 'text' attribute
+        # Determine 'text', 'href' and 'sub_menu' values
         # ---------------------------------------------------------------------
 
         if item_is_menu_item_object:
-            item.text = item.menu_text
+            text = item.menu_text
         else:
-            item.text = getattr(item, settings.PAGE_FIELD_FOR_MENU_ITEM_TEXT, item.title)
+            text = getattr(
+                item, rendering_settings.PAGE_FIELD_FOR_MENU_ITEM_TEXT,
+                item.title
+            )
 
-        # ---------------------------------------------------------------------
-        # Set 'href' attribute
-        # ---------------------------------------------------------------------
+        if rendering_settings.BULK_PAGE_URLS:
+            href = self._get_href_from_url_resolver(item, page)
+        elif option_vals.use_absolute_page_urls:
+            href = item.get_full_url(request=request)
+        else:
+            href = item.relative_url(current_site, request=request)
 
-        if option_vals.use_absolute_page_urls:
-            item.href = item.get_full_url(request=request)
+        if has_children_in_menu and option_vals.add_sub_menus_inline:
+            sub_menu = self.create_sub_menu(page)
         else:
-            item.href = item.relative_url(current_site, request=request)
+            sub_menu = None
 
         # ---------------------------------------------------------------------
-        # Set additional attributes
+        # Set attributes
         # ---------------------------------------------------------------------
 
+        if rendering_settings.USE_MENU_NODES:
+            # Leave 'item' untouched, so that it can be safely shared
+            return MenuNode(
+                item, page, text=text, href=href, active_class=active_class,
+                has_children_in_menu=has_children_in_menu, sub_menu=sub_menu,
+            )
+
+        item.text = text
+        item.href = href
         item.has_children_in_menu = has_children_in_menu
         item.active_class = active_class
-
-        if item.has_children_in_menu and option_vals.add_sub_menus_inline:
-            item.sub_menu = self.create_sub_menu(page)
-        else:
-            item.sub_menu = None
-
+        item.sub_menu = sub_menu
         return item
 
+    def _get_href_from_url_resolver(self, item, page):
+        use_absolute_page_urls = self._option_vals.use_absolute_page_urls
+        current_site = self._contextual_vals.current_site
+        if isinstance(item, MenuItem):
+            item_class = type(item)
+            if (
+                page is None or
+                getattr(item_class, 'relative_url', None) is not
+                AbstractMenuItem.relative_url or
+                getattr(item_class, 'get_full_url', None) is not
+                AbstractMenuItem.get_full_url
+            ):
+                if use_absolute_page_urls:
+                    return item.get_full_url(request=self.request)
+                return item.relative_url(current_site, request=self.request)
+            if use_absolute_page_urls:
+                page_url = self.url_resolver.get_full_url(page)
+            else:
+                page_url = self.url_resolver.get_url(page, current_site)
+            try:
+                return page_url + item.url_append
+            except TypeError:
+                return ''
+        if use_absolute_page_urls:
+            return self.url_resolver.get_full_url(item)
+        return self.url_resolver.get_url(item, current_site)
+
     def prime_menu_items(self, menu_items):
         """
         A generator method that takes a list of ``MenuItem`` or ``Page``
@@ -570,9 +968,9 @@ class Menu:
         template_name = self._option_vals.template_name or self.template_name
 
         if template_name:
-            return get_template(template_name)
+            return get_menu_template(template_name)
 
-        return select_template(self.get_template_names())
+        return select_menu_template(self.get_template_names())
 
     def get_template_names(self):
         """Return a list (or tuple) of template names to search for when
@@ -582,7 +980,7 @@ class Menu:
         site = self._contextual_vals.current_site
         template_names = []
         menu_str = self.menu_short_name
-        if settings.SITE_SPECIFIC_TEMPLATE_DIRS and site:
+        if rendering_settings.SITE_SPECIFIC_TEMPLATE_DIRS and site:
             hostname = site.hostname
             template_names.extend([
                 "menus/%s/%s/level_1.html" % (hostname, menu_str),
@@ -636,15 +1034,21 @@ class MenuFromPage(Menu):
         """
         return self.get_parent_page_for_menu_items()
 
+    def get_request_registry_key(self):
+        return (
+            type(self),
+            self.parent_page_for_menu_items.pk,
+            self.max_levels,
+        )
+
     def get_pages_for_display(self):
         """Returns a queryset of all pages needed to render the menu."""
         parent_page = self.parent_page_for_menu_items
         queryset = self.get_base_page_queryset().filter(
-            path__startswith=parent_page.path,
-            depth__lte=parent_page.depth + self.max_levels,
+            get_branch_q(parent_page.path, parent_page.depth + self.max_levels)
         )
-        # Always return 'specific' page instances
-        return queryset.specific()
+        # Return 'specific' page instances (where needed)
+        return specific_for_menus(queryset, self.get_page_registry())
 
     def get_children_for_page(self, page):
         """Returns a list of relevant child pages for a given page"""
@@ -668,12 +1072,20 @@ class MenuFromPage(Menu):
         method will not be present on a vanilla ``Page`` instances).
         """
         parent_page = self.parent_page_for_menu_items
-        modifier_method = getattr(parent_page, 'modify_submenu_items', None)
-        if not modifier_method:
+        if (
+            parent_page is None or
+            not get_capabilities_for_page(parent_page).modify_submenu_items
+        ):
             return menu_items
+        modifier_method = parent_page.modify_submenu_items
 
         ctx_vals = self._contextual_vals
         opt_vals = self._option_vals
+        if opt_vals.apply_active_classes:
+            # A 'repeated' item for the page may be given an active class
+            dependencies = self.get_active_class_dependencies()
+            if dependencies is not None:
+                dependencies.add_page(parent_page)
         kwargs = {
             'request': self.request,
             'menu_instance': self,
@@ -734,39 +1146,101 @@ class SectionMenu(DefinesSubMenuTemplatesMixin, MenuFromPage):
 
     @classmethod
     def get_least_specific_template_name(cls):
-        return settings.DEFAULT_SECTION_MENU_TEMPLATE
+        return rendering_settings.DEFAULT_SECTION_MENU_TEMPLATE
+
+    @classmethod
+    def get_rendered_output_cache_key_parts(cls, contextual_vals, option_vals):
+        section_root = contextual_vals.current_section_root_page
+        return super().get_rendered_output_cache_key_parts(
+            contextual_vals, option_vals
+        ) + (section_root.path if section_root else None,)
 
     def __init__(self, root_page, max_levels):
         self.root_page = root_page
+        # The object to use for outputting the root page in templates (set
+        # by prepare_to_render())
+        self.section_root = root_page
         self.max_levels = max_levels
         super().__init__()
 
+    def get_request_registry_key(self):
+        # Use 'path' to avoid loading lazy section roots
+        return (
+            type(self),
+            self.parent_page_for_menu_items.path,
+            self.max_levels,
+        )
+
     def prepare_to_render(self, request, contextual_vals, option_vals):
         super().prepare_to_render(request, contextual_vals, option_vals)
-        root_page = self.root_page.specific
+        root_page = self.get_specific_root_page()
 
-        root_page.text = getattr(
-            root_page, settings.PAGE_FIELD_FOR_MENU_ITEM_TEXT,
+        text = getattr(
+            root_page, rendering_settings.PAGE_FIELD_FOR_MENU_ITEM_TEXT,
             root_page.title
         )
         if option_vals.use_absolute_page_urls:
             href = root_page.get_full_url(request=self.request)
         else:
             href = root_page.relative_url(contextual_vals.current_site)
-        root_page.href = href
 
         active_class = ''
         if option_vals.apply_active_classes:
             current_page = contextual_vals.current_page
-            if current_page and root_page.id == current_page.id:
+            dependencies = self.get_active_class_dependencies()
+            if dependencies is not None:
+                dependencies.add_page(root_page)
+            if rendering_settings.DEFER_ACTIVE_CLASSES:
+                # Use a placeholder, which is replaced after rendering
+                active_class = active_classes.get_page_placeholder(
+                    root_page,
+                    repeated=getattr(root_page, 'repeat_in_subnav', False)
+                )
+            elif current_page and root_page.id == current_page.id:
                 if getattr(root_page, 'repeat_in_subnav', False):
-                    active_class = settings.ACTIVE_ANCESTOR_CLASS
+                    active_class = rendering_settings.ACTIVE_ANCESTOR_CLASS
                 else:
-                    active_class = settings.ACTIVE_CLASS
-            elif root_page.id in contextual_vals.current_page_ancestor_ids:
-                active_class = settings.ACTIVE_ANCESTOR_CLASS
-        root_page.active_class = active_class
+                    active_class = rendering_settings.ACTIVE_CLASS
+            elif is_current_page_ancestor(
+                root_page, contextual_vals.current_page_ancestor_ids
+            ):
+                active_class = rendering_settings.ACTIVE_ANCESTOR_CLASS
+
         self.root_page = root_page
+        if rendering_settings.USE_MENU_NODES:
+            self.section_root = MenuNode(
+                root_page, root_page, text=text, href=href,
+                active_class=active_class,
+            )
+        else:
+            root_page.text = text
+            root_page.href = href
+            root_page.active_class = active_class
+            self.section_root = root_page
+
+    def get_specific_root_page(self):
+        """
+        Return a specific instance of ``self.root_page``, reusing one that was
+        already loaded for the current request where possible.
+        """
+        root_page = self.root_page
+        if isinstance(root_page, LazySectionRoot):
+            if not root_page.is_loaded:
+                # Use the instance fetched along with the other menu pages
+                # (if there is one) instead of loading it separately
+                for page in self.pages_for_display.values():
+                    if page.path == root_page.path:
+                        root_page.set_page(copy(page))
+                        break
+            return root_page.get_page()
+        registry = self.get_page_registry()
+        if registry is not None:
+            registered_page = registry.get_page(
+                root_page.pk, root_page.specific_class or type(root_page)
+            )
+            if registered_page is not None:
+                return registered_page
+        return root_page.specific
 
     def get_parent_page_for_menu_items(self):
         return self.root_page
@@ -774,7 +1248,7 @@ class SectionMenu(DefinesSubMenuTemplatesMixin, MenuFromPage):
     def get_context_data(self, **kwargs):
         data = {
             'show_section_root': self._option_vals.extra['show_section_root'],
-            'section_root': self.root_page,
+            'section_root': self.section_root,
         }
         data.update(kwargs)
         return super().get_context_data(**data)
@@ -819,7 +1293,15 @@ class ChildrenMenu(DefinesSubMenuTemplatesMixin, MenuFromPage):
 
     @classmethod
     def get_least_specific_template_name(cls):
-        return settings.DEFAULT_CHILDREN_MENU_TEMPLATE
+        return rendering_settings.DEFAULT_CHILDREN_MENU_TEMPLATE
+
+    @classmethod
+    def get_rendered_output_cache_key_parts(cls, contextual_vals, option_vals):
+        # The current page is used when no 'parent_page' is supplied
+        current_page = contextual_vals.current_page
+        return super().get_rendered_output_cache_key_parts(
+            contextual_vals, option_vals
+        ) + (current_page.pk if current_page else None,)
 
     def __init__(self, parent_page, max_levels):
         self.parent_page = parent_page
@@ -839,6 +1321,8 @@ class SubMenu(MenuFromPage):
     menu_short_name = 'sub'  # used to find templates
     menu_instance_context_name = 'sub_menu'
     related_templatetag_name = 'sub_menu'
+    # Sub menus are cached as part of the original menu's output
+    cache_rendered_output = False
 
     @classmethod
     def render_from_tag(
@@ -873,6 +1357,10 @@ class SubMenu(MenuFromPage):
         self.parent_page = parent_page
         self.max_levels = max_levels
 
+    def get_request_registry_key(self):
+        # Page data is always taken from the original menu
+        return None
+
     def get_parent_page_for_menu_items(self):
         return self.parent_page
 
@@ -882,6 +1370,13 @@ class SubMenu(MenuFromPage):
         """
         return self.original_menu.get_children_for_page(self.parent_page)
 
+    def get_localized_pages(self):
+        return self.original_menu.get_localized_pages()
+
+    @cached_property
+    def url_resolver(self):
+        return self.original_menu.url_resolver
+
     def get_template(self):
         if self._option_vals.template_name or self.template_name:
             return super().get_template()
@@ -925,20 +1420,24 @@ class MenuWithMenuItems(ClusterableModel, Menu):
     def _get_menu_items_related_name(cls):
         return getattr(settings, cls.menu_items_relation_setting_name)
 
-    def get_base_menuitem_queryset(self):
-        qs = self.get_menu_items_manager().for_display()
-
+    @staticmethod
+    def _select_minimal_link_page_values(queryset):
         # Prefetch minimal page values only. The rest will be
         # fetched by get_pages_for_display()
-        qs = qs.select_related('link_page').defer(*[
+        return queryset.select_related('link_page').defer(*[
             'link_page__{}'.format(f.name) for f in Page._meta.get_fields()
             if f.concrete and f.name not in ('id', 'path', 'depth')
         ])
 
+    def get_base_menuitem_queryset(self):
+        qs = self._select_minimal_link_page_values(
+            self.get_menu_items_manager().for_display()
+        )
+
         # allow hooks to modify the queryset
-        for hook in hooks.get_hooks('menus_modify_base_menuitem_queryset'):
-            qs = hook(qs, **self.common_hook_kwargs)
-        return qs
+        return apply_menu_hooks(
+            'menus_modify_base_menuitem_queryset', qs, self
+        )
 
     def get_menu_items_manager(self):
         relationship_name = self._get_menu_items_related_name()
@@ -959,9 +1458,16 @@ class MenuWithMenuItems(ClusterableModel, Menu):
     def get_top_level_items(self):
         """Return a list of menu items with prefetched `link_page` values"""
 
-        menu_items = self.get_base_menuitem_queryset()
-        # allow this query result to be reused by get_pages_for_display()
-        self._raw_menu_items = menu_items
+        if hasattr(self, '_raw_menu_items'):
+            # load_tree_from_cache() may have set this
+            menu_items = self._raw_menu_items
+        else:
+            registered_menu = self.get_registered_menu()
+            if registered_menu is not None:
+                return list(registered_menu.top_level_items)
+            menu_items = self.get_base_menuitem_queryset()
+            # allow this query result to be reused by get_pages_for_display()
+            self._raw_menu_items = menu_items
 
         top_level_items = []
         for item in menu_items:
@@ -993,28 +1499,36 @@ class MenuWithMenuItems(ClusterableModel, Menu):
         else:
             menu_items = self.get_base_menuitem_queryset()
 
-        # Start with an empty queryset, and expand as needed
-        queryset = Page.objects.none()
-
+        branches = []
+        single_pages = []
         for item in (item for item in menu_items if item.link_page):
             if(
                 item.allow_subnav and
-                item.link_page.depth >= settings.SECTION_ROOT_DEPTH
+                item.link_page.depth >= rendering_settings.SECTION_ROOT_DEPTH
             ):
-                # Add this branch to the overall `queryset`
-                queryset = queryset | Page.objects.filter(
-                    path__startswith=item.link_page.path,
-                    depth__lt=item.link_page.depth + self.max_levels,
-                )
+                # Include this page and its descendants
+                branches.append((
+                    item.link_page.path,
+                    item.link_page.depth + self.max_levels - 1,
+                ))
             else:
-                # Add this page only to the overall `queryset`
-                queryset = queryset | Page.objects.filter(id=item.link_page_id)
+                # Include this page only
+                single_pages.append(item.link_page)
 
         # Filter out pages unsutable display
-        queryset = self.get_base_page_queryset() & queryset
+        queryset = self.get_base_page_queryset()
+
+        # Overlapping branches are merged, and pages are matched using path
+        # ranges, which (unlike OR-ed 'path__startswith' filters) can make
+        # use of the index on 'path'
+        tree_q = get_page_tree_q(branches, single_pages)
+        if tree_q is None:
+            queryset = queryset.none()
+        else:
+            queryset = queryset.filter(tree_q)
 
-        # Always return 'specific' page instances
-        return queryset.specific()
+        # Return 'specific' page instances (where needed)
+        return specific_for_menus(queryset, self.get_page_registry())
 
     def add_menu_items_for_pages(self, pagequeryset=None, allow_subnav=True):
         """Add menu items to this menu, linking to each page in `pagequeryset`
@@ -1034,6 +1548,74 @@ class MenuWithMenuItems(ClusterableModel, Menu):
         if option_vals.max_levels is not None:
             self.max_levels = option_vals.max_levels
         super().prepare_to_render(request, contextual_vals, option_vals)
+        if (
+            rendering_settings.CACHE_MENU_TREES and
+            self.tree_is_cacheable() and
+            self.get_registered_menu() is None
+        ):
+            self.load_tree_from_cache()
+
+    def get_request_registry_key(self):
+        return (
+            type(self),
+            getattr(self, 'site_id', None),
+            self.pk,
+            self.max_levels,
+        )
+
+    def tree_is_cacheable(self):
+        """
+        Return a boolean indicating whether the menu items and pages for this
+        menu can be shared between requests. Hooks that modify the base
+        querysets receive request-specific arguments, so if any are
+        registered, the tree is always fetched from the database.
+        """
+        return not menu_hooks_registered(QUERYSET_HOOK_NAMES)
+
+    def get_tree_cache_key(self):
+        return make_cache_key(
+            'tree',
+            self._meta.label_lower,
+            getattr(self, 'site_id', None),
+            self.pk,
+            self.max_levels,
+        )
+
+    def load_tree_from_cache(self):
+        """
+        Populate ``top_level_items`` and ``pages_for_display`` from a
+        snapshot in the wagtailmenus cache, creating the snapshot first if
+        necessary. Snapshots are invalidated automatically whenever menus,
+        menu items or pages are changed.
+        """
+        cache = get_cache()
+        cache_key = self.get_tree_cache_key()
+        snapshot = cache.get(cache_key)
+
+        if snapshot is None:
+            self._raw_menu_items = list(self.get_base_menuitem_queryset())
+            # Only field values are stored. Menu items have this menu cached
+            # as their 'menu', and pages shared with other menus for the
+            # same request can have attributes set on them while rendering,
+            # both of which reference the request and template context
+            copies = {}
+            snapshot = MenuTreeSnapshot(
+                [
+                    get_storable_copy(item, (self,), copies)
+                    for item in self._raw_menu_items
+                ],
+                [
+                    get_storable_copy(page, (self,), copies)
+                    for page in self.pages_for_display.values()
+                ],
+            )
+            cache.set(cache_key, snapshot, rendering_settings.CACHE_TIMEOUT)
+            return
+
+        self._raw_menu_items = snapshot.menu_items
+        self.pages_for_display = OrderedDict(
+            (p.id, p) for p in snapshot.pages
+        )
 
     def get_raw_menu_items(self):
         return self.top_level_items
@@ -1106,20 +1688,71 @@ class AbstractMainMenu(DefinesSubMenuTemplatesMixin, MenuWithMenuItems):
 
     @classmethod
     def get_from_collected_values(cls, contextual_vals, option_vals):
-        try:
-            return cls.get_for_site(contextual_vals.current_site)
-        except cls.DoesNotExist:
-            return
+        return cls.get_existing_for_site(contextual_vals.current_site)
 
     @classmethod
     def get_for_site(cls, site):
-        """Return the 'main menu' instance for the provided site"""
+        """Return the 'main menu' instance for the provided site, creating
+        one if it doesn't exist yet"""
         instance, created = cls.objects.get_or_create(site=site)
         return instance
 
+    @classmethod
+    def get_existing_for_site(cls, site):
+        """
+        Return the 'main menu' instance for the provided site, or ``None`` if
+        no such menu exists. Unlike ``get_for_site()``, this never writes to
+        the database, so is used when rendering.
+
+        If the ``WAGTAILMENUS_CACHE_MENU_TREES`` setting is ``True``, menus
+        found are remembered by the current process, and a new copy is
+        returned for each call (without querying the database) until the
+        wagtailmenus cache version changes (see ``invalidate_menu_caches()``),
+        a main menu is saved or deleted, or ``WAGTAILMENUS_CACHE_TIMEOUT``
+        seconds have passed.
+        """
+        if site is None:
+            return None
+        if not rendering_settings.CACHE_MENU_TREES:
+            return cls.objects.filter(site=site).first()
+
+        key = (cls, site.pk)
+        version = get_cache_version()
+        try:
+            menu_version, expires, stored_menu = _main_menus[key]
+        except KeyError:
+            pass
+        else:
+            if menu_version == version and (
+                expires is None or monotonic() < expires
+            ):
+                menu = copy(stored_menu)
+                menu.site = site
+                return menu
+
+        menu = cls.objects.filter(site=site).first()
+        if menu is None:
+            _main_menus.pop(key, None)
+            return None
+        # Changes made by other processes are only noticed here if they share
+        # the cache holding the version token, so don't keep menus forever
+        timeout = rendering_settings.CACHE_TIMEOUT
+        expires = None if timeout is None else monotonic() + timeout
+        _main_menus[key] = (version, expires, get_storable_copy(menu))
+        menu.site = site
+        return menu
+
+    @classmethod
+    def clear_site_menu_ids(cls):
+        """
+        Forget the menus remembered by ``get_existing_for_site()``. Called
+        automatically whenever a main menu is saved or deleted.
+        """
+        _main_menus.clear()
+
     @classmethod
     def get_least_specific_template_name(cls):
-        return settings.DEFAULT_MAIN_MENU_TEMPLATE
+        return rendering_settings.DEFAULT_MAIN_MENU_TEMPLATE
 
     def __str__(self):
         return _('Main menu for %(site_name)s') % {
@@ -1213,14 +1846,126 @@ class AbstractFlatMenu(DefinesSubMenuTemplatesMixin, MenuWithMenuItems):
 
     @classmethod
     def get_from_collected_values(cls, contextual_vals, option_vals):
+        handle = option_vals.handle
+        site = contextual_vals.current_site
+        fall_back = option_vals.extra['fall_back_to_default_site_menus']
+
+        missing_menu_cache_key = None
+        if rendering_settings.CACHE_MISSING_FLAT_MENUS:
+            missing_menu_cache_key = cls.get_missing_menu_cache_key(
+                handle, site, fall_back
+            )
+            if get_cache().get(missing_menu_cache_key):
+                return
+
+        if cls.can_prefetch_for_request():
+            menu = cls.get_prefetched_for_site(
+                handle, site, fall_back,
+                get_request_registry(contextual_vals.request),
+            )
+        else:
+            try:
+                menu = cls.get_for_site(handle, site, fall_back)
+            except cls.DoesNotExist:
+                menu = None
+
+        if menu is None and missing_menu_cache_key:
+            get_cache().set(
+                missing_menu_cache_key, True, rendering_settings.CACHE_TIMEOUT
+            )
+        return menu
+
+    @classmethod
+    def get_missing_menu_cache_key(
+        cls, handle, site, fall_back_to_default_site_menus
+    ):
+        """
+        Return a key for caching the fact that no menu could be found for the
+        supplied ``handle``, ``site`` and ``fall_back_to_default_site_menus``
+        values. Keys are only invalidated when a menu with the same
+        ``handle`` is saved (see ``get_handle_cache_scope()``).
+        """
+        return make_cache_key(
+            'missing',
+            cls._meta.label_lower,
+            site.pk if site else None,
+            handle,
+            fall_back_to_default_site_menus,
+            scope=cls.get_handle_cache_scope(handle),
+        )
+
+    @classmethod
+    def get_handle_cache_scope(cls, handle):
+        return 'handle:%s:%s' % (cls._meta.label_lower, handle)
+
+    @classmethod
+    def can_prefetch_for_request(cls):
+        """
+        Return a boolean indicating whether all flat menus for the current
+        site can be fetched together and stored in the request registry.
+        Functions registered for the 'menus_modify_base_menuitem_queryset'
+        hook expect to be called for individual menu instances, so menus
+        are never prefetched while any are registered.
+        """
+        return bool(
+            rendering_settings.PREFETCH_FLAT_MENUS and
+            rendering_settings.REUSE_MENU_DATA_PER_REQUEST and
+            not get_menu_hooks('menus_modify_base_menuitem_queryset')
+        )
+
+    @classmethod
+    def prefetch_for_site(cls, site):
+        """
+        Return a dictionary of all menus for the provided ``site`` and the
+        default site, keyed by a ``(site_id, handle)`` tuple. Menu items (and
+        minimal page values for them) are prefetched, so only two queries are
+        needed, regardless of the number of menus.
+        """
+        related_name = cls._get_menu_items_related_name()
+        item_model = cls._meta.get_field(related_name).related_model
+        item_queryset = cls._select_minimal_link_page_values(
+            item_model._default_manager.for_display()
+        )
+        queryset = cls.objects.filter(
+            Q(site=site) | Q(site__is_default_site=True)
+        ).prefetch_related(models.Prefetch(
+            related_name,
+            queryset=item_queryset,
+            to_attr='_prefetched_menu_items',
+        ))
+        return {(menu.site_id, menu.handle): menu for menu in queryset}
+
+    @classmethod
+    def get_prefetched_for_site(
+        cls, handle, site, fall_back_to_default_site_menus=False,
+        registry=None
+    ):
+        """
+        An alternative to ``get_for_site()`` that finds a matching menu from
+        those returned by ``prefetch_for_site()``, which are stored in the
+        provided request ``registry`` to be reused by other menu tags.
+        Because instances are shared, a copy of the matching menu is
+        returned, with its prefetched menu items already set.
+        """
+        key = (cls, site.pk)
         try:
-            return cls.get_for_site(
-                option_vals.handle,
-                contextual_vals.current_site,
-                option_vals.extra['fall_back_to_default_site_menus']
+            menus = registry.flat_menus[key]
+        except KeyError:
+            menus = registry.flat_menus[key] = cls.prefetch_for_site(site)
+
+        menu = menus.get((site.pk, handle))
+        if menu is None and fall_back_to_default_site_menus:
+            default_site_menus = (
+                m for (site_id, menu_handle), m in menus.items()
+                if menu_handle == handle and site_id != site.pk
             )
-        except cls.DoesNotExist:
-            return
+            menu = next(default_site_menus, None)
+        if menu is None:
+            return None
+
+        menu = copy(menu)
+        menu._raw_menu_items = list(menu._prefetched_menu_items)
+        return menu
 
     @classmethod
     def get_for_site(cls, handle, site, fall_back_to_default_site_menus=False):
@@ -1242,7 +1987,7 @@ class AbstractFlatMenu(DefinesSubMenuTemplatesMixin, MenuWithMenuItems):
 
     @classmethod
     def get_least_specific_template_name(cls):
-        return settings.DEFAULT_FLAT_MENU_TEMPLATE
+        return rendering_settings.DEFAULT_FLAT_MENU_TEMPLATE
 
     def __str__(self):
         return '%s (%s)' % (self.title, self.handle)
@@ -1267,7 +2012,7 @@ class AbstractFlatMenu(DefinesSubMenuTemplatesMixin, MenuWithMenuItems):
         site = self._contextual_vals.current_site
         handle = self.handle
         template_names = []
-        if settings.SITE_SPECIFIC_TEMPLATE_DIRS and site:
+        if rendering_settings.SITE_SPECIFIC_TEMPLATE_DIRS and site:
             hostname = site.hostname
             template_names.extend([
                 "menus/%s/flat/%s/level_1.html" % (hostname, handle),
@@ -1304,7 +2049,7 @@ class AbstractFlatMenu(DefinesSubMenuTemplatesMixin, MenuWithMenuItems):
         site = self._contextual_vals.current_site
         handle = self.handle
         template_names = []
-        if settings.SITE_SPECIFIC_TEMPLATE_DIRS and site:
+        if rendering_settings.SITE_SPECIFIC_TEMPLATE_DIRS and site:
             hostname = site.hostname
             template_names.extend([
                 "menus/%s/flat/%s/level_%s.html" % (hostname, handle, level),
@@ -1326,7 +2071,7 @@ class AbstractFlatMenu(DefinesSubMenuTemplatesMixin, MenuWithMenuItems):
             "menus/%s_sub_menu.html" % handle,
             "menus/flat/level_%s.html" % level,
             "menus/flat/sub_menu.html",
-            settings.DEFAULT_SUB_MENU_TEMPLATE,
+            rendering_settings.DEFAULT_SUB_MENU_TEMPLATE,
         ])
         return template_names
 
@@ -1,6 +1,6 @@
-from django.template.loader import get_template, select_template
-
-from wagtailmenus.conf import settings
+from wagtailmenus.conf.rendering import rendering_settings
+from wagtailmenus.utils.templates import (get_menu_template,
+                                          select_menu_template)
 
 
 def get_item_by_index_or_last_item(items, index):
@@ -66,10 +66,10 @@ class DefinesSubMenuTemplatesMixin:
         template_name = self._get_specified_sub_menu_template_name(level)
         if template_name:
             # A template was specified somehow
-            template = get_template(template_name)
+            template = get_menu_template(template_name)
         else:
             # A template wasn't specified, so search the filesystem
-            template = select_template(
+            template = select_menu_template(
                 self.get_sub_menu_template_names(level)
             )
 
@@ -88,7 +88,7 @@ class DefinesSubMenuTemplatesMixin:
         menu_name = self.menu_short_name
         site = self._contextual_vals.current_site
 
-        if settings.SITE_SPECIFIC_TEMPLATE_DIRS and site:
+        if rendering_settings.SITE_SPECIFIC_TEMPLATE_DIRS and site:
             hostname = site.hostname
             template_names.extend([
                 "menus/%s/%s/level_%s.html" % (hostname, menu_name, level),
@@ -100,7 +100,7 @@ class DefinesSubMenuTemplatesMixin:
             "menus/%s/level_%s.html" % (menu_name, level),
             "menus/%s/sub_menu.html" % menu_name,
             "menus/%s_sub_menu.html" % menu_name,
-            settings.DEFAULT_SUB_MENU_TEMPLATE,
+            rendering_settings.DEFAULT_SUB_MENU_TEMPLATE,
         ])
         return template_names
 
@@ -7,9 +7,12 @@ from django.shortcuts import redirect
 from django.utils.translation import gettext_lazy as _
 from wagtail.models import Page
 
-from wagtailmenus.conf import settings
+from wagtailmenus.conf.rendering import rendering_settings
 from wagtailmenus.forms import LinkPageAdminForm
 from wagtailmenus.panels import linkpage_edit_handler, menupage_settings_panels
+from wagtailmenus.utils import active_classes
+from wagtailmenus.utils.nodes import MenuNode
+from wagtailmenus.utils.urls import page_class_has_custom_urls
 
 
 class MenuPageMixin(models.Model):
@@ -31,6 +34,9 @@ class MenuPageMixin(models.Model):
         )
     )
 
+    # Fields to load when ONLY_LOAD_MENU_FIELDS is True
+    menu_fields = ('repeat_in_subnav', 'repeated_item_text')
+
     class Meta:
         abstract = True
 
@@ -87,7 +93,7 @@ class MenuPageMixin(models.Model):
         override this method if you're creating a multilingual site and you
         have different translations of 'repeated_item_text' that you wish to
         surface."""
-        source_field_name = settings.PAGE_FIELD_FOR_MENU_ITEM_TEXT
+        source_field_name = rendering_settings.PAGE_FIELD_FOR_MENU_ITEM_TEXT
         return self.repeated_item_text or getattr(
             self, source_field_name, self.title
         )
@@ -99,30 +105,36 @@ class MenuPageMixin(models.Model):
         """Return something that can be used to display a 'repeated' menu item
         for this specific page."""
 
-        menuitem = copy(self)
-
-        # Set/reset 'text'
-        menuitem.text = self.get_text_for_repeated_menu_item(
+        text = self.get_text_for_repeated_menu_item(
             request, current_site, original_menu_tag
         )
 
-        # Set/reset 'href'
         if use_absolute_page_urls:
-            url = self.get_full_url(request=request)
+            href = self.get_full_url(request=request)
         else:
-            url = self.relative_url(current_site)
-        menuitem.href = url
+            href = self.relative_url(current_site)
 
-        # Set/reset 'active_class'
-        if apply_active_classes and self == current_page:
-            menuitem.active_class = settings.ACTIVE_CLASS
+        if apply_active_classes and rendering_settings.DEFER_ACTIVE_CLASSES:
+            active_class = active_classes.get_page_placeholder(
+                self, current_page_only=True
+            )
+        elif apply_active_classes and self == current_page:
+            active_class = rendering_settings.ACTIVE_CLASS
         else:
-            menuitem.active_class = ''
+            active_class = ''
+
+        if rendering_settings.USE_MENU_NODES:
+            return MenuNode(
+                self, self, text=text, href=href, active_class=active_class
+            )
 
-        # Set/reset 'has_children_in_menu' and 'sub_menu'
+        menuitem = copy(self)
+        menuitem.text = text
+        menuitem.href = href
+        menuitem.active_class = active_class
+        # Reset 'has_children_in_menu' and 'sub_menu'
         menuitem.has_children_in_menu = False
         menuitem.sub_menu = None
-
         return menuitem
 
 
@@ -171,6 +183,9 @@ class AbstractLinkPage(Page):
     search_fields = []  # Don't surface these pages in search results
     base_form_class = LinkPageAdminForm
 
+    # Fields to load when ONLY_LOAD_MENU_FIELDS is True
+    menu_fields = ('link_page', 'link_url', 'url_append', 'extra_classes')
+
     class Meta:
         abstract = True
 
@@ -184,7 +199,7 @@ class AbstractLinkPage(Page):
     def menu_text(self, request=None):
         """Return a string to use as link text when this page appears in
         menus."""
-        source_field_name = settings.PAGE_FIELD_FOR_MENU_ITEM_TEXT
+        source_field_name = rendering_settings.PAGE_FIELD_FOR_MENU_ITEM_TEXT
         if(
             source_field_name != 'menu_text' and
             hasattr(self, source_field_name)
@@ -255,7 +270,16 @@ class AbstractLinkPage(Page):
         if not self.link_page:
             return ''
 
-        p = self.link_page.specific  # for tidier referencing below
+        p = self.link_page  # for tidier referencing below
+        specific_class = p.specific_class
+        if (
+            specific_class is not None and
+            not isinstance(p, specific_class) and
+            page_class_has_custom_urls(specific_class)
+        ):
+            # Specific instances are only needed for pages that generate
+            # their own URLs
+            p = p.specific
         if full_url:
             return p.get_full_url(request=request)
         return p.get_url(request=request, current_site=current_site)
@@ -0,0 +1,189 @@
+"""
+Built-in alternatives to rendering menus with templates, which can be
+selected for individual menu tags using the ``renderer`` option. For example:
+
+.. code-block:: html
+
+    {% main_menu renderer="fast" %}
+"""
+from django.utils.html import conditional_escape as esc
+from django.utils.safestring import mark_safe
+
+from wagtailmenus.utils.nodes import get_linked_page
+
+
+def _get(item, name):
+    # Look up values in the same way as templates, where menu items might be
+    # dictionaries (e.g. added by 'modify_submenu_items()' methods), and
+    # missing values are output as empty strings
+    if isinstance(item, dict):
+        return item.get(name, '')
+    return getattr(item, name, '')
+
+
+class FastMenuRenderer:
+    """
+    Renders main, flat, section and children menus (and any sub menus) with
+    the same markup as wagtailmenus' default templates, by joining strings
+    together in a single pass over the primed menu items. Sub menus are
+    created directly from the values of the parent menu instance, without
+    rendering any templates or building any template contexts.
+
+    Any templates specified for the menu (using options or class
+    attributes) are ignored.
+    """
+
+    def render(self, menu):
+        """
+        Return the rendered output for ``menu``, or ``None`` if this
+        renderer doesn't support that type of menu.
+        """
+        method = getattr(self, 'render_%s_menu' % menu.menu_short_name, None)
+        if method is None:
+            return None
+        return mark_safe(method(menu))
+
+    def render_main_menu(self, menu):
+        # Replicates 'menus/bootstrap3/main_menu_dropdown.html'
+        parts = ['<ul class="nav navbar-nav">']
+        for item in menu.get_menu_items_for_rendering():
+            link_page = _get(item, 'link_page')
+            parts.append(self.render_dropdown_item(
+                menu, item, getattr(link_page, 'pk', '')
+            ))
+        parts.append('</ul>')
+        return ''.join(parts)
+
+    def render_flat_menu(self, menu):
+        # Replicates 'menus/flat_menu.html'
+        heading = menu.get_heading()
+        parts = ['<div class="flat-menu %s %s">' % (
+            esc(menu.handle), 'with_heading' if heading else 'no_heading'
+        )]
+        if menu._option_vals.extra['show_menu_heading'] and heading:
+            parts.append('<h4>%s</h4>' % heading)
+        parts.append(self.render_items(
+            menu, menu.get_menu_items_for_rendering()
+        ))
+        parts.append('</div>')
+        return ''.join(parts)
+
+    def render_section_menu(self, menu):
+        # Replicates 'menus/section_menu.html'
+        items = menu.get_menu_items_for_rendering()
+        if not items:
+            return ''
+        parts = ['<nav class="nav-section" role="navigation">']
+        section_root = menu.section_root
+        if menu._option_vals.extra['show_section_root'] and section_root:
+            parts.append('<a href="%s" class="%s section_root">%s</a>' % (
+                esc(section_root.href), esc(section_root.active_class),
+                esc(section_root.text),
+            ))
+        parts.append(self.render_items(menu, items))
+        parts.append('</nav>')
+        return ''.join(parts)
+
+    def render_children_menu(self, menu):
+        # Replicates 'menus/children_menu.html'
+        return self.render_items(menu, menu.get_menu_items_for_rendering())
+
+    def render_items(self, menu, items):
+        # Replicates 'menus/sub_menu.html'
+        if not items:
+            return ''
+        parts = ['<ul>']
+        for item in items:
+            parts.append('<li class="%s"><a href="%s">%s</a>' % (
+                esc(_get(item, 'active_class')), esc(_get(item, 'href')),
+                esc(_get(item, 'text')),
+            ))
+            if _get(item, 'has_children_in_menu'):
+                sub_menu = self.get_sub_menu(menu, item)
+                parts.append(self.render_items(
+                    sub_menu, sub_menu.get_menu_items_for_rendering()
+                ))
+            parts.append('</li>')
+        parts.append('</ul>')
+        return ''.join(parts)
+
+    def render_dropdown_item(self, menu, item, toggle_id):
+        if not _get(item, 'has_children_in_menu'):
+            return '<li class="%s"><a href="%s">%s</a></li>' % (
+                esc(_get(item, 'active_class')), esc(_get(item, 'href')),
+                esc(_get(item, 'text')),
+            )
+        return (
+            '<li class="%s dropdown"><a href="%s" class="dropdown-toggle" '
+            'id="ddtoggle_%s" data-toggle="dropdown" aria-haspopup="true" '
+            'aria-expanded="false">%s <span class="caret"></span></a>%s</li>'
+        ) % (
+            esc(_get(item, 'active_class')), esc(_get(item, 'href')),
+            esc(toggle_id), esc(_get(item, 'text')),
+            self.render_dropdown_sub_menu(menu, item),
+        )
+
+    def render_dropdown_sub_menu(self, menu, item):
+        # Replicates 'menus/bootstrap3/sub_menu_dropdown.html'
+        sub_menu = self.get_sub_menu(menu, item)
+        items = sub_menu.get_menu_items_for_rendering()
+        if not items:
+            return ''
+        parts = ['<ul class="dropdown-menu" aria-labelledby="ddtoggle_%s">' % (
+            esc(sub_menu.parent_page.pk)
+        )]
+        for sub_item in items:
+            parts.append(self.render_dropdown_item(
+                sub_menu, sub_item, _get(sub_item, 'pk')
+            ))
+        parts.append('</ul>')
+        return ''.join(parts)
+
+    def get_sub_menu(self, menu, item):
+        """
+        Return a prepared sub menu instance for ``item``, which belongs to
+        ``menu``, in the same way that the ``{% sub_menu %}`` tag would.
+        """
+        if _get(item, 'sub_menu'):
+            # Created by prime_menu_items() already
+            return item.sub_menu
+
+        ctx_vals = menu._contextual_vals
+        original_menu = ctx_vals.original_menu_instance or menu
+        # Values are derived from the parent menu's, rather than collected
+        # from a template context
+        sub_menu_ctx_vals = ctx_vals._replace(
+            current_level=ctx_vals.current_level + 1,
+            original_menu_instance=original_menu,
+        )
+        sub_menu_opt_vals = menu._option_vals._replace(
+            max_levels=menu.max_levels,
+            add_sub_menus_inline=False,
+            parent_page=get_linked_page(item),
+            handle=None,
+            template_name='',
+            sub_menu_template_name='',
+            sub_menu_template_names=None,
+            extra={},
+        )
+        menu_class = original_menu.get_sub_menu_class()
+        return menu_class._prepare_object_from_collected_values(
+            {'request': ctx_vals.request}, sub_menu_ctx_vals, sub_menu_opt_vals
+        )
+
+RENDERERS = {
+    'fast': FastMenuRenderer,
+}
+
+
+def get_renderer(name):
+    """
+    Return an instance of the renderer registered with the supplied ``name``.
+    """
+    try:
+        return RENDERERS[name]()
+    except KeyError:
+        raise ValueError(
+            "'%s' is not a valid renderer. The available renderers are: %s."
+            % (name, ', '.join(sorted(RENDERERS)))
+        )
@@ -0,0 +1,61 @@
+from django.db.models.signals import post_delete, post_save
+from wagtail.models import Page, Site
+from wagtail.signals import page_published, page_unpublished, post_page_move
+
+from wagtailmenus.models.menuitems import AbstractMenuItem
+from wagtailmenus.conf import settings
+from wagtailmenus.models.menus import (AbstractFlatMenu, AbstractMainMenu,
+                                       MenuWithMenuItems)
+from wagtailmenus.utils.cache import invalidate_menu_caches
+
+MENU_RELATED_MODELS = (MenuWithMenuItems, AbstractMenuItem)
+
+
+def invalidate_on_page_change(sender, **kwargs):
+    invalidate_menu_caches()
+
+
+def invalidate_on_menu_change(sender, instance, **kwargs):
+    if isinstance(instance, MENU_RELATED_MODELS):
+        invalidate_menu_caches()
+    if isinstance(instance, AbstractMainMenu):
+        AbstractMainMenu.clear_site_menu_ids()
+    if isinstance(instance, AbstractFlatMenu):
+        # A menu may now exist for a previously 'missing' handle
+        invalidate_menu_caches(
+            scope=instance.get_handle_cache_scope(instance.handle)
+        )
+
+
+def invalidate_on_delete(sender, instance, **kwargs):
+    if isinstance(instance, MENU_RELATED_MODELS + (Page,)):
+        invalidate_menu_caches()
+    if isinstance(instance, AbstractMainMenu):
+        AbstractMainMenu.clear_site_menu_ids()
+
+
+def create_main_menu_for_new_site(sender, instance, created, raw=False,
+                                  **kwargs):
+    if created and not raw:
+        settings.models.MAIN_MENU_MODEL.get_for_site(instance)
+
+
+def register_signal_handlers():
+    post_save.connect(
+        invalidate_on_menu_change,
+        dispatch_uid='wagtailmenus_invalidate_on_menu_change'
+    )
+    post_delete.connect(
+        invalidate_on_delete,
+        dispatch_uid='wagtailmenus_invalidate_on_delete'
+    )
+    post_save.connect(
+        create_main_menu_for_new_site,
+        sender=Site,
+        dispatch_uid='wagtailmenus_create_main_menu_for_new_site'
+    )
+    for signal in (page_published, page_unpublished, post_page_move):
+        signal.connect(
+            invalidate_on_page_change,
+            dispatch_uid='wagtailmenus_invalidate_on_page_change'
+        )
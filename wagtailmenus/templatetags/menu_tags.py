@@ -1,9 +1,9 @@
 from django.template import Library
-from wagtail.models import Page
 
 from wagtailmenus.conf import settings
 from wagtailmenus.errors import SubMenuUsageError
 from wagtailmenus.utils.misc import validate_supplied_values
+from wagtailmenus.utils.nodes import get_linked_page
 
 register = Library()
 
@@ -167,10 +167,7 @@ def sub_menu(
     if add_sub_menus_inline is None:
         add_sub_menus_inline = context.get('add_sub_menus_inline', False)
 
-    if isinstance(menuitem_or_page, Page):
-        parent_page = menuitem_or_page
-    else:
-        parent_page = menuitem_or_page.link_page
+    parent_page = get_linked_page(menuitem_or_page)
 
     original_menu = context.get('original_menu_instance')
     if original_menu is None:
@@ -8,6 +8,7 @@ from wagtail.contrib.routable_page.models import RoutablePageMixin, route
 from wagtail.models import Page
 
 from wagtailmenus.models import AbstractLinkPage, MenuPage
+from wagtailmenus.utils.nodes import MenuNode
 
 from .utils import TranslatedField
 
@@ -68,7 +69,10 @@ class MultilingualMenuPage(MenuPage):
         item = super().get_repeated_menu_item(
             current_page, current_site, apply_active_classes,
             original_menu_tag, request, use_absolute_page_urls)
-        item.text = self.translated_repeated_item_text or self.translated_title
+        text = self.translated_repeated_item_text or self.translated_title
+        if isinstance(item, MenuNode):
+            return item.replace(text=text)
+        item.text = text
         return item
 
     settings_panels = [
@@ -2,6 +2,7 @@ from django.test import TestCase
 
 from wagtailmenus.models import FlatMenu
 from wagtailmenus.tests import base, utils
+from wagtailmenus.utils.registry import RequestRegistry
 
 Page = utils.get_page_model()
 Site = utils.get_site_model()
@@ -84,6 +85,67 @@ class TestGetForSite(FlatMenuTestCase):
             self.assertEqual(result.site_id, self.not_default_site.id)
 
 
+class TestGetPrefetchedForSite(TestGetForSite):
+    """Unit tests for AbstractFlatMenu.get_prefetched_for_site()"""
+
+    def setUp(self):
+        super().setUp()
+        self.registry = RequestRegistry()
+
+    def test_returns_none_if_no_match_for_supplied_site_and_fall_back_to_default_site_menus_is_false(self):
+        FlatMenu.objects.filter(site=self.not_default_site, handle='test-1').delete()
+
+        with self.assertNumQueries(2):
+            result = FlatMenu.get_prefetched_for_site(
+                'test-1', self.not_default_site, False, self.registry
+            )
+        self.assertIs(result, None)
+
+    def test_returns_menu_for_default_site_if_no_match_for_supplied_site_and_fall_back_to_default_site_menus_is_true(self):
+        FlatMenu.objects.filter(site=self.not_default_site, handle='test-1').delete()
+
+        with self.assertNumQueries(2):
+            result = FlatMenu.get_prefetched_for_site(
+                'test-1', self.not_default_site, True, self.registry
+            )
+        self.assertEqual(
+            result,
+            FlatMenu.objects.get(site=self.default_site, handle='test-1')
+        )
+
+    def test_returns_provided_site_matches_over_default_site_matches(self):
+        with self.assertNumQueries(2):
+            results = [
+                FlatMenu.get_prefetched_for_site(
+                    handle, self.not_default_site, True, self.registry
+                )
+                for handle in ('test-1', 'test-2', 'test-3')
+            ]
+        for result in results:
+            self.assertEqual(result.site_id, self.not_default_site.id)
+
+    def test_returns_copies_with_menu_items_set(self):
+        menu = FlatMenu.objects.get(site=self.site, handle='test-1')
+        menu.add_menu_items_for_pages(Page.objects.all())
+        expected_page_ids = list(
+            menu.get_menu_items_manager().values_list('link_page_id', flat=True)
+        )
+        self.assertTrue(expected_page_ids)
+        with self.assertNumQueries(2):
+            first = FlatMenu.get_prefetched_for_site(
+                'test-1', self.site, True, self.registry
+            )
+            second = FlatMenu.get_prefetched_for_site(
+                'test-1', self.site, True, self.registry
+            )
+        self.assertEqual(
+            [item.link_page_id for item in first._raw_menu_items],
+            expected_page_ids
+        )
+        self.assertIsNot(first, second)
+        self.assertIsNot(first._raw_menu_items, second._raw_menu_items)
+
+
 class TestGetSubMenuTemplateNames(
     FlatMenuTestCase, base.GetSubMenuTemplateNamesMethodTestCase
 ):
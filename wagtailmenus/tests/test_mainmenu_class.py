@@ -1,9 +1,14 @@
-from django.test import TestCase
+from time import monotonic
+from unittest import mock
+
+from django.test import TestCase, override_settings
 
 from wagtailmenus.models import MainMenu
 from wagtailmenus.tests import base, utils
+from wagtailmenus.utils.cache import get_cache, invalidate_menu_caches
 
 Page = utils.get_page_model()
+Site = utils.get_site_model()
 
 
 class MainMenuTestCase(TestCase):
@@ -31,6 +36,88 @@ class TestMainMenuGeneralMethods(MainMenuTestCase):
             menu.create_from_collected_values(None, None)
 
 
+class TestGetExistingForSite(MainMenuTestCase):
+    """Unit tests for AbstractMainMenu.get_existing_for_site()"""
+
+    def setUp(self):
+        get_cache().clear()
+        MainMenu.clear_site_menu_ids()
+        self.site = Site.objects.get(is_default_site=True)
+
+    def test_returns_menu_without_creating(self):
+        menu = MainMenu.get_existing_for_site(self.site)
+        self.assertEqual(menu, MainMenu.objects.get(site=self.site))
+
+        MainMenu.objects.all().delete()
+        self.assertIsNone(MainMenu.get_existing_for_site(self.site))
+        self.assertFalse(MainMenu.objects.exists())
+
+    def test_finds_changes_without_invalidation_by_default(self):
+        menu = MainMenu.get_existing_for_site(self.site)
+        # Simulate the menu being changed by another process, whose changes
+        # can't be detected by this one
+        MainMenu.objects.filter(pk=menu.pk).update(max_levels=4)
+        with self.assertNumQueries(1):
+            menu = MainMenu.get_existing_for_site(self.site)
+        self.assertEqual(menu.max_levels, 4)
+
+    @override_settings(WAGTAILMENUS_CACHE_MENU_TREES=True)
+    def test_remembered_menus_expire(self):
+        menu = MainMenu.get_existing_for_site(self.site)
+        MainMenu.objects.filter(pk=menu.pk).update(max_levels=4)
+        self.assertEqual(
+            MainMenu.get_existing_for_site(self.site).max_levels,
+            menu.max_levels
+        )
+        with mock.patch(
+            'wagtailmenus.models.menus.monotonic',
+            return_value=monotonic() + 3601
+        ):
+            self.assertEqual(
+                MainMenu.get_existing_for_site(self.site).max_levels, 4
+            )
+
+    @override_settings(WAGTAILMENUS_CACHE_MENU_TREES=True)
+    def test_remembers_menus(self):
+        first_menu = MainMenu.get_existing_for_site(self.site)
+        first_menu.request = 'request'
+        with self.assertNumQueries(0):
+            menu = MainMenu.get_existing_for_site(self.site)
+            # The site should not need fetching again
+            menu.site
+        self.assertEqual(menu, first_menu)
+        self.assertEqual(menu.max_levels, first_menu.max_levels)
+        # A separate instance is returned each time
+        self.assertIsNot(menu, first_menu)
+        self.assertFalse(hasattr(menu, 'request'))
+
+    @override_settings(WAGTAILMENUS_CACHE_MENU_TREES=True)
+    def test_finds_changes_after_cache_invalidation(self):
+        menu = MainMenu.get_existing_for_site(self.site)
+        # Simulate the menu being changed by another process, which would
+        # also invalidate the (shared) wagtailmenus cache
+        MainMenu.objects.filter(pk=menu.pk).update(max_levels=4)
+        invalidate_menu_caches()
+        self.assertEqual(MainMenu.get_existing_for_site(self.site).max_levels, 4)
+
+    @override_settings(WAGTAILMENUS_CACHE_MENU_TREES=True)
+    def test_finds_replacement_menus(self):
+        old_menu = MainMenu.get_existing_for_site(self.site)
+        old_menu.delete()
+        new_menu = MainMenu.objects.create(site=self.site)
+        self.assertEqual(MainMenu.get_existing_for_site(self.site), new_menu)
+
+    @override_settings(WAGTAILMENUS_CACHE_MENU_TREES=True)
+    def test_menus_forgotten_when_menus_saved(self):
+        menu = MainMenu.get_existing_for_site(self.site)
+        menu.max_levels = 4
+        menu.save()
+        with self.assertNumQueries(1) as context:
+            menu = MainMenu.get_existing_for_site(self.site)
+        self.assertIn('."site_id" = %s' % self.site.pk, context.captured_queries[0]['sql'])
+        self.assertEqual(menu.max_levels, 4)
+
+
 class TestTopLevelItems(MainMenuTestCase):
 
     # ------------------------------------------------------------------------
@@ -0,0 +1,295 @@
+from unittest import mock
+
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase, override_settings
+from wagtail import hooks
+from wagtail.models import Page, Site
+
+from wagtailmenus.models import FlatMenu, MainMenu
+from wagtailmenus.tests import utils
+from wagtailmenus.utils.cache import get_cache
+
+
+class MenuCacheTestCase(TestCase):
+    fixtures = ['test.json']
+
+    def setUp(self):
+        get_cache().clear()
+        self.site = Site.objects.get(is_default_site=True)
+        self.request = self.make_request()
+
+    def make_request(self, url='/'):
+        request = RequestFactory().get(url)
+        request._wagtail_site = self.site
+        return request
+
+    def get_prepared_menu(self, menu):
+        # Use a new request each time, so that data isn't reused
+        request = self.make_request()
+        menu.prepare_to_render(
+            request,
+            utils.make_contextualvals_instance(
+                request=request, current_site=self.site
+            ),
+            utils.make_optionvals_instance(max_levels=None),
+        )
+        return menu
+
+    def get_rendered_item_texts(self, menu):
+        return [item.text for item in menu.get_menu_items_for_rendering()]
+
+
+@override_settings(WAGTAILMENUS_CACHE_MENU_TREES=True)
+class TestMenuTreeCaching(MenuCacheTestCase):
+
+    def test_warm_main_menu_tree_uses_no_queries(self):
+        cold_menu = self.get_prepared_menu(MainMenu.objects.get(pk=1))
+        expected_texts = self.get_rendered_item_texts(cold_menu)
+
+        warm_menu = MainMenu.objects.get(pk=1)
+        with self.assertNumQueries(0):
+            self.get_prepared_menu(warm_menu)
+            self.assertEqual(len(warm_menu.pages_for_display), 12)
+            self.assertEqual(
+                self.get_rendered_item_texts(warm_menu), expected_texts
+            )
+
+    def test_warm_flat_menu_tree_uses_no_queries(self):
+        menu = FlatMenu.objects.get(handle='footer', site=self.site)
+        self.get_prepared_menu(menu).top_level_items
+
+        warm_menu = FlatMenu.objects.get(handle='footer', site=self.site)
+        with self.assertNumQueries(0):
+            self.get_prepared_menu(warm_menu).top_level_items
+
+    def test_menu_tags_render_from_cached_trees(self):
+        # The first response stores the trees, and the second reuses them
+        cold_response = self.client.get('/about-us/')
+        self.assertEqual(cold_response.status_code, 200)
+        warm_response = self.client.get('/about-us/')
+        self.assertEqual(warm_response.status_code, 200)
+        self.assertHTMLEqual(
+            warm_response.content.decode(), cold_response.content.decode()
+        )
+        self.assertContains(warm_response, 'Meet the team')
+
+    def test_menu_item_changes_invalidate_tree(self):
+        self.get_prepared_menu(MainMenu.objects.get(pk=1)).top_level_items
+
+        item = MainMenu.objects.get(pk=1).get_menu_items_manager().first()
+        item.link_text = 'Changed text'
+        item.save()
+
+        menu = self.get_prepared_menu(MainMenu.objects.get(pk=1))
+        self.assertIn('Changed text', self.get_rendered_item_texts(menu))
+
+    def test_page_unpublish_invalidates_tree(self):
+        menu = self.get_prepared_menu(MainMenu.objects.get(pk=1))
+        self.assertEqual(len(menu.pages_for_display), 12)
+
+        Page.objects.get(url_path='/home/about-us/meet-the-team/').unpublish()
+
+        menu = self.get_prepared_menu(MainMenu.objects.get(pk=1))
+        self.assertEqual(len(menu.pages_for_display), 11)
+
+    def test_tree_not_cached_when_queryset_hooks_registered(self):
+        def modify_queryset(queryset, **kwargs):
+            return queryset
+
+        with hooks.register_temporarily(
+            'menus_modify_base_page_queryset', modify_queryset
+        ):
+            self.get_prepared_menu(MainMenu.objects.get(pk=1)).top_level_items
+            menu = self.get_prepared_menu(MainMenu.objects.get(pk=1))
+            with self.assertNumQueries(7):
+                menu.top_level_items
+
+
+@override_settings(WAGTAILMENUS_CACHE_RENDERED_MENUS=True)
+class TestRenderedMenuCaching(MenuCacheTestCase):
+
+    def get_context_for_url(self, url):
+        request = self.make_request(url)
+        page = Page.objects.get(url_path='/home' + url).specific
+        return Context({
+            'request': request,
+            'wagtailmenus_vals': {
+                'current_page': page,
+                'section_root': None,
+                'current_page_ancestor_ids': tuple(
+                    page.get_ancestors(inclusive=True).filter(
+                        depth__gte=3).values_list('id', flat=True)
+                ),
+            }
+        })
+
+    def test_second_render_uses_no_queries(self):
+        template = Template('{% load menu_tags %}{% flat_menu "footer" %}')
+        context = self.get_context_for_url('/about-us/')
+        expected_output = template.render(context)
+
+        context = self.get_context_for_url('/about-us/')
+        with self.assertNumQueries(0):
+            output = template.render(context)
+        self.assertEqual(output, expected_output)
+
+    def test_output_without_active_classes_is_shared_between_pages(self):
+        template = Template('{% load menu_tags %}{% flat_menu "footer" %}')
+        expected_output = template.render(
+            self.get_context_for_url('/about-us/')
+        )
+        context = self.get_context_for_url('/news-and-events/')
+        with self.assertNumQueries(0):
+            output = template.render(context)
+        self.assertEqual(output, expected_output)
+
+    def test_output_with_active_classes_differs_between_pages(self):
+        template = Template('{% load menu_tags %}{% main_menu %}')
+        about_us_output = template.render(
+            self.get_context_for_url('/about-us/')
+        )
+        news_output = template.render(
+            self.get_context_for_url('/news-and-events/')
+        )
+        self.assertNotEqual(about_us_output, news_output)
+        self.assertEqual(
+            about_us_output,
+            template.render(self.get_context_for_url('/about-us/'))
+        )
+
+    def test_output_with_active_classes_shared_by_pages_outside_menu(self):
+        # Neither page (nor any of their ancestors) is in the main menu
+        template = Template('{% load menu_tags %}{% main_menu %}')
+        expected_output = template.render(
+            self.get_context_for_url('/legal/accessibility/')
+        )
+        context = self.get_context_for_url('/legal/privacy-policy/')
+        cache = get_cache()
+        with mock.patch.object(cache, 'set_many') as set_many:
+            with self.assertNumQueries(0):
+                output = template.render(context)
+        set_many.assert_not_called()
+        self.assertEqual(output, expected_output)
+        self.assertNotIn('active', output)
+
+    def test_cached_output_matches_uncached_output(self):
+        urls = TestDeferredActiveClasses.test_urls + (
+            '/legal/accessibility/', '/legal/privacy-policy/',
+        )
+        with self.settings(WAGTAILMENUS_CACHE_RENDERED_MENUS=False):
+            expected_output = [self.client.get(url).content for url in urls]
+        for path_based in (False, True):
+            get_cache().clear()
+            with self.settings(
+                WAGTAILMENUS_PATH_BASED_ACTIVE_CLASSES=path_based
+            ):
+                # Render twice to ensure cached output is used for some pages
+                for i in range(2):
+                    self.assertEqual(
+                        [self.client.get(url).content for url in urls],
+                        expected_output
+                    )
+
+
+class TestDeferredActiveClasses(MenuCacheTestCase):
+
+    test_urls = (
+        '/',
+        '/about-us/',
+        '/about-us/meet-the-team/',
+        '/about-us/meet-the-team/staff-member-one/',
+        '/superheroes/marvel-comics/',
+        '/news-and-events/',
+        '/custom-url/',
+    )
+
+    def get_responses(self):
+        return [self.client.get(url).content for url in self.test_urls]
+
+    def test_output_matches_non_deferred_output(self):
+        expected_output = self.get_responses()
+        with self.settings(WAGTAILMENUS_DEFER_ACTIVE_CLASSES=True):
+            self.assertEqual(self.get_responses(), expected_output)
+
+    def test_cached_output_matches_non_deferred_output(self):
+        expected_output = self.get_responses()
+        with self.settings(
+            WAGTAILMENUS_DEFER_ACTIVE_CLASSES=True,
+            WAGTAILMENUS_CACHE_RENDERED_MENUS=True,
+        ):
+            # Render twice to ensure cached output is used for some pages
+            self.assertEqual(self.get_responses(), expected_output)
+            self.assertEqual(self.get_responses(), expected_output)
+
+    def test_rendered_output_is_shared_between_pages(self):
+        template = Template('{% load menu_tags %}{% main_menu %}')
+
+        def get_context(page):
+            return Context({
+                'request': self.request,
+                'wagtailmenus_vals': {
+                    'current_page': page,
+                    'current_page_ancestor_ids': (page.pk,),
+                },
+            })
+
+        about_us = Page.objects.get(url_path='/home/about-us/')
+        news = Page.objects.get(url_path='/home/news-and-events/')
+        with self.settings(
+            WAGTAILMENUS_DEFER_ACTIVE_CLASSES=True,
+            WAGTAILMENUS_CACHE_RENDERED_MENUS=True,
+        ):
+            template.render(get_context(about_us))
+            with self.assertNumQueries(0):
+                output = template.render(get_context(news))
+        self.assertNotIn('[[wagtailmenus:', output)
+        self.assertIn('class="active dropdown"', output)
+
+
+@override_settings(WAGTAILMENUS_CACHE_MISSING_FLAT_MENUS=True)
+class TestMissingFlatMenuCaching(MenuCacheTestCase):
+
+    def render_flat_menu(self, handle, fall_back=True):
+        template = Template(
+            '{%% load menu_tags %%}{%% flat_menu "%s" '
+            'fall_back_to_default_site_menus=%s %%}' % (handle, fall_back)
+        )
+        return template.render(Context({'request': self.make_request()}))
+
+    def test_missing_menu_lookup_is_cached(self):
+        self.assertEqual(self.render_flat_menu('optional'), '')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.render_flat_menu('optional'), '')
+
+    def test_fall_back_option_is_part_of_cache_key(self):
+        self.render_flat_menu('optional', fall_back=True)
+        with self.assertNumQueries(1):
+            self.render_flat_menu('optional', fall_back=False)
+
+    def test_creating_menu_with_handle_invalidates_cache(self):
+        self.render_flat_menu('optional')
+        menu = FlatMenu.objects.create(
+            site=self.site, handle='optional', title='Optional'
+        )
+        menu.add_menu_items_for_pages(Page.objects.filter(depth=3))
+        self.assertIn('About us', self.render_flat_menu('optional'))
+
+    def test_moving_menu_to_site_invalidates_cache(self):
+        other_site = Site.objects.create(
+            hostname='other.com', root_page=self.site.root_page
+        )
+        menu = FlatMenu.objects.create(
+            site=other_site, handle='optional', title='Optional'
+        )
+        menu.add_menu_items_for_pages(Page.objects.filter(depth=3))
+        self.assertEqual(self.render_flat_menu('optional'), '')
+
+        menu.site = self.site
+        menu.save()
+        self.assertIn('About us', self.render_flat_menu('optional'))
+
+    def test_saving_other_menus_does_not_invalidate_cache(self):
+        self.render_flat_menu('optional')
+        FlatMenu.objects.get(handle='footer').save()
+        with self.assertNumQueries(0):
+            self.render_flat_menu('optional')
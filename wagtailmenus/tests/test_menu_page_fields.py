@@ -0,0 +1,78 @@
+from django.test import TestCase, override_settings
+from wagtail.models import Page
+
+from wagtailmenus.models import MainMenu
+from wagtailmenus.tests.models import ContactPage, LinkPage
+from wagtailmenus.utils.specific import get_menu_field_names
+
+
+class TestGetMenuFieldNames(TestCase):
+
+    def test_base_page_fields(self):
+        field_names = get_menu_field_names(Page)
+        self.assertIn('url_path', field_names)
+        self.assertNotIn('seo_title', field_names)
+        self.assertNotIn('repeat_in_subnav', field_names)
+
+    def test_fields_declared_by_parent_classes_are_included(self):
+        self.assertIn('repeat_in_subnav', get_menu_field_names(ContactPage))
+        self.assertIn('link_url', get_menu_field_names(LinkPage))
+
+    def test_fields_declared_by_model_are_included(self):
+        ContactPage.menu_fields = ('seo_title',)
+        try:
+            field_names = get_menu_field_names(ContactPage)
+        finally:
+            del ContactPage.menu_fields
+        self.assertIn('seo_title', field_names)
+        self.assertIn('repeat_in_subnav', field_names)
+
+    @override_settings(WAGTAILMENUS_PAGE_FIELD_FOR_MENU_ITEM_TEXT='seo_title')
+    def test_menu_item_text_field_is_included(self):
+        self.assertIn('seo_title', get_menu_field_names(Page))
+
+    @override_settings(WAGTAILMENUS_PAGE_FIELD_FOR_MENU_ITEM_TEXT='menu_text')
+    def test_non_field_attributes_are_ignored(self):
+        self.assertNotIn('menu_text', get_menu_field_names(LinkPage))
+
+
+@override_settings(WAGTAILMENUS_ONLY_LOAD_MENU_FIELDS=True)
+class TestOnlyLoadMenuFields(TestCase):
+    fixtures = ['test.json']
+
+    test_urls = (
+        '/',
+        '/about-us/',
+        '/about-us/meet-the-team/',
+        '/superheroes/marvel-comics/',
+        '/news-and-events/',
+        '/contact-us/',
+    )
+
+    def test_non_menu_fields_are_deferred(self):
+        pages = MainMenu.objects.get(pk=1).get_pages_for_display()
+        for page in pages:
+            deferred_fields = page.get_deferred_fields()
+            self.assertIn('seo_title', deferred_fields)
+            self.assertNotIn('url_path', deferred_fields)
+            if isinstance(page, ContactPage):
+                self.assertNotIn('repeat_in_subnav', deferred_fields)
+
+    def test_deferred_fields_are_loaded_on_access(self):
+        page = list(MainMenu.objects.get(pk=1).get_pages_for_display())[0]
+        self.assertEqual(
+            page.search_description,
+            Page.objects.get(pk=page.pk).search_description
+        )
+
+    def test_output_matches_non_restricted_output(self):
+        for selective in (False, True):
+            with self.settings(WAGTAILMENUS_SELECTIVE_SPECIFIC_PAGES=selective):
+                restricted_output = [
+                    self.client.get(url).content for url in self.test_urls
+                ]
+                with self.settings(WAGTAILMENUS_ONLY_LOAD_MENU_FIELDS=False):
+                    self.assertEqual(
+                        [self.client.get(url).content for url in self.test_urls],
+                        restricted_output
+                    )
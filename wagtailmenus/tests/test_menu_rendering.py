@@ -1,25 +1,38 @@
+from unittest import mock
+
 from bs4 import BeautifulSoup
-from django.test import TestCase, override_settings
-from wagtail.models import Site
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import translation
+from wagtail.models import Locale, Page, Site
 
 from wagtailmenus.errors import SubMenuUsageError
 from wagtailmenus.models import FlatMenu, MainMenu
+from wagtailmenus.models.menus import Menu
 from wagtailmenus.templatetags.menu_tags import validate_supplied_values
+from wagtailmenus.utils.nodes import MenuNode
+from wagtailmenus.utils.registry import get_request_registry
 
 
 class TestTemplateTags(TestCase):
     fixtures = ['test.json']
     maxDiff = None
 
-    def test_main_menu_created_when_not_exists(self):
+    def test_main_menu_not_created_when_rendering(self):
         menu = MainMenu.objects.get(pk=1)
         self.assertEqual(menu.__str__(), 'Main menu for wagtailmenus (co.uk)')
         menu.delete()
         response = self.client.get('/')
         self.assertEqual(response.status_code, 200)
-        menu = MainMenu.objects.first()
-        self.assertTrue(menu)
-        self.assertEqual(menu.__str__(), 'Main menu for wagtailmenus (co.uk)')
+        self.assertFalse(MainMenu.objects.exists())
+
+    def test_main_menu_created_for_new_sites(self):
+        site = Site.objects.create(
+            hostname='new.com', site_name='New site',
+            root_page=Site.objects.get(pk=1).root_page,
+        )
+        menu = MainMenu.objects.get(site=site)
+        self.assertEqual(menu.__str__(), 'Main menu for New site')
 
     def test_flat_menu_get_for_site_with_default_fallback(self):
         site_one = Site.objects.get(pk=1)
@@ -1252,3 +1265,129 @@ class TestTemplateTags(TestCase):
         </div>
         """
         self.assertHTMLEqual(menu_html, expected_menu_html)
+
+
+class TestPathBasedActiveClasses(TestCase):
+    fixtures = ['test.json']
+
+    test_urls = (
+        '/',
+        '/about-us/',
+        '/about-us/meet-the-team/',
+        '/about-us/meet-the-team/staff-member-one/',
+        '/superheroes/marvel-comics/',
+        '/news-and-events/',
+        '/news-and-events/latest-news/2016/04/',
+        '/custom-url/',
+    )
+
+    def get_responses(self):
+        return [self.client.get(url).content for url in self.test_urls]
+
+    def test_output_matches_id_based_output(self):
+        expected_output = self.get_responses()
+        with self.settings(WAGTAILMENUS_PATH_BASED_ACTIVE_CLASSES=True):
+            self.assertEqual(self.get_responses(), expected_output)
+
+    def test_deferred_output_matches_id_based_output(self):
+        expected_output = self.get_responses()
+        with self.settings(
+            WAGTAILMENUS_PATH_BASED_ACTIVE_CLASSES=True,
+            WAGTAILMENUS_DEFER_ACTIVE_CLASSES=True,
+        ):
+            self.assertEqual(self.get_responses(), expected_output)
+
+
+class TestLayeredContexts(TestCase):
+    fixtures = ['test.json']
+
+    test_urls = (
+        '/',
+        '/about-us/',
+        '/about-us/meet-the-team/staff-member-one/',
+        '/superheroes/marvel-comics/',
+        '/news-and-events/',
+    )
+
+    def get_responses(self):
+        return [self.client.get(url).content for url in self.test_urls]
+
+    def test_output_matches_non_layered_output(self):
+        expected_output = self.get_responses()
+        with self.settings(WAGTAILMENUS_LAYERED_CONTEXTS=True):
+            self.assertEqual(self.get_responses(), expected_output)
+
+    @override_settings(WAGTAILMENUS_LAYERED_CONTEXTS=True)
+    def test_parent_context_is_not_copied(self):
+        with mock.patch.object(
+            Menu, 'create_dict_from_parent_context'
+        ) as create_dict:
+            self.client.get('/about-us/')
+        create_dict.assert_not_called()
+
+
+class TestMenuNodes(TestCase):
+    fixtures = ['test.json']
+
+    test_urls = (
+        '/',
+        '/about-us/',
+        '/about-us/meet-the-team/staff-member-one/',
+        '/superheroes/marvel-comics/',
+        '/news-and-events/',
+    )
+
+    def get_responses(self):
+        return [self.client.get(url).content for url in self.test_urls]
+
+    def test_output_matches_output_without_nodes(self):
+        expected_output = self.get_responses()
+        with self.settings(WAGTAILMENUS_USE_MENU_NODES=True):
+            self.assertEqual(self.get_responses(), expected_output)
+
+    @override_settings(
+        WAGTAIL_I18N_ENABLED=True,
+        LANGUAGES=[('en', 'English'), ('fr', 'French')],
+        WAGTAIL_CONTENT_LANGUAGES=[('en', 'English'), ('fr', 'French')],
+    )
+    def test_output_matches_for_translated_pages(self):
+        about_us = Page.objects.get(url_path='/home/about-us/')
+        french_about_us = about_us.specific.copy_for_translation(
+            Locale.objects.get(language_code='fr'), copy_parents=True
+        )
+        french_about_us.save_revision().publish()
+        request = RequestFactory().get('/')
+        request._wagtail_site = Site.objects.get(is_default_site=True)
+        template = Template('{% load menu_tags %}{% main_menu max_levels=3 %}')
+
+        def render():
+            return template.render(Context({
+                'request': request,
+                'wagtailmenus_vals': {
+                    'current_page': french_about_us,
+                    'section_root': None,
+                    'current_page_ancestor_ids': (),
+                },
+            }))
+
+        with translation.override('fr'):
+            expected_output = render()
+            with self.settings(WAGTAILMENUS_USE_MENU_NODES=True):
+                output = render()
+        self.assertHTMLEqual(output, expected_output)
+        # Sub menus for translated items still include their children
+        self.assertIn('Meet the team', output)
+
+    @override_settings(WAGTAILMENUS_USE_MENU_NODES=True)
+    def test_pages_and_menu_items_are_not_modified(self):
+        response = self.client.get('/about-us/meet-the-team/')
+        registry = get_request_registry(response.wsgi_request)
+        self.assertTrue(registry.menus)
+        for menu in registry.menus.values():
+            objects = list(menu.get_raw_menu_items())
+            objects.extend(menu.pages_for_display.values())
+            for obj in objects:
+                for name in ('text', 'href', 'active_class', 'sub_menu'):
+                    self.assertNotIn(name, obj.__dict__)
+            for item in menu.get_menu_items_for_rendering():
+                self.assertIsInstance(item, MenuNode)
@@ -1,8 +1,12 @@
 from django.core.exceptions import ValidationError
-from django.test import TestCase
-from wagtail.models import Site
+from django.db import connection
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from wagtail.models import Page, Site
 
-from wagtailmenus.tests.models import LinkPage
+from wagtailmenus.tests.models import ArticlePage, LinkPage
+from wagtailmenus.utils.specific import prefetch_link_pages
 
 
 class TestLinkPage(TestCase):
@@ -141,3 +145,69 @@ class TestLinkPage(TestCase):
         )
 
 
+class TestLinkPageTargetPrefetching(TestCase):
+    fixtures = ['test.json']
+
+    def setUp(self):
+        self.site = Site.objects.select_related('root_page').get(
+            is_default_site=True
+        )
+        self.parent = Page.objects.get(url_path='/home/about-us/')
+        self.targets = list(
+            Page.objects.live().in_menu().filter(depth=3).exclude(
+                pk=self.parent.pk
+            )
+        )
+        # Includes an 'ArticlePage', which generates its own URLs
+        article_page = Page.objects.get(pk=34)
+        article_page.show_in_menus = True
+        article_page.save()
+        self.targets.append(article_page)
+
+    def add_link_pages(self, targets):
+        for target in targets:
+            self.parent.add_child(instance=LinkPage(
+                title='Link to %s' % target.title,
+                slug='link-to-%s' % target.pk,
+                link_page=target,
+            ))
+
+    def render_menu(self):
+        request = RequestFactory().get('/about-us/')
+        request._wagtail_site = self.site
+        return Template(
+            '{% load menu_tags %}{% children_menu parent_page %}'
+        ).render(Context({'request': request, 'parent_page': self.parent}))
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            output = self.render_menu()
+        return len(context.captured_queries), output
+
+    def test_query_count_does_not_depend_on_number_of_link_pages(self):
+        self.add_link_pages(self.targets[:1])
+        self.add_link_pages(self.targets[-1:])
+        # Site root paths are cached after the first render
+        self.render_menu()
+        query_count, output = self.count_queries()
+        self.add_link_pages(self.targets[1:-1])
+        self.assertGreater(len(self.targets), 3)
+        self.assertEqual(self.count_queries()[0], query_count)
+        # The 'ArticlePage' URL includes segments for its publish date
+        self.assertIn(
+            Page.objects.get(pk=34).specific.relative_url(self.site), output
+        )
+
+    def test_prefetch_link_pages(self):
+        self.add_link_pages(self.targets)
+        link_pages = list(LinkPage.objects.child_of(self.parent))
+        # One query for all target pages, then one for the 'ArticlePage'
+        with self.assertNumQueries(2):
+            prefetch_link_pages(link_pages)
+        with self.assertNumQueries(0):
+            for link_page in link_pages:
+                self.assertTrue(
+                    link_page.link_page_is_suitable_for_display()
+                )
+        self.assertIsInstance(link_pages[-1].link_page, ArticlePage)
+
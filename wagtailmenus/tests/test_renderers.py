@@ -0,0 +1,103 @@
+import os
+
+from django.conf import settings
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.signals import template_rendered
+from wagtail.models import Site
+
+import wagtailmenus
+from wagtailmenus import context_processors
+from wagtailmenus.renderers import FastMenuRenderer, get_renderer
+
+SHIPPED_TEMPLATES_DIR = os.path.join(
+    os.path.dirname(wagtailmenus.__file__), 'templates'
+)
+
+
+class TestFastMenuRenderer(TestCase):
+    fixtures = ['test.json']
+
+    test_urls = (
+        '/',
+        '/about-us/',
+        '/about-us/meet-the-team/staff-member-one/',
+        '/superheroes/marvel-comics/',
+        '/news-and-events/',
+    )
+
+    test_tags = (
+        'main_menu',
+        'main_menu max_levels=3',
+        'main_menu allow_repeating_parents=False',
+        'main_menu add_sub_menus_inline=True',
+        'flat_menu "footer" max_levels=2',
+        'flat_menu "footer" show_menu_heading=False',
+        'flat_menu "contact" apply_active_classes=True',
+        'section_menu',
+        'section_menu show_section_root=False max_levels=3',
+        'children_menu',
+        'children_menu max_levels=3',
+    )
+
+    def setUp(self):
+        self.site = Site.objects.get(is_default_site=True)
+
+    def render(self, tag, url):
+        request = RequestFactory().get(url)
+        request._wagtail_site = self.site
+        template = Template('{% load menu_tags %}{% ' + tag + ' %}')
+        return template.render(Context({
+            'request': request,
+            'wagtailmenus_vals': context_processors.wagtailmenus(request)[
+                'wagtailmenus_vals'
+            ],
+        }))
+
+    def assertOutputMatchesTemplates(self):
+        for url in self.test_urls:
+            for tag in self.test_tags:
+                with self.subTest(url=url, tag=tag):
+                    expected_output = self.render(tag, url)
+                    output = self.render(tag + ' renderer="fast"', url)
+                    self.assertHTMLEqual(output, expected_output)
+
+    def test_output_matches_default_templates(self):
+        self.assertOutputMatchesTemplates()
+
+    def test_output_matches_shipped_templates(self):
+        # The test project overrides some of the default templates, so only
+        # templates shipped with wagtailmenus are made available here. This
+        # should fail if any of those templates are changed without making
+        # the same change to the renderer
+        used_templates = set()
+
+        def record_template(sender, template, **kwargs):
+            if template.origin.template_name:
+                used_templates.add(template.origin.template_name)
+
+        templates_setting = [dict(
+            settings.TEMPLATES[0], DIRS=[SHIPPED_TEMPLATES_DIR], APP_DIRS=False
+        )]
+        template_rendered.connect(record_template)
+        try:
+            with override_settings(TEMPLATES=templates_setting):
+                self.assertOutputMatchesTemplates()
+        finally:
+            template_rendered.disconnect(record_template)
+
+        # Every template replicated by the renderer should have been compared
+        self.assertEqual(used_templates, {
+            'menus/main_menu.html',
+            'menus/bootstrap3/main_menu_dropdown.html',
+            'menus/bootstrap3/sub_menu_dropdown.html',
+            'menus/flat_menu.html',
+            'menus/section_menu.html',
+            'menus/children_menu.html',
+            'menus/sub_menu.html',
+        })
+
+    def test_get_renderer(self):
+        self.assertIsInstance(get_renderer('fast'), FastMenuRenderer)
+        with self.assertRaises(ValueError):
+            get_renderer('slow')
@@ -0,0 +1,279 @@
+from django.db import connection
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from wagtail import hooks
+from wagtail.models import Page, Site
+
+from wagtailmenus import context_processors
+from wagtailmenus.models import SectionMenu
+from wagtailmenus.utils.registry import get_request_registry, register_pages
+
+
+class TestRequestRegistry(TestCase):
+    fixtures = ['test.json']
+
+    def setUp(self):
+        self.site = Site.objects.get(is_default_site=True)
+        # Warm up any caches unrelated to the registry
+        Template(
+            '{% load menu_tags %}{% main_menu %}{% section_menu %}'
+        ).render(self.get_context())
+
+    def get_context(self, url='/about-us/'):
+        request = RequestFactory().get(url)
+        request._wagtail_site = self.site
+        page = Page.objects.get(url_path='/home' + url).specific
+        return Context({
+            'request': request,
+            'wagtailmenus_vals': {
+                'current_page': page,
+                'section_root': page,
+                'current_page_ancestor_ids': (page.pk,),
+            }
+        })
+
+    def render_and_count_queries(self, template_string):
+        template = Template('{% load menu_tags %}' + template_string)
+        context = self.get_context()
+        with CaptureQueriesContext(connection) as captured:
+            output = template.render(context)
+        return output, len(captured.captured_queries)
+
+    def test_registry_is_attached_to_request(self):
+        request = RequestFactory().get('/')
+        registry = get_request_registry(request)
+        self.assertIs(get_request_registry(request), registry)
+        self.assertIsNot(
+            get_request_registry(RequestFactory().get('/')), registry
+        )
+
+    def test_repeated_main_menu_reuses_data(self):
+        single_output, single_count = self.render_and_count_queries(
+            '{% main_menu %}'
+        )
+        double_output, double_count = self.render_and_count_queries(
+            '{% main_menu %}{% main_menu %}'
+        )
+        self.assertEqual(double_output, single_output * 2)
+        self.assertLess(double_count, single_count * 2)
+
+    def test_repeated_flat_menu_reuses_data(self):
+        single_output, single_count = self.render_and_count_queries(
+            '{% flat_menu "contact" %}'
+        )
+        double_output, double_count = self.render_and_count_queries(
+            '{% flat_menu "contact" %}{% flat_menu "contact" %}'
+        )
+        self.assertEqual(double_output, single_output * 2)
+        self.assertLess(double_count, single_count * 2)
+
+    def test_repeated_section_menu_reuses_data(self):
+        single_output, single_count = self.render_and_count_queries(
+            '{% section_menu %}'
+        )
+        double_output, double_count = self.render_and_count_queries(
+            '{% section_menu %}{% section_menu %}'
+        )
+        self.assertEqual(double_output, single_output * 2)
+        self.assertLess(double_count, single_count * 2)
+
+    def test_data_not_reused_when_disabled(self):
+        template_string = '{% main_menu %}{% main_menu %}'
+        output, count = self.render_and_count_queries(template_string)
+        with self.settings(WAGTAILMENUS_REUSE_MENU_DATA_PER_REQUEST=False):
+            self.assertEqual(
+                self.render_and_count_queries(template_string),
+                (output, count + 7)
+            )
+
+    def test_data_not_reused_when_queryset_hooks_registered(self):
+        def modify_queryset(queryset, **kwargs):
+            return queryset
+
+        template_string = '{% main_menu %}{% main_menu %}'
+        output, count = self.render_and_count_queries(template_string)
+        with hooks.register_temporarily(
+            'menus_modify_base_page_queryset', modify_queryset
+        ):
+            hooked_output, hooked_count = self.render_and_count_queries(
+                template_string
+            )
+        self.assertEqual(hooked_output, output)
+        self.assertGreater(hooked_count, count)
+
+
+@override_settings(WAGTAILMENUS_REUSE_PAGES_PER_REQUEST=True)
+class TestPageIdentityMap(TestCase):
+    fixtures = ['test.json']
+
+    def setUp(self):
+        self.site = Site.objects.get(is_default_site=True)
+        self.request = RequestFactory().get('/about-us/')
+        self.request._wagtail_site = self.site
+        self.page = Page.objects.get(url_path='/home/about-us/')
+
+    def test_more_specific_instances_replace_registered_pages(self):
+        registry = get_request_registry(self.request)
+        registry.register_page(self.page)
+        self.assertIs(registry.get_page(self.page.pk), self.page)
+        self.assertIsNone(
+            registry.get_page(self.page.pk, self.page.specific_class)
+        )
+
+        specific_page = self.page.specific
+        registry.register_page(specific_page)
+        registry.register_page(Page.objects.get(pk=self.page.pk))
+        self.assertIs(registry.get_page(self.page.pk), specific_page)
+
+    def test_pages_not_registered_when_disabled(self):
+        with self.settings(WAGTAILMENUS_REUSE_PAGES_PER_REQUEST=False):
+            register_pages(self.request, self.page)
+        self.assertEqual(get_request_registry(self.request).pages, {})
+
+    def test_served_page_is_registered(self):
+        response = self.client.get('/about-us/')
+        registry = get_request_registry(response.wsgi_request)
+        self.assertIsInstance(
+            registry.get_page(self.page.pk), self.page.specific_class
+        )
+
+    def test_menus_reuse_registered_pages(self):
+        template = Template('{% load menu_tags %}{% main_menu %}')
+        specific_page = self.page.specific
+        # Register all pages of the same type, so that no query is needed
+        # to fetch specific instances of that type
+        same_type_pages = [specific_page] + list(
+            type(specific_page).objects.exclude(pk=specific_page.pk)
+        )
+
+        def render(register):
+            request = RequestFactory().get('/about-us/')
+            request._wagtail_site = self.site
+            if register:
+                register_pages(request, *same_type_pages)
+            context = Context({
+                'request': request,
+                'wagtailmenus_vals': {'current_page': specific_page},
+            })
+            with CaptureQueriesContext(connection) as captured:
+                output = template.render(context)
+            return output, len(captured.captured_queries)
+
+        # Warm up any caches unrelated to the registry
+        render(register=False)
+        output, count = render(register=False)
+        self.assertEqual(render(register=True), (output, count - 1))
+        # Menus should only modify copies of registered pages
+        self.assertFalse(hasattr(specific_page, 'href'))
+
+    def test_section_menu_reuses_registered_root_page(self):
+        specific_page = self.page.specific
+        register_pages(self.request, specific_page)
+        context = Context({
+            'request': self.request,
+            'wagtailmenus_vals': {'section_root': self.page},
+        })
+        with self.assertNumQueries(0):
+            menu = SectionMenu._get_render_prepared_object(
+                context,
+                max_levels=2,
+                apply_active_classes=False,
+                allow_repeating_parents=True,
+                use_absolute_page_urls=False,
+                show_section_root=True,
+            )
+        self.assertIs(menu.root_page, specific_page)
+
+    @override_settings(WAGTAILMENUS_REUSE_PAGES_PER_REQUEST=False)
+    def test_registered_pages_not_reused_when_disabled(self):
+        specific_page = self.page.specific
+        get_request_registry(self.request).register_page(specific_page)
+        context = Context({
+            'request': self.request,
+            'wagtailmenus_vals': {
+                'section_root': Page.objects.get(pk=self.page.pk),
+            },
+        })
+        menu = SectionMenu._get_render_prepared_object(
+            context,
+            max_levels=2,
+            apply_active_classes=False,
+            allow_repeating_parents=True,
+            use_absolute_page_urls=False,
+            show_section_root=True,
+        )
+        self.assertIsNot(menu.root_page, specific_page)
+        self.assertEqual(menu.root_page, specific_page)
+
+
+@override_settings(WAGTAILMENUS_PREFETCH_FLAT_MENUS=True)
+class TestFlatMenuPrefetching(TestCase):
+    fixtures = ['test.json']
+
+    template_string = (
+        '{% load menu_tags %}'
+        '{% flat_menu "contact" %}'
+        '{% flat_menu "footer" %}'
+        '{% flat_menu "header-secondary" %}'
+        '{% flat_menu "does-not-exist" %}'
+    )
+
+    def render(self):
+        request = RequestFactory().get('/')
+        request._wagtail_site = Site.objects.get(is_default_site=True)
+        with CaptureQueriesContext(connection) as captured:
+            output = Template(self.template_string).render(
+                Context({'request': request})
+            )
+        menu_queries = [
+            q for q in captured.captured_queries
+            if 'FROM "wagtailmenus_flatmenu' in q['sql']
+        ]
+        return output, len(menu_queries)
+
+    def test_flat_menus_fetched_once_per_request(self):
+        output, menu_query_count = self.render()
+        # One query for menus, and another for menu items
+        self.assertEqual(menu_query_count, 2)
+        with self.settings(WAGTAILMENUS_PREFETCH_FLAT_MENUS=False):
+            self.assertEqual(self.render(), (output, 7))
+
+    def test_flat_menus_not_prefetched_when_item_hooks_registered(self):
+        def modify_queryset(queryset, **kwargs):
+            return queryset
+
+        output, menu_query_count = self.render()
+        with hooks.register_temporarily(
+            'menus_modify_base_menuitem_queryset', modify_queryset
+        ):
+            self.assertEqual(self.render(), (output, 7))
+
+
+@override_settings(WAGTAILMENUS_SHARE_CONTEXT_PROCESSOR_VALUES=True)
+class TestContextProcessorValsReuse(TestCase):
+    fixtures = ['test.json']
+
+    def get_vals_and_count_queries(self, request):
+        with CaptureQueriesContext(connection) as captured:
+            vals = context_processors.wagtailmenus(request)['wagtailmenus_vals']
+            vals['current_page']
+        return vals, len(captured.captured_queries)
+
+    def test_values_shared_between_contexts_for_request(self):
+        request = RequestFactory().get('/about-us/meet-the-team/')
+        vals, query_count = self.get_vals_and_count_queries(request)
+        self.assertGreater(query_count, 0)
+        self.assertEqual(vals['current_page'].title, 'Meet the team')
+
+        other_vals, query_count = self.get_vals_and_count_queries(request)
+        self.assertIs(other_vals, vals)
+        self.assertEqual(query_count, 0)
+
+    @override_settings(WAGTAILMENUS_SHARE_CONTEXT_PROCESSOR_VALUES=False)
+    def test_values_not_shared_when_disabled(self):
+        request = RequestFactory().get('/about-us/meet-the-team/')
+        vals, _ = self.get_vals_and_count_queries(request)
+        other_vals, query_count = self.get_vals_and_count_queries(request)
+        self.assertIsNot(other_vals, vals)
+        self.assertGreater(query_count, 0)
@@ -1,7 +1,10 @@
-from django.test import TestCase
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase
 
 from wagtailmenus.models import SectionMenu
 from wagtailmenus.tests import base, utils
+from wagtailmenus.utils.misc import (derive_section_root,
+                                     derive_section_root_lazily)
 
 Page = utils.get_page_model()
 
@@ -40,3 +43,64 @@ class TestGetTemplateNames(
     base.GetTemplateNamesMethodTestCase
     """
     expected_default_result_length = 3
+
+
+class TestLazySectionRoots(TestCase):
+    fixtures = ['test.json']
+
+    def setUp(self):
+        self.template = Template('{% load menu_tags %}{% section_menu %}')
+        self.page = Page.objects.get(
+            url_path='/home/about-us/meet-the-team/'
+        ).specific
+        self.site = self.page.get_site()
+
+    def get_context(self, section_root):
+        request = RequestFactory().get('/about-us/meet-the-team/')
+        request._wagtail_site = self.site
+        return Context({
+            'request': request,
+            'wagtailmenus_vals': {
+                'current_page': self.page,
+                'section_root': section_root,
+                'current_page_ancestor_ids': (),
+            }
+        })
+
+    def test_creating_lazy_section_root_uses_no_queries(self):
+        with self.assertNumQueries(0):
+            section_root = derive_section_root_lazily(self.page)
+            self.assertTrue(section_root)
+            self.assertEqual(section_root.path, self.page.path[:12])
+            self.assertEqual(section_root.depth, 3)
+            self.assertFalse(section_root.is_loaded)
+
+    def test_section_root_loaded_with_menu_pages(self):
+        expected_output = self.template.render(
+            self.get_context(derive_section_root(self.page))
+        )
+        with self.assertNumQueries(5):
+            # Two queries are needed to derive the section root
+            self.template.render(
+                self.get_context(derive_section_root(self.page))
+            )
+
+        with self.assertNumQueries(3):
+            section_root = derive_section_root_lazily(self.page)
+            output = self.template.render(self.get_context(section_root))
+        self.assertEqual(output, expected_output)
+        self.assertEqual(
+            section_root.get_page(), derive_section_root(self.page)
+        )
+
+    def test_section_root_loaded_separately_if_not_a_menu_page(self):
+        Page.objects.filter(path=self.page.path[:12]).update(
+            show_in_menus=False
+        )
+        expected_output = self.template.render(
+            self.get_context(derive_section_root(self.page))
+        )
+        output = self.template.render(
+            self.get_context(derive_section_root_lazily(self.page))
+        )
+        self.assertEqual(output, expected_output)
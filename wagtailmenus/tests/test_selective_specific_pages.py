@@ -0,0 +1,86 @@
+from django.db import connection
+from django.db.models import Value
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from wagtail.models import Page
+
+from wagtailmenus.models import MainMenu
+from wagtailmenus.tests.models import (ArticleListPage, ArticlePage,
+                                       ContactPage, LinkPage, LowLevelPage,
+                                       TopLevelPage, TypicalPage)
+from wagtailmenus.utils.specific import (page_class_needs_specific,
+                                         specific_for_menus)
+
+
+class TestPageClassNeedsSpecific(TestCase):
+
+    def test_page_types_with_menu_behaviour(self):
+        self.assertTrue(page_class_needs_specific(LinkPage))
+        self.assertTrue(page_class_needs_specific(ContactPage))
+        self.assertTrue(page_class_needs_specific(TopLevelPage))
+
+    def test_page_types_with_custom_url_methods(self):
+        self.assertTrue(page_class_needs_specific(ArticlePage))
+
+    def test_page_types_without_menu_behaviour(self):
+        self.assertFalse(page_class_needs_specific(Page))
+        self.assertFalse(page_class_needs_specific(LowLevelPage))
+        self.assertFalse(page_class_needs_specific(TypicalPage))
+        self.assertFalse(page_class_needs_specific(ArticleListPage))
+
+    @override_settings(WAGTAILMENUS_PAGE_FIELD_FOR_MENU_ITEM_TEXT='body')
+    def test_page_types_with_custom_menu_text_field(self):
+        self.assertTrue(page_class_needs_specific(ArticlePage))
+        self.assertFalse(page_class_needs_specific(LowLevelPage))
+
+
+@override_settings(WAGTAILMENUS_SELECTIVE_SPECIFIC_PAGES=True)
+class TestSelectiveSpecificPages(TestCase):
+    fixtures = ['test.json']
+
+    test_urls = (
+        '/',
+        '/about-us/',
+        '/about-us/meet-the-team/',
+        '/superheroes/marvel-comics/',
+        '/news-and-events/',
+        '/contact-us/',
+    )
+
+    def test_only_pages_that_need_it_are_specific(self):
+        queryset = specific_for_menus(Page.objects.filter(depth__gt=1))
+        with self.assertNumQueries(1 + 4):
+            pages = list(queryset)
+        for page in pages:
+            if page_class_needs_specific(page.specific_class):
+                self.assertIsInstance(page, page.specific_class)
+            else:
+                self.assertIs(type(page), Page)
+
+    def test_annotations_are_preserved(self):
+        queryset = specific_for_menus(
+            Page.objects.filter(depth__gt=1).annotate(answer=Value(42))
+        )
+        for page in queryset:
+            self.assertEqual(page.answer, 42)
+
+    def test_main_menu_uses_fewer_queries(self):
+        def count_queries():
+            menu = MainMenu.objects.get(pk=1)
+            with CaptureQueriesContext(connection) as context:
+                list(menu.get_pages_for_display())
+            return len(context.captured_queries)
+
+        selective_count = count_queries()
+        with self.settings(WAGTAILMENUS_SELECTIVE_SPECIFIC_PAGES=False):
+            self.assertLess(selective_count, count_queries())
+
+    def test_output_matches_non_selective_output(self):
+        selective_output = [
+            self.client.get(url).content for url in self.test_urls
+        ]
+        with self.settings(WAGTAILMENUS_SELECTIVE_SPECIFIC_PAGES=False):
+            self.assertEqual(
+                [self.client.get(url).content for url in self.test_urls],
+                selective_output
+            )
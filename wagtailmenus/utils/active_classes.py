@@ -0,0 +1,168 @@
+"""
+Utilities for rendering menus with 'deferred' active classes. When the
+``WAGTAILMENUS_DEFER_ACTIVE_CLASSES`` setting is ``True``, menu items are
+given placeholder values for ``active_class`` that do not depend on the
+current request. The placeholders are swapped for real class names after
+rendering, allowing the same output to be reused for every page.
+
+Otherwise, ``ActiveClassDependencies`` records what the active classes in
+a menu's output were worked out from, so that cached output can be reused
+for any other request where those things are the same.
+"""
+import re
+from urllib.parse import quote, unquote, urlparse
+
+from django.utils.safestring import mark_safe
+
+from wagtailmenus.conf import settings
+from wagtailmenus.utils.ancestors import PageAncestorIds
+
+# Active if the page is the current page, or an ancestor of it
+PAGE = 'p'
+# An ancestor if the page is the current page, or an ancestor of it
+REPEATED_PAGE = 'r'
+# Active if the page is the current page only
+CURRENT_PAGE_ONLY = 'c'
+# Compared to the request path in the same way as custom URL menu items
+URL_PATH = 'u'
+
+PLACEHOLDER_REGEX = re.compile(r'\[\[wagtailmenus:([prcu]):([^\]\s"\'<>]*)\]\]')
+
+
+def get_placeholder(kind, value):
+    return '[[wagtailmenus:%s:%s]]' % (kind, value)
+
+
+def get_page_placeholder(page, repeated=False, current_page_only=False):
+    """
+    Return a placeholder to use as the 'active_class' value for a menu item
+    representing ``page``.
+    """
+    if current_page_only:
+        return get_placeholder(CURRENT_PAGE_ONLY, page.pk)
+    # Include the tree path (where loaded), so that ancestors can be
+    # identified without fetching ancestor ids (see 'PageAncestorIds')
+    path = page.__dict__.get('path')
+    value = '%s:%s' % (page.pk, path) if path else page.pk
+    if repeated:
+        return get_placeholder(REPEATED_PAGE, value)
+    return get_placeholder(PAGE, value)
+
+
+def get_url_placeholder(url):
+    """
+    Return a placeholder to use as the 'active_class' value for a menu item
+    linking to a custom ``url``.
+    """
+    parsed_url = urlparse(url)
+    if parsed_url.netloc:
+        return ''
+    return get_placeholder(URL_PATH, quote(parsed_url.path, safe='/'))
+
+
+def replace_placeholders(
+    output, current_page_id=None, ancestor_ids=(), request_path=''
+):
+    """
+    Return a copy of the rendered ``output`` with all active class
+    placeholders replaced with real values for the current request.
+    """
+    active_class = settings.ACTIVE_CLASS
+    ancestor_class = settings.ACTIVE_ANCESTOR_CLASS
+    path_based = isinstance(ancestor_ids, PageAncestorIds)
+    # Ids are only looked up if a placeholder needs them
+    ancestor_id_set = None
+
+    def is_ancestor(page_id, path):
+        nonlocal ancestor_id_set
+        if path_based and path:
+            return ancestor_ids.contains_path(path)
+        if ancestor_id_set is None:
+            ancestor_id_set = frozenset(ancestor_ids)
+        return page_id in ancestor_id_set
+
+    def get_replacement(match):
+        kind, value = match.groups()
+        if kind == URL_PATH:
+            path = unquote(value)
+            if request_path == path:
+                return active_class
+            if request_path.startswith(path) and path != '/':
+                return ancestor_class
+            return ''
+        page_id, _, path = value.partition(':')
+        page_id = int(page_id)
+        is_current = page_id == current_page_id
+        if kind == CURRENT_PAGE_ONLY:
+            return active_class if is_current else ''
+        if kind == REPEATED_PAGE:
+            if is_current or is_ancestor(page_id, path):
+                return ancestor_class
+            return ''
+        if is_current:
+            return active_class
+        if is_ancestor(page_id, path):
+            return ancestor_class
+        return ''
+
+    return mark_safe(PLACEHOLDER_REGEX.sub(get_replacement, output))
+
+
+class ActiveClassDependencies:
+    """
+    Records the pages and custom URLs that were given active classes while
+    rendering a menu (and its sub menus), so that a signature of the active
+    classes can be worked out for other requests without rendering the menu.
+    """
+
+    def __init__(self):
+        # Tree paths (where loaded) by page id
+        self.pages = {}
+        # Paths from custom URLs that are compared to the request path
+        self.url_paths = set()
+        # Whether any active classes were worked out from the request in
+        # some other way (e.g. by a custom 'get_active_class_for_request()')
+        self.uses_request_path = False
+
+    def add_page(self, page):
+        self.pages[page.pk] = page.__dict__.get('path')
+
+    def add_url(self, url):
+        parsed_url = urlparse(url)
+        if not parsed_url.netloc:
+            self.url_paths.add(parsed_url.path)
+
+    def update(self, other):
+        self.pages.update(other.pages)
+        self.url_paths.update(other.url_paths)
+        self.uses_request_path = (
+            self.uses_request_path or other.uses_request_path
+        )
+
+    def get_signature(self, current_page=None, ancestor_ids=(),
+                      request_path=''):
+        """
+        Return a hashable value that is the same for any two requests where
+        the recorded pages and URLs would be given the same active classes.
+        """
+        current_page_id = current_page.pk if current_page else None
+        path_based = isinstance(ancestor_ids, PageAncestorIds)
+        ancestors = []
+        for page_id, path in self.pages.items():
+            if path_based and path:
+                if ancestor_ids.contains_path(path):
+                    ancestors.append(page_id)
+            elif page_id in ancestor_ids:
+                ancestors.append(page_id)
+        url_matches = []
+        for path in self.url_paths:
+            if request_path == path:
+                url_matches.append((path, True))
+            elif request_path.startswith(path) and path != '/':
+                url_matches.append((path, False))
+        return (
+            current_page_id if current_page_id in self.pages else None,
+            tuple(sorted(ancestors)),
+            tuple(sorted(url_matches)),
+            request_path if self.uses_request_path else None,
+        )
@@ -0,0 +1,89 @@
+"""
+Utilities for working out whether pages are ancestors of the current page.
+
+When the ``WAGTAILMENUS_PATH_BASED_ACTIVE_CLASSES`` setting is ``True``, the
+``current_page_ancestor_ids`` value added to the context by the
+``wagtailmenus`` context processor is a ``PageAncestorIds`` instance instead
+of a list of ids. Menus use its ``contains_page()`` method to compare tree
+paths, which requires no database queries. The ids themselves are only
+fetched if something asks for them.
+"""
+from django.utils.functional import cached_property
+from wagtail.models import Page
+
+
+class PageAncestorIds:
+    """
+    A lazy, read-only sequence of the ids of ``page`` and its ancestors,
+    limited to those with a depth of ``min_depth`` or more (ordered by
+    depth).
+    """
+
+    def __init__(self, page, min_depth):
+        self.page = page
+        self.path = page.path
+        self.min_depth = min_depth
+
+    @cached_property
+    def ids(self):
+        if self.page.depth < self.min_depth:
+            return ()
+        return tuple(
+            self.page.get_ancestors(inclusive=True).filter(
+                depth__gte=self.min_depth
+            ).values_list('id', flat=True)
+        )
+
+    def contains_page(self, page):
+        """
+        Return a boolean indicating whether ``page`` is the page or one of
+        its ancestors (at a depth of ``min_depth`` or more). The comparison
+        uses tree paths where ``page`` has one loaded, and ids otherwise.
+        """
+        path = page.__dict__.get('path')
+        if not path:
+            return page.pk in self.ids
+        return self.contains_path(path)
+
+    def contains_path(self, path):
+        """
+        Return a boolean indicating whether the page with the tree ``path``
+        is the page or one of its ancestors (at a depth of ``min_depth`` or
+        more).
+        """
+        return (
+            len(path) >= self.min_depth * Page.steplen and
+            self.path.startswith(path)
+        )
+
+    def __contains__(self, value):
+        if isinstance(value, Page):
+            return self.contains_page(value)
+        return value in self.ids
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def __len__(self):
+        # There is always exactly one ancestor at each depth
+        return max(0, self.page.depth - self.min_depth + 1)
+
+    def __bool__(self):
+        return self.page.depth >= self.min_depth
+
+    def __getitem__(self, index):
+        return self.ids[index]
+
+    def __repr__(self):
+        return '<%s: %s>' % (self.__class__.__name__, self.path)
+
+
+def is_current_page_ancestor(page, ancestor_ids):
+    """
+    Return a boolean indicating whether ``page`` is included in
+    ``ancestor_ids``, which can be a ``PageAncestorIds`` instance or any
+    other container of page ids.
+    """
+    if isinstance(ancestor_ids, PageAncestorIds):
+        return ancestor_ids.contains_page(page)
+    return page.pk in ancestor_ids
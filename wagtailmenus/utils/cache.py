@@ -0,0 +1,116 @@
+from hashlib import md5
+from uuid import uuid4
+
+from django.core.cache import caches
+from django.db.models import Model
+from django.db.models.base import ModelState
+
+from wagtailmenus.conf import settings
+
+VERSION_KEY = 'wagtailmenus:version'
+
+
+def get_cache():
+    """
+    Return the cache backend identified by the
+    ``WAGTAILMENUS_CACHE_BACKEND`` setting.
+    """
+    return caches[settings.CACHE_BACKEND]
+
+
+def get_version_key(scope=None):
+    if scope is None:
+        return VERSION_KEY
+    return '%s:%s' % (VERSION_KEY, scope)
+
+
+def get_cache_version(scope=None):
+    """
+    Return the token that is currently included in all wagtailmenus cache
+    keys. A new token is generated whenever ``invalidate_menu_caches()``
+    is called, so that stale values are simply never looked up again.
+
+    If a ``scope`` is provided, a separate token is returned, which is only
+    replaced when ``invalidate_menu_caches()`` is called with the same
+    ``scope`` value.
+    """
+    cache = get_cache()
+    version_key = get_version_key(scope)
+    version = cache.get(version_key)
+    if version is None:
+        version = uuid4().hex
+        if not cache.add(version_key, version, None):
+            # Another process got there first
+            version = cache.get(version_key, version)
+    return version
+
+
+def invalidate_menu_caches(scope=None):
+    """
+    Invalidate all values cached by wagtailmenus. Called automatically when
+    menus, menu items or pages are changed, but can also be called manually
+    (e.g. after making changes to live pages without publishing them).
+
+    If a ``scope`` is provided, only values with keys created using the same
+    ``scope`` value are invalidated.
+    """
+    get_cache().set(get_version_key(scope), uuid4().hex, None)
+
+
+def make_cache_key(prefix, *parts, scope=None):
+    """
+    Return a cache key for the supplied ``prefix`` and ``parts``, which
+    includes the current cache version (for the supplied ``scope``, if
+    provided). ``parts`` can be any values with a stable ``repr()``, and
+    are hashed to keep key lengths predictable.
+    """
+    digest = md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+    return 'wagtailmenus:%s:%s:%s' % (
+        prefix, get_cache_version(scope), digest
+    )
+
+
+def extend_cache_key(key, *parts):
+    """
+    Return a new cache key, derived from a ``key`` returned by
+    ``make_cache_key()`` and the supplied ``parts`` (which are hashed in
+    the same way). The cache version isn't looked up again.
+    """
+    digest = md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+    return '%s:%s' % (key, digest)
+
+
+def get_storable_copy(instance, exclude=(), _copies=None):
+    """
+    Return a copy of the model ``instance`` that only has its field values
+    and any cached related objects (which are copied in the same way), so
+    that it can be stored in a cache. Other attributes (e.g. those set on
+    pages and menu items by menus, which can reference the request or
+    template context) are left out, as are any related objects in
+    ``exclude``.
+    """
+    if _copies is None:
+        _copies = {}
+    try:
+        return _copies[id(instance)]
+    except KeyError:
+        pass
+
+    model = type(instance)
+    stored = model.__new__(model)
+    _copies[id(instance)] = stored
+    values = instance.__dict__
+    for field in instance._meta.concrete_fields:
+        # Deferred fields are left unset, so are loaded on first access
+        if field.attname in values:
+            stored.__dict__[field.attname] = values[field.attname]
+    stored._state = ModelState()
+    stored._state.adding = instance._state.adding
+    stored._state.db = instance._state.db
+    for name, value in instance._state.fields_cache.items():
+        if any(value is obj for obj in exclude):
+            continue
+        if isinstance(value, Model):
+            value = get_storable_copy(value, exclude, _copies)
+        stored._state.fields_cache[name] = value
+    return stored
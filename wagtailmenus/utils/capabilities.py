@@ -0,0 +1,148 @@
+"""
+A table recording which parts of menu behaviour each page type customises
+(e.g. by being a link page, or by defining a ``has_submenu_items()``
+method). The table is built for all page types when wagtailmenus is loaded,
+and rebuilt whenever settings are changed, so that menus can look up this
+information for each page, instead of inspecting page classes over and over
+again while rendering.
+"""
+from collections import namedtuple
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from wagtail.models import Page
+
+from wagtailmenus.conf import settings
+
+# Methods used to generate URLs for menu items. If a page type overrides any
+# of these, specific instances are needed to generate the correct URLs
+URL_METHOD_NAMES = (
+    'get_url_parts', 'get_url', 'get_full_url', 'relative_url',
+)
+
+
+class MenuCapabilities(namedtuple('MenuCapabilities', (
+    'is_link_page',
+    'has_submenu_items',
+    'modify_submenu_items',
+    'repeat_in_subnav',
+    'custom_menu_text',
+    'custom_urls',
+))):
+    __slots__ = ()
+
+    @property
+    def needs_specific(self):
+        """
+        Whether menus need 'specific' instances of the page type in order to
+        render them correctly.
+        """
+        return any(self)
+
+
+_capabilities = {}
+_capabilities_by_content_type = {}
+_any_page_class_has = {}
+_table_built = False
+
+
+def inspect_page_class(model):
+    """
+    Return a ``MenuCapabilities`` instance for the supplied page ``model``,
+    without using the table.
+    """
+    from wagtailmenus.models.pages import AbstractLinkPage
+    text_field_name = settings.PAGE_FIELD_FOR_MENU_ITEM_TEXT
+    return MenuCapabilities(
+        is_link_page=issubclass(model, AbstractLinkPage),
+        has_submenu_items=hasattr(model, 'has_submenu_items'),
+        modify_submenu_items=hasattr(model, 'modify_submenu_items'),
+        repeat_in_subnav=hasattr(model, 'repeat_in_subnav'),
+        custom_menu_text=(
+            hasattr(model, text_field_name) and
+            not hasattr(Page, text_field_name)
+        ),
+        custom_urls=any(
+            getattr(model, name, None) is not getattr(Page, name)
+            for name in URL_METHOD_NAMES
+        ),
+    )
+
+
+def build_capability_table():
+    """
+    Add an entry to the table for every page type. Called from
+    ``WagtailMenusConfig.ready()``, and when settings are changed.
+    """
+    from wagtail.models import get_page_models
+    global _table_built
+    _capabilities.clear()
+    _capabilities_by_content_type.clear()
+    _any_page_class_has.clear()
+    _capabilities[Page] = inspect_page_class(Page)
+    for model in get_page_models():
+        _capabilities[model] = inspect_page_class(model)
+    _table_built = True
+
+
+def get_capabilities(model):
+    """
+    Return a ``MenuCapabilities`` instance for the supplied page ``model``.
+    """
+    try:
+        return _capabilities[model]
+    except KeyError:
+        # Not a page type registered with Wagtail, or the table hasn't been
+        # built yet
+        value = _capabilities[model] = inspect_page_class(model)
+        return value
+
+
+def get_capabilities_for_page(page):
+    """
+    Return a ``MenuCapabilities`` instance for the class of the supplied
+    ``page`` instance (which will be ``Page`` for non-specific pages).
+    """
+    # Using '__class__' rather than 'type()' means lazy objects (e.g.
+    # 'LazySectionRoot') report the class of the page they wrap
+    return get_capabilities(page.__class__)
+
+
+def get_capabilities_for_content_type(content_type_id):
+    """
+    Return a ``MenuCapabilities`` instance for the specific class of pages
+    with the supplied ``content_type_id``.
+    """
+    try:
+        return _capabilities_by_content_type[content_type_id]
+    except KeyError:
+        pass
+    model = ContentType.objects.get_for_id(content_type_id).model_class()
+    value = get_capabilities(model or Page)
+    _capabilities_by_content_type[content_type_id] = value
+    return value
+
+
+def any_page_class_has(capability):
+    """
+    Return a boolean indicating whether any page type in the table has the
+    named ``capability``, allowing menus to skip checks for each page when
+    none of them do.
+    """
+    try:
+        return _any_page_class_has[capability]
+    except KeyError:
+        pass
+    if not _table_built:
+        build_capability_table()
+    value = _any_page_class_has[capability] = any(
+        getattr(item, capability) for item in list(_capabilities.values())
+    )
+    return value
+
+
+@receiver(setting_changed)
+def rebuild_capability_table_on_setting_change(**kwargs):
+    if _table_built:
+        build_capability_table()
@@ -0,0 +1,92 @@
+"""
+Utilities for running the functions registered for wagtailmenus' hooks.
+
+Wagtail's ``hooks.get_hooks()`` sorts the registered functions every time it
+is called, which menus would otherwise do several times for every menu and
+sub menu rendered. Instead, the sorted functions for each hook are kept
+until the functions registered for it change, and menus only build keyword
+arguments for hook functions when there are some to call.
+"""
+from wagtail import hooks
+
+MENU_HOOK_NAMES = (
+    'menus_modify_base_page_queryset',
+    'menus_modify_base_menuitem_queryset',
+    'menus_modify_raw_menu_items',
+    'menus_modify_primed_menu_items',
+)
+
+QUERYSET_HOOK_NAMES = (
+    'menus_modify_base_page_queryset',
+    'menus_modify_base_menuitem_queryset',
+)
+
+# Sorted functions by hook name, along with a copy of the registrations they
+# were taken from
+_pipelines = {}
+
+
+def get_menu_hooks(hook_name):
+    """
+    Return a tuple of the functions registered for the hook named
+    ``hook_name``, in the same order as ``hooks.get_hooks()``.
+    """
+    # Wagtail doesn't provide a way to find out when hooks are registered
+    # (or removed, e.g. by tests), so the current registrations are compared
+    # with those the functions were taken from. This is much cheaper than
+    # sorting them again.
+    registered = _get_registrations(hook_name)
+    if registered is None:
+        # Registrations can't be compared, so always ask Wagtail
+        return tuple(hooks.get_hooks(hook_name))
+    try:
+        registrations, functions = _pipelines[hook_name]
+    except KeyError:
+        pass
+    else:
+        if registrations == registered:
+            return functions
+
+    functions = tuple(hooks.get_hooks(hook_name))
+    # 'get_hooks()' may have found more hooks in 'wagtail_hooks' modules
+    registered = _get_registrations(hook_name) or []
+    _pipelines[hook_name] = (list(registered), functions)
+    return functions
+
+
+def _get_registrations(hook_name):
+    """
+    Return the list of registrations Wagtail holds for the hook named
+    ``hook_name``, or ``None`` if they can't be accessed (they're stored
+    in a private attribute, which may change in future versions).
+    """
+    registry = getattr(hooks, '_hooks', None)
+    if not isinstance(registry, dict):
+        return None
+    return registry.get(hook_name) or []
+
+
+def menu_hooks_registered(hook_names=MENU_HOOK_NAMES):
+    """
+    Return a boolean indicating whether any functions are registered for
+    the hooks named in ``hook_names``.
+    """
+    for hook_name in hook_names:
+        if get_menu_hooks(hook_name):
+            return True
+    return False
+
+
+def apply_menu_hooks(hook_name, value, menu):
+    """
+    Pass ``value`` through each function registered for the hook named
+    ``hook_name`` (along with ``menu.common_hook_kwargs``), and return the
+    result.
+    """
+    functions = get_menu_hooks(hook_name)
+    if not functions:
+        return value
+    kwargs = menu.common_hook_kwargs
+    for function in functions:
+        value = function(value, **kwargs)
+    return value
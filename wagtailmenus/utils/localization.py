@@ -0,0 +1,61 @@
+"""
+Utilities for finding translations of menu pages in bulk, instead of using
+``page.localized`` for each page individually (which can result in several
+queries per page on multilingual sites).
+"""
+from collections import defaultdict
+
+from django.conf import settings as django_settings
+from wagtail.models import Locale, Page
+
+from wagtailmenus.utils.specific import specific_for_menus
+
+
+def get_active_locale():
+    """
+    Return the ``Locale`` for the active language, or ``None`` if Wagtail's
+    internationalisation features are disabled.
+    """
+    if not getattr(django_settings, 'WAGTAIL_I18N_ENABLED', False):
+        return None
+    try:
+        return Locale.get_active()
+    except (LookupError, Locale.DoesNotExist):
+        return None
+
+
+def get_localized_pages(pages, locale=None, page_registry=None):
+    """
+    Return a dictionary of the pages to use in place of ``pages`` for the
+    supplied ``locale`` (the active locale by default), keyed by the id of
+    each page in ``pages``. The values match what ``page.localized`` would
+    return for each page, but all translations are fetched together.
+
+    If Wagtail's internationalisation features are disabled, an empty
+    dictionary is returned.
+
+    If a ``RequestRegistry`` is provided as ``page_registry``, specific
+    pages already loaded for the same request will be reused.
+    """
+    if locale is None:
+        locale = get_active_locale()
+        if locale is None:
+            return {}
+
+    localized_pages = {}
+    pages_by_translation_key = defaultdict(list)
+    for page in pages:
+        localized_pages[page.pk] = page
+        if page.locale_id != locale.pk:
+            pages_by_translation_key[page.translation_key].append(page)
+
+    if pages_by_translation_key:
+        queryset = Page.objects.filter(
+            translation_key__in=pages_by_translation_key,
+            locale=locale,
+            live=True,
+        )
+        for translation in specific_for_menus(queryset, page_registry):
+            for page in pages_by_translation_key[translation.translation_key]:
+                localized_pages[page.pk] = translation
+    return localized_pages
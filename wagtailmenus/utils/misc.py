@@ -1,7 +1,12 @@
+from copy import copy, deepcopy
+
+from django.contrib.contenttypes.models import ContentType
 from django.http import Http404, HttpRequest
+from django.utils.functional import SimpleLazyObject, empty
 from wagtail.models import Page, Site
 
 from wagtailmenus.models.menuitems import MenuItem
+from wagtailmenus.utils.nodes import MenuNode
 
 
 def get_fake_site():
@@ -49,7 +54,16 @@ def derive_page(request, site, accept_best_match=True, max_subsequent_route_fail
     'best match', matching as many path components as possible. This process
     will continue until all path components have been exhausted, or routing
     fails more that ``max_subsequent_route_failures`` times in a row.
+
+    If the ``WAGTAILMENUS_DERIVE_PAGES_FROM_URL_PATHS`` setting is ``True``,
+    ``derive_page_from_url_path()`` is used instead.
     """
+    from wagtailmenus.conf import settings
+    if settings.DERIVE_PAGES_FROM_URL_PATHS:
+        return derive_page_from_url_path(
+            request, site, accept_best_match, max_subsequent_route_failures
+        )
+
     routing_point = site.root_page.specific
     path_components = [pc for pc in request.path.split('/') if pc]
 
@@ -59,6 +73,15 @@ def derive_page(request, site, accept_best_match=True, max_subsequent_route_fail
         except Http404:
             return None, False
 
+    return _derive_page_by_routing(
+        request, routing_point, path_components,
+        max_subsequent_route_failures
+    )
+
+
+def _derive_page_by_routing(
+    request, routing_point, path_components, max_subsequent_route_failures
+):
     best_match = None
     full_url_match = False
     lookup_components = []
@@ -96,6 +119,132 @@ def derive_page(request, site, accept_best_match=True, max_subsequent_route_fail
     return best_match, full_url_match
 
 
+def page_class_has_custom_route(model):
+    """
+    Returns a boolean indicating whether the supplied ``Page`` subclass
+    overrides ``Page.route()`` (e.g. by using ``RoutablePageMixin``).
+    """
+    return model.route is not Page.route
+
+
+def derive_page_from_url_path(
+    request, site, accept_best_match=True, max_subsequent_route_failures=3
+):
+    """
+    A faster alternative to ``derive_page()``, which accepts the same
+    arguments and returns the same values.
+
+    Rather than calling ``route()`` for each component of the request path,
+    a single query finds all pages from ``site`` with a ``url_path`` matching
+    the start of the request path, and the deepest live match is used.
+    ``route()`` is only used for any remaining path components when a page
+    with a custom ``route()`` method is found along the way.
+
+    If the ``WAGTAILMENUS_CACHE_DERIVED_PAGES`` setting is ``True``, the
+    outcome is cached (unless any custom ``route()`` methods were used), so
+    that only the matching page itself has to be fetched for repeat
+    requests.
+    """
+    from wagtailmenus.conf import settings
+    from wagtailmenus.utils.cache import get_cache, make_cache_key
+
+    path_components = [pc for pc in request.path.split('/') if pc]
+
+    cache_key = None
+    if settings.CACHE_DERIVED_PAGES:
+        cache_key = make_cache_key(
+            'derived_page', site.pk, site.root_page_id, path_components,
+            accept_best_match,
+        )
+        cached_value = get_cache().get(cache_key)
+        if cached_value is not None:
+            page_id, content_type_id, full_url_match = cached_value
+            if page_id is None:
+                return None, False
+            model = ContentType.objects.get_for_id(
+                content_type_id).model_class()
+            page = None
+            if model is not None:
+                page = model._default_manager.filter(
+                    pk=page_id, live=True
+                ).first()
+            if page is not None:
+                return page, full_url_match
+            # The value is stale (e.g. the page was deleted or unpublished
+            # by a process using a different cache), so derive it again
+            get_cache().delete(cache_key)
+
+    root_page = site.root_page
+    url_paths = [root_page.url_path]
+    for component in path_components:
+        url_paths.append(url_paths[-1] + component + '/')
+    pages_by_url_path = {
+        p.url_path: p for p in Page.objects.filter(
+            path__startswith=root_page.path, url_path__in=url_paths
+        )
+    }
+
+    best_match = None
+    full_url_match = False
+    for i, url_path in enumerate(url_paths):
+        page = pages_by_url_path.get(url_path)
+        if page is None:
+            # route() would fail for this and any further components
+            break
+        remaining_components = path_components[i:]
+        if page.live and (i or not accept_best_match):
+            # NOTE: derive_page() never returns the root page as a 'best
+            # match', so that isn't done here either
+            best_match = page
+            full_url_match = not remaining_components
+        if (
+            remaining_components and
+            page_class_has_custom_route(page.specific_class)
+        ):
+            # Leave the page to route the remaining components itself
+            routing_point = page.specific
+            if best_match is page:
+                best_match = routing_point
+            return _derive_page_from_custom_route(
+                request, routing_point, remaining_components,
+                best_match, accept_best_match, max_subsequent_route_failures
+            )
+
+    if not accept_best_match and not full_url_match:
+        best_match = None
+    if best_match is not None:
+        best_match = best_match.specific
+
+    if cache_key:
+        get_cache().set(cache_key, (
+            best_match.pk if best_match else None,
+            best_match.content_type_id if best_match else None,
+            full_url_match,
+        ), settings.CACHE_TIMEOUT)
+    return best_match, full_url_match
+
+
+def _derive_page_from_custom_route(
+    request, routing_point, path_components, best_match, accept_best_match,
+    max_subsequent_route_failures
+):
+    if not accept_best_match:
+        try:
+            return routing_point.route(request, path_components)[0], True
+        except Http404:
+            return None, False
+
+    routed_match, full_url_match = _derive_page_by_routing(
+        request, routing_point, path_components,
+        max_subsequent_route_failures
+    )
+    if routed_match is not None:
+        return routed_match, full_url_match
+    if best_match is not None:
+        best_match = best_match.specific
+    return best_match, False
+
+
 def derive_section_root(page):
     """
     Returns the 'section root' for the provided ``page``, or ``None``
@@ -110,6 +259,90 @@ def derive_section_root(page):
         return page.get_ancestors().get(depth=desired_depth).specific
 
 
+class LazySectionRoot(SimpleLazyObject):
+    """
+    A lazily loaded stand-in for the 'section root' of a page. The ``path``
+    and ``depth`` values are derived from the path of the supplied page, so
+    can be used without loading anything from the database. Accessing any
+    other attribute loads the specific section root page.
+    """
+
+    def __init__(self, page, depth):
+        path = page.path[:depth * page.steplen]
+
+        def _load():
+            if page.path == path:
+                return page.specific
+            return Page.objects.get(path=path).specific
+
+        super().__init__(_load)
+        self.__dict__['path'] = path
+        self.__dict__['depth'] = depth
+        self.__dict__['_page'] = page
+
+    @property
+    def is_loaded(self):
+        return self._wrapped is not empty
+
+    def get_page(self):
+        """
+        Return the section root page, loading it first if necessary.
+        """
+        if not self.is_loaded:
+            self._setup()
+        return self._wrapped
+
+    def set_page(self, page):
+        """
+        Use ``page`` (an already loaded instance of the section root) instead
+        of loading it from the database.
+        """
+        self._wrapped = page
+
+    def __bool__(self):
+        # Only created for pages that have a section root
+        return True
+
+    def __copy__(self):
+        if self.is_loaded:
+            return copy(self._wrapped)
+        return type(self)(self._page, self.depth)
+
+    def __deepcopy__(self, memo):
+        if self.is_loaded:
+            return deepcopy(self._wrapped, memo)
+        return type(self)(self._page, self.depth)
+
+    def __repr__(self):
+        if self.is_loaded:
+            return repr(self._wrapped)
+        return '<%s: %s>' % (type(self).__name__, self.path)
+
+
+def get_section_root(page):
+    """
+    Returns the 'section root' for the provided ``page`` using
+    ``derive_section_root_lazily()`` if the ``WAGTAILMENUS_LAZY_SECTION_ROOTS``
+    setting is ``True``, or ``derive_section_root()`` otherwise.
+    """
+    from wagtailmenus.conf import settings
+    if settings.LAZY_SECTION_ROOTS:
+        return derive_section_root_lazily(page)
+    return derive_section_root(page)
+
+
+def derive_section_root_lazily(page):
+    """
+    A query-free alternative to ``derive_section_root()``, which returns a
+    ``LazySectionRoot`` for the provided ``page``, or ``None`` if the page
+    is above the ``WAGTAILMENUS_SECTION_ROOT_DEPTH`` depth.
+    """
+    from wagtailmenus.conf import settings
+    desired_depth = settings.SECTION_ROOT_DEPTH
+    if page.depth >= desired_depth:
+        return LazySectionRoot(page, desired_depth)
+
+
 def validate_supplied_values(tag, max_levels=None, parent_page=None,
                              menuitem_or_page=None):
     if max_levels is not None:
@@ -126,9 +359,10 @@ def validate_supplied_values(tag, max_levels=None, parent_page=None,
                 (tag, parent_page.__class__)
             )
     if menuitem_or_page is not None:
-        if not isinstance(menuitem_or_page, (Page, MenuItem)):
+        if not isinstance(menuitem_or_page, (Page, MenuItem, MenuNode)):
             raise ValueError(
-                "The `%s` tag expects `menuitem_or_page` to be a `Page` or "
-                "`MenuItem` instance. A value of type `%s` was supplied." %
+                "The `%s` tag expects `menuitem_or_page` to be a `Page`, "
+                "`MenuItem` or `MenuNode` instance. A value of type `%s` was "
+                "supplied." %
                 (tag, menuitem_or_page.__class__)
             )
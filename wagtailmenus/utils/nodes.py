@@ -0,0 +1,96 @@
+"""
+Compact objects for representing menu items in templates, used instead of
+setting attributes on ``Page`` and ``MenuItem`` instances when the
+``WAGTAILMENUS_USE_MENU_NODES`` setting is ``True``.
+"""
+from wagtail.models import Page
+
+
+class MenuNode:
+    """
+    Holds the values needed to render a single menu item, along with the
+    ``Page`` or ``MenuItem`` object (``item``) that it was created from, and
+    the page it links to (``page``, which is ``None`` for custom URLs).
+
+    Any other attributes are looked up on ``item``, so templates can still
+    output values like ``item.pk`` or ``item.link_page``, or custom page
+    field values.
+
+    Values can't be changed after a node is created. Use ``replace()`` to
+    create a node with different values instead.
+    """
+    __slots__ = (
+        'item', 'page', 'text', 'href', 'active_class',
+        'has_children_in_menu', 'sub_menu',
+    )
+
+    def __init__(
+        self, item, page=None, text='', href='', active_class='',
+        has_children_in_menu=False, sub_menu=None
+    ):
+        set_value = object.__setattr__
+        set_value(self, 'item', item)
+        set_value(self, 'page', page)
+        set_value(self, 'text', text)
+        set_value(self, 'href', href)
+        set_value(self, 'active_class', active_class)
+        set_value(self, 'has_children_in_menu', has_children_in_menu)
+        set_value(self, 'sub_menu', sub_menu)
+
+    def replace(self, **values):
+        """
+        Return a new node with the same values as this one, apart from those
+        supplied as keyword arguments.
+        """
+        for name in MenuNode.__slots__:
+            values.setdefault(name, getattr(self, name))
+        return MenuNode(**values)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(
+            "Menu nodes can't be changed. Use 'replace()' to create a node "
+            "with different values."
+        )
+
+    def __delattr__(self, name):
+        self.__setattr__(name, None)
+
+    def __getattr__(self, name):
+        # Only called when normal attribute lookup fails. Unset slots and
+        # special attributes are never looked up on 'item', which also keeps
+        # copying and pickling working as expected
+        if name in MenuNode.__slots__ or name.startswith('__'):
+            raise AttributeError(name)
+        return getattr(self.item, name)
+
+    def __getstate__(self):
+        # Sub menus belong to the request they were prepared for, so are not
+        # included
+        return {
+            name: getattr(self, name) for name in self.__slots__
+            if name != 'sub_menu'
+        }
+
+    def __setstate__(self, state):
+        object.__setattr__(self, 'sub_menu', None)
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+
+    def __copy__(self):
+        # Nodes can't be changed, so can be shared
+        return self
+
+    def __repr__(self):
+        return '<MenuNode: %s>' % self.text
+
+
+def get_linked_page(menuitem_or_page):
+    """
+    Return the page that the supplied ``MenuNode``, ``Page`` or ``MenuItem``
+    object represents or links to.
+    """
+    if isinstance(menuitem_or_page, MenuNode):
+        return menuitem_or_page.page
+    if isinstance(menuitem_or_page, Page):
+        return menuitem_or_page
+    return menuitem_or_page.link_page
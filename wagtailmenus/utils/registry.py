@@ -0,0 +1,83 @@
+"""
+A registry of data that can be shared between all of the menus rendered for
+a single request, which is attached to the ``HttpRequest`` itself.
+"""
+from wagtail.models import Page
+
+from wagtailmenus.conf import settings
+from wagtailmenus.utils.misc import LazySectionRoot
+
+REQUEST_ATTRIBUTE_NAME = '_wagtailmenus_registry'
+
+
+class RequestRegistry:
+    """
+    Holds data that can be reused by any menu rendered for the request it is
+    attached to.
+    """
+
+    def __init__(self):
+        # Prepared menu instances, keyed by get_request_registry_key()
+        self.menus = {}
+        # Page instances already loaded for the request, keyed by id
+        self.pages = {}
+        # Prefetched flat menus, keyed by (menu class, site id)
+        self.flat_menus = {}
+        # The 'wagtailmenus_vals' value added to template contexts by the
+        # 'wagtailmenus' context processor
+        self.context_processor_vals = None
+        # The 'PageURLResolver' shared by all menus (see Menu.url_resolver)
+        self.url_resolver = None
+
+    def register_page(self, page):
+        """
+        Add ``page`` to the identity map, unless an instance of the same
+        (or a more specific) class has already been registered.
+        """
+        if page is None:
+            return
+        existing = self.pages.get(page.pk)
+        if existing is None or (
+            type(page) is not type(existing) and
+            isinstance(page, type(existing))
+        ):
+            self.pages[page.pk] = page
+
+    def get_page(self, pk, model=Page):
+        """
+        Return the registered page with the supplied ``pk``, if it is an
+        instance of ``model``. Otherwise, return ``None``.
+        """
+        page = self.pages.get(pk)
+        if isinstance(page, model):
+            return page
+
+
+def get_request_registry(request):
+    """
+    Return the ``RequestRegistry`` for the supplied ``request``, creating
+    it first if necessary.
+    """
+    try:
+        return getattr(request, REQUEST_ATTRIBUTE_NAME)
+    except AttributeError:
+        registry = RequestRegistry()
+        setattr(request, REQUEST_ATTRIBUTE_NAME, registry)
+        return registry
+
+
+def register_pages(request, *pages):
+    """
+    Add ``pages`` loaded outside of menus (e.g. the page being served) to
+    the identity map for ``request``, so that menus can reuse them. Does
+    nothing unless the ``WAGTAILMENUS_REUSE_PAGES_PER_REQUEST`` setting is
+    ``True``.
+    """
+    if not settings.REUSE_PAGES_PER_REQUEST:
+        return
+    registry = get_request_registry(request)
+    for page in pages:
+        if isinstance(page, LazySectionRoot) and not page.is_loaded:
+            # Don't load pages just to register them
+            continue
+        registry.register_page(page)
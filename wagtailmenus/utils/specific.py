@@ -0,0 +1,177 @@
+"""
+Utilities for fetching pages for menus in the most efficient way allowed by
+the ``WAGTAILMENUS_SELECTIVE_SPECIFIC_PAGES`` and
+``WAGTAILMENUS_ONLY_LOAD_MENU_FIELDS`` settings, and for fetching the pages
+that link pages link to in bulk.
+"""
+from collections import defaultdict
+from copy import copy
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models.query import ModelIterable
+from wagtail.models import Page
+
+from wagtailmenus.conf import settings
+from wagtailmenus.utils.capabilities import (any_page_class_has,
+                                             get_capabilities)
+
+
+def page_class_needs_specific(model):
+    """
+    Return a boolean indicating whether menus need 'specific' instances of
+    the supplied page ``model`` in order to render them correctly.
+    """
+    return get_capabilities(model).needs_specific
+
+
+def get_menu_field_names(model):
+    """
+    Return a list of names of the concrete fields that should be loaded
+    for instances of the supplied page ``model`` when the
+    ``WAGTAILMENUS_ONLY_LOAD_MENU_FIELDS`` setting is ``True``. This
+    includes any fields named in the ``WAGTAILMENUS_PAGE_FIELDS_FOR_MENUS``
+    and ``WAGTAILMENUS_PAGE_FIELD_FOR_MENU_ITEM_TEXT`` settings, plus any
+    fields named in a ``menu_fields`` attribute on the model or one of its
+    parent classes.
+    """
+    requested = list(settings.PAGE_FIELDS_FOR_MENUS)
+    requested.append(settings.PAGE_FIELD_FOR_MENU_ITEM_TEXT)
+    for klass in model.__mro__:
+        requested.extend(vars(klass).get('menu_fields', ()))
+
+    concrete_field_names = {f.name for f in model._meta.concrete_fields}
+    field_names = []
+    for name in requested:
+        if name in concrete_field_names and name not in field_names:
+            field_names.append(name)
+    return field_names
+
+
+class MenuPageIterable(ModelIterable):
+    """
+    An alternative to Wagtail's ``SpecificIterable`` for fetching menu pages.
+
+    When the ``WAGTAILMENUS_SELECTIVE_SPECIFIC_PAGES`` setting is ``True``,
+    specific instances are only fetched for pages of a type that menus care
+    about (see ``page_class_needs_specific()``). All other pages are
+    returned as plain ``Page`` instances, saving a query per content type,
+    and the cost of loading the (often large) specific page fields.
+
+    When the ``WAGTAILMENUS_ONLY_LOAD_MENU_FIELDS`` setting is ``True``,
+    only the fields returned by ``get_menu_field_names()`` are loaded for
+    specific pages. Any other field values will be fetched by Django on
+    first access.
+
+    If the queryset has a ``RequestRegistry`` (see ``specific_for_menus()``),
+    specific pages already loaded for the request are reused instead of
+    being fetched again, and newly fetched pages are registered.
+    """
+
+    def __iter__(self):
+        annotation_names = tuple(self.queryset.query.annotation_select)
+        page_registry = getattr(self.queryset, '_page_registry', None)
+        pages = list(super().__iter__())
+        selective = settings.SELECTIVE_SPECIFIC_PAGES
+
+        specific_pages = {}
+        pks_by_model = defaultdict(list)
+        for page in pages:
+            model = ContentType.objects.get_for_id(
+                page.content_type_id).model_class()
+            if (
+                model is None or
+                model is type(page) or
+                (selective and not page_class_needs_specific(model))
+            ):
+                continue
+            if page_registry is not None:
+                existing = page_registry.get_page(page.pk, model)
+                if existing is not None:
+                    # Menus set attributes on pages, so use a copy
+                    specific_pages[page.pk] = copy(existing)
+                    continue
+            pks_by_model[model].append(page.pk)
+
+        for model, pks in pks_by_model.items():
+            queryset = model._default_manager.all()
+            if settings.ONLY_LOAD_MENU_FIELDS:
+                queryset = queryset.only(*get_menu_field_names(model))
+            for specific_page in queryset.in_bulk(pks).values():
+                specific_pages[specific_page.pk] = specific_page
+                if page_registry is not None:
+                    page_registry.register_page(specific_page)
+
+        for page in pages:
+            specific_page = specific_pages.get(page.pk)
+            if specific_page is None:
+                yield page
+                continue
+            for name in annotation_names:
+                setattr(specific_page, name, getattr(page, name))
+            yield specific_page
+
+
+def specific_for_menus(queryset, page_registry=None):
+    """
+    Return a copy of the supplied page ``queryset`` that will return
+    'specific' page instances where menus need them. If the
+    ``WAGTAILMENUS_SELECTIVE_SPECIFIC_PAGES`` setting is ``False``, all
+    pages are made specific.
+
+    If a ``RequestRegistry`` is provided as ``page_registry``, specific
+    pages already loaded for the same request will be reused.
+    """
+    if settings.ONLY_LOAD_MENU_FIELDS:
+        queryset = queryset.only(*get_menu_field_names(queryset.model))
+    elif not settings.SELECTIVE_SPECIFIC_PAGES and page_registry is None:
+        return queryset.specific()
+    clone = queryset._chain()
+    clone._iterable_class = MenuPageIterable
+    clone._page_registry = page_registry
+    return clone
+
+
+def prefetch_link_pages(pages):
+    """
+    Fetch the pages that any link pages in ``pages`` link to, and cache them
+    on the link pages, so that they don't each query for their ``link_page``
+    when menus check whether to display them, or generate their URLs.
+
+    Target pages are fetched together as plain ``Page`` instances, then
+    specific instances are fetched only for target pages of a type that
+    overrides the methods used to generate URLs (one query per type).
+    """
+    from wagtailmenus.models.pages import AbstractLinkPage
+
+    if not any_page_class_has('is_link_page'):
+        return
+    link_pages = [
+        page for page in pages
+        if isinstance(page, AbstractLinkPage) and page.link_page_id and
+        not type(page).link_page.is_cached(page)
+    ]
+    if not link_pages:
+        return
+
+    queryset = Page.objects.all()
+    if settings.ONLY_LOAD_MENU_FIELDS:
+        queryset = queryset.only(*get_menu_field_names(Page))
+    targets = queryset.in_bulk({page.link_page_id for page in link_pages})
+
+    pks_by_model = defaultdict(list)
+    for target in targets.values():
+        model = target.specific_class
+        if (
+            model is not None and
+            model is not Page and
+            get_capabilities(model).custom_urls
+        ):
+            pks_by_model[model].append(target.pk)
+    for model, pks in pks_by_model.items():
+        targets.update(model._default_manager.in_bulk(pks))
+
+    for page in link_pages:
+        target = targets.get(page.link_page_id)
+        if target is not None:
+            page.link_page = target
+
@@ -0,0 +1,80 @@
+"""
+A process-wide cache of the templates chosen for rendering menus. When the
+``WAGTAILMENUS_CACHE_RESOLVED_TEMPLATES`` setting is ``True``, the template
+found for each list of candidate template names is remembered, so that
+template loaders only need to search for it once.
+
+The cache is bounded (least recently used values are discarded first), and
+is cleared whenever settings are changed, or a template file is changed while
+the development server is running.
+"""
+from collections import OrderedDict
+from threading import Lock
+
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.template.loader import get_template, select_template
+from django.utils.autoreload import file_changed
+
+from wagtailmenus.conf import settings
+
+# The maximum number of resolved templates to hold on to
+MAX_SIZE = 500
+
+_resolved_templates = OrderedDict()
+_lock = Lock()
+
+
+def _get_or_resolve(key, resolve):
+    if not settings.CACHE_RESOLVED_TEMPLATES:
+        return resolve()
+    with _lock:
+        try:
+            _resolved_templates.move_to_end(key)
+            return _resolved_templates[key]
+        except KeyError:
+            pass
+    template = resolve()
+    with _lock:
+        _resolved_templates[key] = template
+        while len(_resolved_templates) > MAX_SIZE:
+            _resolved_templates.popitem(last=False)
+    return template
+
+
+def get_menu_template(template_name):
+    """
+    A caching equivalent of Django's ``get_template()``.
+    """
+    return _get_or_resolve(
+        (template_name,), lambda: get_template(template_name)
+    )
+
+
+def select_menu_template(template_names):
+    """
+    A caching equivalent of Django's ``select_template()``. The cache is
+    keyed by the full list of candidate names, which already reflects
+    everything used to choose a template (the menu class, hostname, handle,
+    level, and any templates specified by developers).
+    """
+    template_names = tuple(template_names)
+    return _get_or_resolve(
+        template_names, lambda: select_template(template_names)
+    )
+
+
+def clear_template_cache():
+    with _lock:
+        _resolved_templates.clear()
+
+
+@receiver(setting_changed)
+def clear_template_cache_on_setting_change(**kwargs):
+    clear_template_cache()
+
+
+@receiver(file_changed)
+def clear_template_cache_on_file_change(sender, file_path, **kwargs):
+    if file_path.suffix != '.py':
+        clear_template_cache()
@@ -0,0 +1,63 @@
+from django.test import TestCase
+from wagtail.models import Page
+
+from wagtailmenus.utils.active_classes import (get_page_placeholder,
+                                               get_url_placeholder,
+                                               replace_placeholders)
+from wagtailmenus.utils.ancestors import PageAncestorIds
+
+
+class TestReplacePlaceholders(TestCase):
+    fixtures = ['test.json']
+
+    def setUp(self):
+        self.page = Page.objects.get(url_path='/home/about-us/meet-the-team/')
+        self.parent = Page.objects.get(url_path='/home/about-us/')
+        self.other = Page.objects.get(url_path='/home/news-and-events/')
+        self.output = ' '.join((
+            get_page_placeholder(self.page),
+            get_page_placeholder(self.parent),
+            get_page_placeholder(self.parent, repeated=True),
+            get_page_placeholder(self.parent, current_page_only=True),
+            get_page_placeholder(self.other),
+            get_url_placeholder('/about-us/'),
+        ))
+        self.expected_output = 'active ancestor ancestor   ancestor'
+
+    def test_ancestor_ids(self):
+        self.assertEqual(
+            replace_placeholders(
+                self.output,
+                current_page_id=self.page.pk,
+                ancestor_ids=[self.parent.pk, self.page.pk],
+                request_path='/about-us/meet-the-team/',
+            ),
+            self.expected_output
+        )
+
+    def test_page_ancestor_ids_not_fetched(self):
+        ancestor_ids = PageAncestorIds(self.page, 3)
+        with self.assertNumQueries(0):
+            output = replace_placeholders(
+                self.output,
+                current_page_id=self.page.pk,
+                ancestor_ids=ancestor_ids,
+                request_path='/about-us/meet-the-team/',
+            )
+        self.assertEqual(output, self.expected_output)
+        self.assertNotIn('ids', ancestor_ids.__dict__)
+
+    def test_ancestor_ids_only_used_when_needed(self):
+        output = get_page_placeholder(self.page, current_page_only=True)
+
+        def ancestor_ids():
+            raise AssertionError('Ancestor ids should not be used')
+            yield
+
+        self.assertEqual(
+            replace_placeholders(
+                output, current_page_id=self.page.pk,
+                ancestor_ids=ancestor_ids(),
+            ),
+            'active'
+        )
@@ -0,0 +1,72 @@
+from django.test import TestCase
+from wagtail.models import Page
+
+from wagtailmenus.utils.ancestors import (PageAncestorIds,
+                                          is_current_page_ancestor)
+
+
+class TestPageAncestorIds(TestCase):
+    fixtures = ['test.json']
+
+    def setUp(self):
+        self.page = Page.objects.get(
+            url_path='/home/about-us/meet-the-team/staff-member-one/'
+        )
+        self.ancestor_ids = PageAncestorIds(self.page, 3)
+
+    def test_ids_match_ancestor_query(self):
+        expected = tuple(
+            self.page.get_ancestors(inclusive=True).filter(
+                depth__gte=3).values_list('id', flat=True)
+        )
+        self.assertEqual(tuple(self.ancestor_ids), expected)
+        self.assertEqual(len(self.ancestor_ids), len(expected))
+
+    def test_contains_page_uses_no_queries(self):
+        about_us = Page.objects.get(url_path='/home/about-us/')
+        home = Page.objects.get(url_path='/home/')
+        news = Page.objects.get(url_path='/home/news-and-events/')
+        with self.assertNumQueries(0):
+            self.assertTrue(self.ancestor_ids.contains_page(self.page))
+            self.assertTrue(self.ancestor_ids.contains_page(about_us))
+            self.assertIn(about_us, self.ancestor_ids)
+            # Pages above 'min_depth' are not included
+            self.assertFalse(self.ancestor_ids.contains_page(home))
+            self.assertFalse(self.ancestor_ids.contains_page(news))
+            self.assertTrue(self.ancestor_ids)
+
+    def test_contains_page_without_path_falls_back_to_ids(self):
+        about_us = Page.objects.only('id').get(url_path='/home/about-us/')
+        self.assertTrue(self.ancestor_ids.contains_page(about_us))
+        with self.assertNumQueries(0):
+            self.assertIn(about_us.id, self.ancestor_ids)
+
+    def test_empty_when_page_is_above_min_depth(self):
+        home = Page.objects.get(url_path='/home/')
+        ancestor_ids = PageAncestorIds(home, 3)
+        with self.assertNumQueries(0):
+            self.assertFalse(ancestor_ids)
+            self.assertEqual(len(ancestor_ids), 0)
+            self.assertEqual(tuple(ancestor_ids), ())
+
+
+class TestHelpers(TestCase):
+    fixtures = ['test.json']
+
+    def test_is_current_page_ancestor_accepts_any_container(self):
+        page = Page.objects.get(url_path='/home/about-us/')
+        self.assertTrue(is_current_page_ancestor(page, (page.id,)))
+        self.assertFalse(is_current_page_ancestor(page, ()))
+        self.assertTrue(
+            is_current_page_ancestor(page, PageAncestorIds(page, 3))
+        )
+
+    def test_contains_path(self):
+        page = Page.objects.get(url_path='/home/about-us/meet-the-team/')
+        ancestor_ids = PageAncestorIds(page, 3)
+        with self.assertNumQueries(0):
+            self.assertTrue(ancestor_ids.contains_path(page.path))
+            self.assertTrue(ancestor_ids.contains_path(page.path[:12]))
+            # Pages above 'min_depth' are excluded
+            self.assertFalse(ancestor_ids.contains_path(page.path[:8]))
+            self.assertFalse(ancestor_ids.contains_path(page.path + '0001'))
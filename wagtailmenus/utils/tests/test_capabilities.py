@@ -0,0 +1,76 @@
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase, override_settings
+from django.utils.functional import SimpleLazyObject
+from wagtail.models import Page, get_page_models
+
+from wagtailmenus.tests.models import (ArticlePage, ContactPage, LinkPage,
+                                       TopLevelPage, TypicalPage)
+from wagtailmenus.utils import capabilities
+from wagtailmenus.utils.capabilities import (
+    any_page_class_has, get_capabilities, get_capabilities_for_content_type,
+    get_capabilities_for_page, inspect_page_class)
+
+
+class TestMenuCapabilities(TestCase):
+
+    def test_table_includes_all_page_models(self):
+        for model in get_page_models():
+            self.assertIn(model, capabilities._capabilities)
+
+    def test_table_matches_page_classes(self):
+        for model in get_page_models():
+            with self.subTest(model=model):
+                self.assertEqual(
+                    get_capabilities(model), inspect_page_class(model)
+                )
+
+    def test_capabilities(self):
+        values = get_capabilities(Page)
+        self.assertFalse(values.needs_specific)
+
+        values = get_capabilities(TypicalPage)
+        self.assertFalse(values.needs_specific)
+
+        values = get_capabilities(LinkPage)
+        self.assertTrue(values.is_link_page)
+        self.assertFalse(values.has_submenu_items)
+        self.assertTrue(values.needs_specific)
+
+        values = get_capabilities(ContactPage)
+        self.assertFalse(values.is_link_page)
+        self.assertTrue(values.has_submenu_items)
+        self.assertTrue(values.modify_submenu_items)
+        self.assertTrue(values.repeat_in_subnav)
+        self.assertFalse(values.custom_urls)
+
+        values = get_capabilities(ArticlePage)
+        self.assertTrue(values.custom_urls)
+        self.assertFalse(values.has_submenu_items)
+
+    def test_get_capabilities_for_page(self):
+        page = TopLevelPage(title='Test')
+        self.assertIs(
+            get_capabilities_for_page(page), get_capabilities(TopLevelPage)
+        )
+        self.assertIs(
+            get_capabilities_for_page(SimpleLazyObject(lambda: page)),
+            get_capabilities(TopLevelPage)
+        )
+
+    def test_get_capabilities_for_content_type(self):
+        content_type = ContentType.objects.get_for_model(LinkPage)
+        with self.assertNumQueries(0):
+            self.assertIs(
+                get_capabilities_for_content_type(content_type.pk),
+                get_capabilities(LinkPage)
+            )
+
+    def test_any_page_class_has(self):
+        self.assertTrue(any_page_class_has('is_link_page'))
+        self.assertTrue(any_page_class_has('modify_submenu_items'))
+
+    @override_settings(WAGTAILMENUS_PAGE_FIELD_FOR_MENU_ITEM_TEXT='title_de')
+    def test_table_rebuilt_when_settings_change(self):
+        self.assertTrue(get_capabilities(TopLevelPage).custom_menu_text)
+        self.assertFalse(get_capabilities(TypicalPage).custom_menu_text)
+        self.assertTrue(any_page_class_has('custom_menu_text'))
@@ -0,0 +1,76 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import TestCase
+from wagtail import hooks
+
+from wagtailmenus.utils.hooks import (apply_menu_hooks, get_menu_hooks,
+                                      menu_hooks_registered)
+
+HOOK_NAME = 'menus_modify_raw_menu_items'
+
+
+def add_one(value, **kwargs):
+    return value + 1
+
+
+def double(value, **kwargs):
+    return value * 2
+
+
+class TestMenuHooks(TestCase):
+
+    def test_no_hooks_registered(self):
+        self.assertEqual(get_menu_hooks(HOOK_NAME), ())
+        self.assertFalse(menu_hooks_registered())
+        menu = mock.Mock()
+        self.assertEqual(apply_menu_hooks(HOOK_NAME, 1, menu), 1)
+        # Keyword arguments aren't built when there are no hooks to call
+        self.assertEqual(menu.mock_calls, [])
+
+    def test_functions_not_sorted_again_when_unchanged(self):
+        with hooks.register_temporarily(HOOK_NAME, add_one):
+            self.assertEqual(get_menu_hooks(HOOK_NAME), (add_one,))
+            menu_hooks_registered()
+            with mock.patch.object(hooks, 'get_hooks') as get_hooks:
+                self.assertEqual(get_menu_hooks(HOOK_NAME), (add_one,))
+                self.assertTrue(menu_hooks_registered())
+            get_hooks.assert_not_called()
+
+    def test_order_matches_get_hooks(self):
+        with hooks.register_temporarily([
+            (HOOK_NAME, add_one),
+        ], order=10):
+            with hooks.register_temporarily(HOOK_NAME, double, order=-10):
+                self.assertEqual(
+                    get_menu_hooks(HOOK_NAME),
+                    tuple(hooks.get_hooks(HOOK_NAME))
+                )
+                menu = mock.Mock(common_hook_kwargs={})
+                self.assertEqual(apply_menu_hooks(HOOK_NAME, 1, menu), 3)
+
+    def test_changes_to_registered_hooks_are_detected(self):
+        self.assertEqual(get_menu_hooks(HOOK_NAME), ())
+
+        hooks.register(HOOK_NAME, add_one)
+        try:
+            self.assertEqual(get_menu_hooks(HOOK_NAME), (add_one,))
+        finally:
+            del hooks._hooks[HOOK_NAME]
+        self.assertEqual(get_menu_hooks(HOOK_NAME), ())
+
+        with hooks.register_temporarily(HOOK_NAME, add_one):
+            self.assertEqual(get_menu_hooks(HOOK_NAME), (add_one,))
+        with hooks.register_temporarily(HOOK_NAME, double):
+            self.assertEqual(get_menu_hooks(HOOK_NAME), (double,))
+        self.assertEqual(get_menu_hooks(HOOK_NAME), ())
+
+    def test_registrations_unavailable(self):
+        # Simulate Wagtail storing registrations somewhere else
+        wagtail_hooks = SimpleNamespace(get_hooks=hooks.get_hooks)
+        with mock.patch('wagtailmenus.utils.hooks.hooks', wagtail_hooks):
+            self.assertEqual(get_menu_hooks(HOOK_NAME), ())
+            with hooks.register_temporarily(HOOK_NAME, add_one):
+                self.assertEqual(get_menu_hooks(HOOK_NAME), (add_one,))
+                self.assertTrue(menu_hooks_registered())
+            self.assertEqual(get_menu_hooks(HOOK_NAME), ())
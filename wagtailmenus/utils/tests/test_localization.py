@@ -0,0 +1,91 @@
+from unittest import mock
+
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import translation
+from wagtail.models import Locale, Page, Site
+
+from wagtailmenus.utils.localization import (get_active_locale,
+                                             get_localized_pages)
+
+
+@override_settings(
+    WAGTAIL_I18N_ENABLED=True,
+    LANGUAGES=[('en', 'English'), ('fr', 'French')],
+    WAGTAIL_CONTENT_LANGUAGES=[('en', 'English'), ('fr', 'French')],
+)
+class TestGetLocalizedPages(TestCase):
+    fixtures = ['test.json']
+
+    def setUp(self):
+        self.locale = Locale.objects.get(language_code='fr')
+        self.about_us = Page.objects.get(url_path='/home/about-us/')
+        self.news = Page.objects.get(url_path='/home/news-and-events/')
+        self.translation = self.about_us.specific.copy_for_translation(
+            self.locale, copy_parents=True
+        )
+        self.translation.save_revision().publish()
+        # A draft translation, which should be ignored
+        self.news.specific.copy_for_translation(self.locale)
+        self.pages = list(
+            Page.objects.filter(depth__gte=3).order_by('path')[:20]
+        )
+
+    def test_matches_localized(self):
+        with translation.override('fr'):
+            localized_pages = get_localized_pages(self.pages)
+            for page in self.pages:
+                self.assertEqual(
+                    localized_pages[page.pk].pk, page.localized.pk
+                )
+        self.assertEqual(
+            localized_pages[self.about_us.pk].pk, self.translation.pk
+        )
+        self.assertEqual(localized_pages[self.news.pk], self.news)
+
+    def test_uses_fixed_number_of_queries(self):
+        with translation.override('fr'):
+            # Finding the locale, fetching translations, then fetching
+            # specific translations
+            with self.assertNumQueries(3):
+                get_localized_pages(self.pages)
+
+    def test_pages_in_active_locale_are_unchanged(self):
+        with translation.override('en'):
+            with self.assertNumQueries(1):
+                localized_pages = get_localized_pages(self.pages)
+        for page in self.pages:
+            self.assertIs(localized_pages[page.pk], page)
+
+    def test_empty_when_i18n_disabled(self):
+        with self.settings(WAGTAIL_I18N_ENABLED=False):
+            with self.assertNumQueries(0):
+                self.assertIsNone(get_active_locale())
+                self.assertEqual(get_localized_pages(self.pages), {})
+
+    def test_menus_do_not_localize_pages_individually(self):
+        request = RequestFactory().get('/')
+        request._wagtail_site = Site.objects.get(is_default_site=True)
+        template = Template(
+            '{% load menu_tags %}{% main_menu max_levels=3 %}'
+            '{% flat_menu "footer" %}'
+        )
+        context = Context({
+            'request': request,
+            'wagtailmenus_vals': {
+                'current_page': self.translation,
+                'section_root': None,
+                'current_page_ancestor_ids': (),
+            },
+        })
+        with translation.override('fr'):
+            with mock.patch.object(
+                Page, 'localized', new_callable=mock.PropertyMock
+            ) as localized:
+                output = template.render(context)
+        localized.assert_not_called()
+        # The item for the English page is active for its translation
+        self.assertRegex(
+            output, r'<li class="(active|ancestor) dropdown">\s*'
+            r'<a href="/about-us/"'
+        )
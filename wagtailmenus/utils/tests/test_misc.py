@@ -1,11 +1,16 @@
-from django.test import RequestFactory, TestCase, modify_settings
+from unittest import mock
+
+from django.test import (RequestFactory, TestCase, modify_settings,
+                         override_settings)
 from wagtail.models import Page, Site
 
 from wagtailmenus.conf import defaults
 from wagtailmenus.tests.models import (ArticleListPage, ArticlePage,
                                        LowLevelPage, TopLevelPage)
 from wagtailmenus.utils.misc import (derive_page, derive_section_root,
+                                     derive_section_root_lazily,
                                      get_fake_request, get_site_from_request)
+from wagtailmenus.utils.cache import get_cache
 
 
 class TestGetFakeRequest(TestCase):
@@ -194,6 +199,113 @@ class TestDerivePage(TestCase):
         )
 
 
+
+@override_settings(WAGTAILMENUS_DERIVE_PAGES_FROM_URL_PATHS=True)
+class TestDerivePageFromUrlPath(TestCase):
+    """
+    Tests for wagtailmenus.utils.misc.derive_page() with the
+    ``WAGTAILMENUS_DERIVE_PAGES_FROM_URL_PATHS`` setting enabled.
+    """
+    fixtures = ['test.json']
+
+    test_urls = (
+        '/',
+        '/superheroes/marvel-comics/',
+        '/news-and-events/latest-news/2016/04/',
+        '/news-and-events/latest-news/2016/04/18/article-one/',
+        '/news-and-events/latest-news/2016/04/01/blah/blah/',
+        '/about-us/blah/',
+        '/about-us/blah/blah/blah/blah/blah',
+        '/blah/blah/blah/blah/blah',
+    )
+
+    def setUp(self):
+        self.rf = RequestFactory()
+        self.site = Site.objects.select_related('root_page').first()
+        get_cache().clear()
+
+    def derive_page(self, url, **kwargs):
+        request = self.rf.get(url)
+        request.site = self.site
+        return derive_page(request, self.site, **kwargs)
+
+    def test_results_match_routing(self):
+        for accept_best_match in (True, False):
+            for url in self.test_urls:
+                with self.settings(
+                    WAGTAILMENUS_DERIVE_PAGES_FROM_URL_PATHS=False
+                ):
+                    expected = self.derive_page(
+                        url, accept_best_match=accept_best_match
+                    )
+                result = self.derive_page(
+                    url, accept_best_match=accept_best_match
+                )
+                self.assertEqual(result, expected)
+                if result[0] is not None:
+                    self.assertIs(type(result[0]), type(expected[0]))
+
+    def test_unpublished_pages_are_skipped(self):
+        TopLevelPage.objects.get(slug='about-us').unpublish()
+        self.assertEqual(
+            self.derive_page('/about-us/meet-the-team/'),
+            (LowLevelPage.objects.get(slug='meet-the-team'), True)
+        )
+        self.assertEqual(
+            self.derive_page('/about-us/'), (None, False)
+        )
+
+    def test_simple_full_url_match_uses_two_queries(self):
+        self.derive_page('/superheroes/marvel-comics/')
+        with self.assertNumQueries(2):
+            self.derive_page('/superheroes/marvel-comics/')
+
+    @override_settings(WAGTAILMENUS_CACHE_DERIVED_PAGES=True)
+    def test_cached_match_uses_one_query(self):
+        expected = self.derive_page('/superheroes/marvel-comics/')
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                self.derive_page('/superheroes/marvel-comics/'), expected
+            )
+        self.derive_page('/blah/')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.derive_page('/blah/'), (None, False))
+
+    @override_settings(WAGTAILMENUS_CACHE_DERIVED_PAGES=True)
+    def test_stale_cached_matches_are_ignored(self):
+        # Changes made by other processes (using a different cache) don't
+        # invalidate the cache in this one
+        self.derive_page('/superheroes/marvel-comics/')
+        LowLevelPage.objects.filter(slug='marvel-comics').update(live=False)
+        self.assertEqual(
+            self.derive_page('/superheroes/marvel-comics/'),
+            (TopLevelPage.objects.get(slug='superheroes'), False)
+        )
+
+        self.derive_page('/about-us/meet-the-team/')
+        with mock.patch(
+            'wagtailmenus.signal_handlers.invalidate_menu_caches'
+        ):
+            LowLevelPage.objects.get(slug='meet-the-team').delete()
+        self.assertEqual(
+            self.derive_page('/about-us/meet-the-team/'),
+            (TopLevelPage.objects.get(slug='about-us'), False)
+        )
+
+    @override_settings(WAGTAILMENUS_CACHE_DERIVED_PAGES=True)
+    def test_cache_invalidated_when_slug_changes(self):
+        page = LowLevelPage.objects.get(slug='marvel-comics')
+        self.derive_page('/superheroes/marvel-comics/')
+        page.slug = 'marvel'
+        page.save_revision().publish()
+        self.assertEqual(
+            self.derive_page('/superheroes/marvel-comics/'),
+            (TopLevelPage.objects.get(slug='superheroes'), False)
+        )
+        self.assertEqual(
+            self.derive_page('/superheroes/marvel/'), (page, True)
+        )
+
 class TestDeriveSectionRoot(TestCase):
     """Tests for wagtailmenus.utils.misc.derive_section_root()"""
     fixtures = ['test.json']
@@ -257,6 +369,43 @@ class TestDeriveSectionRoot(TestCase):
                 self.assertIs(result, None)
 
 
+
+class TestDeriveSectionRootLazily(TestCase):
+    """Tests for wagtailmenus.utils.misc.derive_section_root_lazily()"""
+    fixtures = ['test.json']
+
+    def setUp(self):
+        self.page_with_depth_of_2 = Page.objects.get(
+            depth=2, url_path='/home/'
+        )
+        self.page_with_depth_of_5 = Page.objects.get(
+            depth=5, url_path='/home/about-us/meet-the-team/staff-member-one/'
+        )
+
+    def test_section_root_is_only_loaded_when_used(self):
+        with self.assertNumQueries(0):
+            result = derive_section_root_lazily(self.page_with_depth_of_5)
+            self.assertEqual(result.depth, defaults.SECTION_ROOT_DEPTH)
+            self.assertEqual(
+                result.path, self.page_with_depth_of_5.path[:12]
+            )
+        with self.assertNumQueries(2):
+            self.assertEqual(result.title, 'About us')
+            self.assertIsInstance(result.get_page(), TopLevelPage)
+
+    def test_returns_none_if_provided_page_is_not_a_descendant_of_a_section_root(self):
+        with self.assertNumQueries(0):
+            result = derive_section_root_lazily(self.page_with_depth_of_2)
+            self.assertIs(result, None)
+
+    def test_matches_derive_section_root(self):
+        with self.settings(WAGTAILMENUS_SECTION_ROOT_DEPTH=4):
+            result = derive_section_root_lazily(self.page_with_depth_of_5)
+            self.assertEqual(
+                result.get_page(),
+                derive_section_root(self.page_with_depth_of_5)
+            )
+
 class TestGetSiteFromRequest(TestCase):
     """Tests for wagtailmenus.utils.misc.get_site_from_request()"""
     fixtures = ['test.json']
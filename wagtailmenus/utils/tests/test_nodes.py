@@ -0,0 +1,75 @@
+import pickle
+from copy import copy
+
+from django.test import TestCase
+from wagtail.models import Page
+
+from wagtailmenus.models import MainMenu
+from wagtailmenus.utils.nodes import MenuNode, get_linked_page
+
+
+class TestMenuNode(TestCase):
+    fixtures = ['test.json']
+
+    def setUp(self):
+        self.page = Page.objects.get(url_path='/home/about-us/')
+        self.node = MenuNode(
+            self.page, self.page, text='About', href='/about-us/',
+            active_class='active', has_children_in_menu=True,
+        )
+
+    def test_other_attributes_are_looked_up_on_item(self):
+        self.assertEqual(self.node.pk, self.page.pk)
+        self.assertEqual(self.node.title, self.page.title)
+        self.assertEqual(self.node.text, 'About')
+        with self.assertRaises(AttributeError):
+            self.node.link_page
+        self.assertFalse(hasattr(self.page, 'text'))
+
+    def test_arbitrary_attributes_cannot_be_set(self):
+        with self.assertRaises(AttributeError):
+            self.node.extra_classes = 'highlighted'
+
+    def test_values_cannot_be_changed(self):
+        with self.assertRaises(AttributeError):
+            self.node.text = 'Overview'
+        with self.assertRaises(AttributeError):
+            del self.node.href
+        self.assertEqual(self.node.text, 'About')
+        self.assertEqual(self.node.href, '/about-us/')
+
+    def test_copy(self):
+        self.assertIs(copy(self.node), self.node)
+
+    def test_replace(self):
+        node = self.node.replace(text='Overview', active_class='')
+        self.assertIsNot(node, self.node)
+        self.assertEqual(node.text, 'Overview')
+        self.assertEqual(node.active_class, '')
+        self.assertIs(node.page, self.page)
+        self.assertEqual(node.href, '/about-us/')
+        self.assertTrue(node.has_children_in_menu)
+        self.assertEqual(self.node.text, 'About')
+
+    def test_pickle_excludes_sub_menu(self):
+        node = self.node.replace(sub_menu=object())
+        node = pickle.loads(pickle.dumps(node))
+        self.assertEqual(node.page, self.page)
+        self.assertEqual(node.href, '/about-us/')
+        self.assertEqual(node.active_class, 'active')
+        self.assertTrue(node.has_children_in_menu)
+        self.assertIsNone(node.sub_menu)
+
+    def test_get_linked_page(self):
+        menu = MainMenu.objects.get(pk=1)
+        menu_item = menu.get_menu_items_manager().exclude(
+            link_page=None
+        ).first()
+        self.assertEqual(get_linked_page(self.node), self.page)
+        self.assertEqual(get_linked_page(self.page), self.page)
+        self.assertEqual(get_linked_page(menu_item), menu_item.link_page)
+        self.assertEqual(
+            get_linked_page(MenuNode(menu_item, menu_item.link_page)),
+            menu_item.link_page
+        )
+        self.assertIsNone(get_linked_page(MenuNode(menu_item)))
@@ -0,0 +1,64 @@
+from pathlib import Path
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils.autoreload import file_changed
+
+from wagtailmenus.conf import defaults
+from wagtailmenus.utils import templates
+from wagtailmenus.utils.templates import (clear_template_cache,
+                                          get_menu_template,
+                                          select_menu_template)
+
+TEMPLATE_NAMES = (
+    'menus/does-not-exist/main/level_1.html',
+    defaults.DEFAULT_MAIN_MENU_TEMPLATE,
+)
+
+
+@override_settings(WAGTAILMENUS_CACHE_RESOLVED_TEMPLATES=True)
+class TestResolvedTemplateCache(TestCase):
+
+    def setUp(self):
+        clear_template_cache()
+
+    def test_template_only_resolved_once(self):
+        with mock.patch.object(
+            templates, 'select_template', wraps=templates.select_template
+        ) as select_template:
+            template = select_menu_template(list(TEMPLATE_NAMES))
+            self.assertIs(select_menu_template(list(TEMPLATE_NAMES)), template)
+        self.assertEqual(select_template.call_count, 1)
+        self.assertEqual(
+            template.template.name, defaults.DEFAULT_MAIN_MENU_TEMPLATE
+        )
+
+    def test_single_template_only_resolved_once(self):
+        template = get_menu_template(defaults.DEFAULT_MAIN_MENU_TEMPLATE)
+        self.assertIs(
+            get_menu_template(defaults.DEFAULT_MAIN_MENU_TEMPLATE), template
+        )
+
+    def test_not_cached_when_disabled(self):
+        with self.settings(WAGTAILMENUS_CACHE_RESOLVED_TEMPLATES=False):
+            template = select_menu_template(TEMPLATE_NAMES)
+            self.assertIsNot(select_menu_template(TEMPLATE_NAMES), template)
+
+    def test_cache_size_is_bounded(self):
+        with mock.patch.object(templates, 'MAX_SIZE', 2):
+            first = select_menu_template(TEMPLATE_NAMES)
+            select_menu_template(TEMPLATE_NAMES[1:])
+            get_menu_template(defaults.DEFAULT_FLAT_MENU_TEMPLATE)
+            self.assertEqual(len(templates._resolved_templates), 2)
+            # The least recently used value was discarded
+            self.assertIsNot(select_menu_template(TEMPLATE_NAMES), first)
+
+    def test_cleared_when_template_file_changes(self):
+        template = select_menu_template(TEMPLATE_NAMES)
+        file_changed.send(sender=None, file_path=Path('menus/main/menu.html'))
+        self.assertIsNot(select_menu_template(TEMPLATE_NAMES), template)
+
+    def test_cleared_when_settings_change(self):
+        template = select_menu_template(TEMPLATE_NAMES)
+        with self.settings(WAGTAILMENUS_SITE_SPECIFIC_TEMPLATE_DIRS=True):
+            self.assertIsNot(select_menu_template(TEMPLATE_NAMES), template)
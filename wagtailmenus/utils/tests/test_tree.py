@@ -0,0 +1,83 @@
+from django.test import TestCase
+from wagtail.models import Page
+
+from wagtailmenus.utils.tree import (get_branch_path_range, get_page_tree_q,
+                                     merge_branches)
+
+
+class TestGetBranchPathRange(TestCase):
+
+    def test_range_covers_descendants_to_max_depth(self):
+        self.assertEqual(
+            get_branch_path_range('00010002', 4),
+            ('00010002', '00010002ZZZZZZZZ')
+        )
+
+    def test_range_for_single_level(self):
+        self.assertEqual(
+            get_branch_path_range('00010002', 2),
+            ('00010002', '00010002')
+        )
+
+
+class TestMergeBranches(TestCase):
+
+    def test_duplicates_and_covered_branches_are_removed(self):
+        self.assertEqual(
+            merge_branches([
+                ('000100020003', 5),
+                ('00010002', 4),
+                ('00010002', 3),
+                ('00010003', 3),
+            ]),
+            [('00010002', 4), ('000100020003', 5), ('00010003', 3)]
+        )
+
+    def test_deeper_descendant_branches_are_kept(self):
+        self.assertEqual(
+            merge_branches([('00010002', 3), ('000100020003', 5)]),
+            [('00010002', 3), ('000100020003', 5)]
+        )
+
+
+class TestGetPageTreeQ(TestCase):
+    fixtures = ['test.json']
+
+    def test_returns_none_when_nothing_to_match(self):
+        self.assertIsNone(get_page_tree_q())
+
+    def test_matches_same_pages_as_startswith_filters(self):
+        about_us = Page.objects.get(url_path='/home/about-us/')
+        news = Page.objects.get(url_path='/home/news-and-events/')
+        contact = Page.objects.get(url_path='/home/contact-us/')
+        team = Page.objects.get(url_path='/home/about-us/meet-the-team/')
+
+        expected = (
+            Page.objects.filter(
+                path__startswith=about_us.path, depth__lte=about_us.depth + 2
+            ) | Page.objects.filter(
+                path__startswith=news.path, depth__lte=news.depth + 1
+            ) | Page.objects.filter(id__in=[contact.id, team.id])
+        )
+        q = get_page_tree_q(
+            branches=[
+                (about_us.path, about_us.depth + 2),
+                (news.path, news.depth + 1),
+                (team.path, team.depth + 1),
+            ],
+            pages=[contact, team],
+        )
+        self.assertQuerySetEqual(
+            Page.objects.filter(q).order_by('path'),
+            expected.order_by('path'),
+        )
+
+    def test_pages_included_by_branches_are_not_matched_by_id(self):
+        about_us = Page.objects.get(url_path='/home/about-us/')
+        team = Page.objects.get(url_path='/home/about-us/meet-the-team/')
+        contact = Page.objects.get(url_path='/home/contact-us/')
+        q = get_page_tree_q(
+            branches=[(about_us.path, about_us.depth + 1)],
+            pages=[team, contact],
+        )
+        self.assertIn(('id__in', [contact.id]), q.children)
@@ -0,0 +1,98 @@
+from unittest import mock
+
+from django.test import RequestFactory, TestCase, override_settings
+from wagtail.models import Page, Site
+
+from wagtailmenus.tests.models import ArticlePage, LinkPage
+from wagtailmenus.utils import urls
+from wagtailmenus.utils.registry import get_request_registry
+from wagtailmenus.utils.urls import PageURLResolver, page_class_has_custom_urls
+
+
+class TestPageURLResolver(TestCase):
+    fixtures = ['test.json']
+
+    def setUp(self):
+        self.site = Site.objects.get(is_default_site=True)
+        self.request = RequestFactory().get('/')
+        self.resolver = PageURLResolver(self.request)
+        self.pages = list(Page.objects.all().specific())
+
+    def test_urls_match_page_methods(self):
+        for page in self.pages:
+            with self.subTest(page=page):
+                self.assertEqual(
+                    self.resolver.get_url(page, self.site),
+                    page.get_url(request=self.request, current_site=self.site)
+                )
+                self.assertEqual(
+                    self.resolver.get_url(page),
+                    page.get_url(request=self.request)
+                )
+                self.assertEqual(
+                    self.resolver.get_full_url(page),
+                    page.get_full_url(request=self.request)
+                )
+
+    @override_settings(
+        WAGTAIL_I18N_ENABLED=True,
+        LANGUAGES=[('en', 'English'), ('fr', 'French')],
+        WAGTAIL_CONTENT_LANGUAGES=[('en', 'English'), ('fr', 'French')],
+    )
+    def test_urls_match_page_methods_with_i18n_enabled(self):
+        request = RequestFactory().get('/')
+        resolver = PageURLResolver(request)
+        for page in self.pages:
+            with self.subTest(page=page):
+                self.assertEqual(
+                    resolver.get_url(page, self.site),
+                    page.get_url(request=request, current_site=self.site)
+                )
+
+    def test_site_root_url_only_reversed_once(self):
+        with mock.patch.object(urls, 'reverse', wraps=urls.reverse) as reverse:
+            for page in self.pages:
+                if not page_class_has_custom_urls(type(page)):
+                    self.resolver.get_url(page, self.site)
+        self.assertEqual(reverse.call_count, 1)
+
+    def test_paths_needing_escaping_use_page_method(self):
+        page = Page(url_path='/home/caf\xe9/', depth=3)
+        with mock.patch.object(
+            Page, 'get_url_parts', return_value=(1, 'http://x', '/y/')
+        ) as get_url_parts:
+            self.assertEqual(self.resolver.get_url(page, self.site), '/y/')
+        get_url_parts.assert_called_once_with(request=self.request)
+
+    def test_page_class_has_custom_urls(self):
+        self.assertFalse(page_class_has_custom_urls(Page))
+        self.assertTrue(page_class_has_custom_urls(ArticlePage))
+        self.assertTrue(page_class_has_custom_urls(LinkPage))
+
+
+@override_settings(WAGTAILMENUS_BULK_PAGE_URLS=True)
+class TestBulkPageUrls(TestCase):
+    fixtures = ['test.json']
+
+    test_urls = (
+        '/',
+        '/about-us/',
+        '/about-us/meet-the-team/staff-member-one/',
+        '/superheroes/marvel-comics/',
+        '/news-and-events/',
+    )
+
+    def get_responses(self):
+        return [self.client.get(url).content for url in self.test_urls]
+
+    def test_output_matches_output_without_bulk_urls(self):
+        output = self.get_responses()
+        with self.settings(WAGTAILMENUS_BULK_PAGE_URLS=False):
+            self.assertEqual(self.get_responses(), output)
+
+    def test_resolver_is_shared_by_menus_for_a_request(self):
+        response = self.client.get('/about-us/')
+        registry = get_request_registry(response.wsgi_request)
+        self.assertIsNotNone(registry.url_resolver)
+        for menu in registry.menus.values():
+            self.assertIs(menu.url_resolver, registry.url_resolver)
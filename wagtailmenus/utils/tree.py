@@ -0,0 +1,77 @@
+"""
+Utilities for querying pages from several parts of the page tree at once.
+
+Rather than OR-ing together one ``path__startswith`` filter per branch
+(which database planners tend to handle poorly, and which can't make use of
+an index on ``path``) branches are converted into ``path`` range predicates,
+overlapping branches are merged, and individual pages are combined into a
+single ``id__in`` condition.
+"""
+from django.db.models import Q
+from wagtail.models import Page
+
+
+def get_branch_path_range(path, max_depth):
+    """
+    Return a ``(start, end)`` tuple of ``path`` values that covers the page
+    with the supplied ``path``, plus all of its descendants down to
+    ``max_depth``.
+    """
+    end_length = max(len(path), max_depth * Page.steplen)
+    return path, path.ljust(end_length, Page.alphabet[-1])
+
+
+def get_branch_q(path, max_depth):
+    """
+    Return a ``Q`` object matching the page with the supplied ``path``, plus
+    all of its descendants down to ``max_depth``.
+    """
+    return Q(
+        path__range=get_branch_path_range(path, max_depth),
+        depth__lte=max_depth,
+    )
+
+
+def _get_covering_depth(branches, path):
+    """
+    Return the greatest 'max_depth' value of any branch in ``branches``
+    (a dict of 'max_depth' values keyed by path) that includes the page with
+    the supplied ``path``, or ``0`` if no branch includes it.
+    """
+    steplen = Page.steplen
+    prefix_lengths = range(steplen, len(path) + 1, steplen)
+    return max((branches.get(path[:i], 0) for i in prefix_lengths), default=0)
+
+
+def merge_branches(branches):
+    """
+    Return a list of ``(path, max_depth)`` tuples, ordered by path, with any
+    duplicate branches, or branches fully included by another, removed.
+    """
+    merged = {}
+    for path, max_depth in sorted(branches):
+        if _get_covering_depth(merged, path) >= max_depth:
+            continue
+        merged[path] = max_depth
+    return list(merged.items())
+
+
+def get_page_tree_q(branches=(), pages=()):
+    """
+    Return a single ``Q`` object matching all of the supplied ``branches``
+    (an iterable of ``(path, max_depth)`` tuples) and ``pages`` (an iterable
+    of ``Page`` objects with at least 'id', 'path' and 'depth' values
+    loaded). Returns ``None`` if there is nothing to match.
+    """
+    merged = merge_branches(branches)
+    covered = dict(merged)
+    page_ids = sorted({
+        p.id for p in pages if _get_covering_depth(covered, p.path) < p.depth
+    })
+    q = None
+    if page_ids:
+        q = Q(id__in=page_ids)
+    for path, max_depth in merged:
+        branch_q = get_branch_q(path, max_depth)
+        q = branch_q if q is None else q | branch_q
+    return q
@@ -0,0 +1,184 @@
+"""
+Generates URLs for menu pages when the ``WAGTAILMENUS_BULK_PAGE_URLS`` setting
+is ``True``. Instead of calling ``reverse()`` for every page (via
+``Page.get_url_parts()``), the 'wagtail_serve' URL for a site root is
+reversed once for each language, and URLs for other pages are derived from
+their ``url_path`` values.
+"""
+import re
+
+from django.conf import settings as django_settings
+from django.http import HttpRequest
+from django.urls import NoReverseMatch, reverse
+from django.utils import translation
+from django.utils.functional import cached_property
+from wagtail.coreutils import (WAGTAIL_APPEND_SLASH,
+                               get_supported_content_language_variant)
+from wagtail.models import Site
+
+from wagtailmenus.utils.capabilities import get_capabilities
+
+# Paths matching this can be appended to the URL for a site root without
+# needing to be escaped (in the same way that 'reverse()' would)
+SIMPLE_PATH_RE = re.compile(r'^(?:[\w\-]+/)*$', re.ASCII)
+
+
+def page_class_has_custom_urls(model):
+    """
+    Return a boolean indicating whether the supplied page ``model`` overrides
+    any of the methods used to generate page URLs.
+    """
+    capabilities = get_capabilities(model)
+    return capabilities.is_link_page or capabilities.custom_urls
+
+
+class PageURLResolver:
+    """
+    Returns the same values as ``Page.get_url()`` and ``Page.get_full_url()``
+    for the supplied pages. Results are remembered for the lifetime of the
+    resolver, which is shared by all menus rendered for the same request
+    (see ``Menu.url_resolver``).
+
+    Pages of a type that overrides any of the URL methods, and pages with URL
+    paths that would need escaping, are left to work out their own URLs.
+    """
+
+    def __init__(self, request=None):
+        self.request = request
+        self._url_parts = {}
+        self._serve_urls = {}
+
+    @cached_property
+    def site_root_paths(self):
+        # Share the copy that Page._get_site_root_paths() caches on requests
+        request = self.request
+        if request is None:
+            return Site.get_site_root_paths()
+        try:
+            return request._wagtail_cached_site_root_paths
+        except AttributeError:
+            paths = Site.get_site_root_paths()
+            request._wagtail_cached_site_root_paths = paths
+            return paths
+
+    @cached_property
+    def request_site(self):
+        if self.request is None:
+            return None
+        return Site.find_for_request(self.request)
+
+    @cached_property
+    def site_count(self):
+        return len({values[0] for values in self.site_root_paths})
+
+    def get_url(self, page, current_site=None):
+        """
+        Return the equivalent of ``page.get_url(request, current_site)``.
+        """
+        if page_class_has_custom_urls(type(page)):
+            return page.get_url(
+                request=self.request, current_site=current_site
+            )
+        if current_site is None:
+            current_site = self.request_site
+        url_parts = self.get_url_parts(page)
+        if url_parts is None or url_parts[1] is None and url_parts[2] is None:
+            return None
+        site_id, root_url, page_path = url_parts
+        if (
+            (current_site is not None and site_id == current_site.id) or
+            self.site_count == 1
+        ):
+            return page_path
+        return root_url + page_path
+
+    def get_full_url(self, page):
+        """
+        Return the equivalent of ``page.get_full_url(request)``.
+        """
+        if page_class_has_custom_urls(type(page)):
+            return page.get_full_url(request=self.request)
+        url_parts = self.get_url_parts(page)
+        if url_parts is None or url_parts[1] is None and url_parts[2] is None:
+            return None
+        site_id, root_url, page_path = url_parts
+        return root_url + page_path
+
+    def get_url_parts(self, page):
+        """
+        Return the equivalent of ``page.get_url_parts(request)`` for a page
+        of a type that doesn't override any of the URL methods.
+        """
+        key = (page.pk, translation.get_language())
+        try:
+            return self._url_parts[key]
+        except KeyError:
+            pass
+
+        url_path = page.url_path
+        possible_sites = [
+            values for values in self.site_root_paths
+            if url_path.startswith(values[1])
+        ]
+        if not possible_sites:
+            url_parts = None
+        else:
+            site_id, root_path, root_url, language_code = possible_sites[0]
+            if (
+                len({values[0] for values in possible_sites}) > 1 and
+                isinstance(self.request, HttpRequest)
+            ):
+                # Like Page.get_url_parts(), prefer the current site where
+                # the page belongs to more than one
+                site = self.request_site
+                if site:
+                    for values in possible_sites:
+                        if values[0] == site.pk:
+                            (site_id, root_path, root_url,
+                             language_code) = values
+                            break
+            path = url_path[len(root_path):]
+            serve_url = self.get_serve_url(language_code)
+            if not SIMPLE_PATH_RE.match(path):
+                url_parts = page.get_url_parts(request=self.request)
+            elif serve_url is None:
+                url_parts = (site_id, None, None)
+            else:
+                page_path = serve_url + path
+                if not WAGTAIL_APPEND_SLASH and page_path != '/':
+                    page_path = page_path.rstrip('/')
+                url_parts = (site_id, root_url, page_path)
+
+        self._url_parts[key] = url_parts
+        return url_parts
+
+    def get_serve_url(self, language_code):
+        """
+        Return the 'wagtail_serve' URL for a site root with the supplied
+        ``language_code``, or ``None`` if the URL can't be reversed.
+        """
+        active_language = translation.get_language()
+        if getattr(django_settings, 'WAGTAIL_I18N_ENABLED', False):
+            # Mirror the language selection in Page.get_url_parts()
+            try:
+                if (
+                    get_supported_content_language_variant(active_language) ==
+                    language_code
+                ):
+                    language_code = active_language
+            except LookupError:
+                pass
+        else:
+            language_code = active_language
+
+        try:
+            return self._serve_urls[language_code]
+        except KeyError:
+            pass
+        try:
+            with translation.override(language_code):
+                serve_url = reverse('wagtail_serve', args=('',))
+        except NoReverseMatch:
+            serve_url = None
+        self._serve_urls[language_code] = serve_url
+        return serve_url
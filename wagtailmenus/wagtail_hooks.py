@@ -2,7 +2,8 @@ from wagtail import hooks
 from wagtail.snippets.models import register_snippet
 
 from wagtailmenus.conf import settings
-from wagtailmenus.utils.misc import derive_section_root
+from wagtailmenus.utils.misc import get_section_root
+from wagtailmenus.utils.registry import register_pages
 
 if settings.MAIN_MENUS_EDITABLE_IN_WAGTAILADMIN:
     register_snippet(settings.objects.MAIN_MENUS_ADMIN_CLASS)
@@ -13,7 +14,10 @@ if settings.FLAT_MENUS_EDITABLE_IN_WAGTAILADMIN:
 
 @hooks.register('before_serve_page')
 def wagtailmenu_params_helper(page, request, serve_args, serve_kwargs):
+    section_root = get_section_root(page)
     request.META.update({
         'WAGTAILMENUS_CURRENT_PAGE': page,
-        'WAGTAILMENUS_CURRENT_SECTION_ROOT': derive_section_root(page),
+        'WAGTAILMENUS_CURRENT_SECTION_ROOT': section_root,
     })
+    # Allow menus to reuse these instances
+    register_pages(request, page, section_root)